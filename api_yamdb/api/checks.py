@@ -0,0 +1,22 @@
+from django.conf import settings
+from django.core.checks import Warning, register
+
+from api.v1.cache import is_shared_cache
+
+
+@register()
+def check_shared_cache(app_configs, **kwargs):
+    """Без общего кеша воркеры не узнают об изменениях друг друга."""
+    if settings.DEBUG or is_shared_cache():
+        return []
+    return [
+        Warning(
+            'Кеш версий и отметок хранится в памяти процесса.',
+            hint=(
+                'Воркеры не увидят сброса закешированных ответов друг '
+                'друга. Укажите общий бэкенд без вытеснения в '
+                'STATE_CACHE_BACKEND, например FileBasedCache или redis.'
+            ),
+            id='api.W001',
+        )
+    ]
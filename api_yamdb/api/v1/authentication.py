@@ -0,0 +1,234 @@
+"""
+JWT-аутентификация без чтения пользователя из БД на каждый запрос.
+
+Токены, выданные `UserObtainTokenView`, содержат имя, роль и признак
+суперпользователя. По ним собирается облегчённый объект `User`, которого
+достаточно для проверки прав. Полные строки пользователей нужны только
+части эндпоинтов и берутся из ограниченного LRU-кеша процесса с коротким
+сроком жизни записей.
+
+При изменении или удалении пользователя в общий кеш `STATE_CACHE`
+записывается время изменения. Токены, выданные раньше, и записи
+LRU-кеша, загруженные раньше, после этого не используются: пользователь
+читается из БД заново. Если этот кеш хранится в памяти процесса, другие
+воркеры этой отметки не увидят, поэтому без общего кеша пользователь
+читается из БД на каждый запрос. Смена имени, роли или активности и
+удаление пользователя вдобавок отзывают его токены (`TOKEN_USER_FIELDS`),
+так что и без отметки старый токен не сохранит прежние имя и права.
+
+Подпись токена проверяется один раз: проверенные токены хранятся в
+LRU-кеше по хешу строки токена до истечения срока действия. Отзыв
+токена (см. `revocation`) проверяется на каждом запросе.
+"""
+import hashlib
+import time
+from collections import OrderedDict
+from threading import Lock
+
+from django.conf import settings
+from django.db import transaction
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+from users.models import IssuedToken, User
+from .cache import is_shared_cache, state_cache
+from .revocation import revocation_list
+
+
+USERNAME_CLAIM = 'username'
+ROLE_CLAIM = 'role'
+SUPERUSER_CLAIM = 'is_superuser'
+USER_CLAIMS = (USERNAME_CLAIM, ROLE_CLAIM, SUPERUSER_CLAIM)
+USER_CHANGED_KEY = 'user-changed:{}'
+# Поля, по которым токен допускает пользователя. Их изменение отзывает
+# выданные токены: отметка в кеше может пропасть, а отзыв хранится в БД.
+TOKEN_USER_FIELDS = ('username', 'role', 'is_superuser', 'is_active')
+USER_FIELDS = tuple(field.attname for field in User._meta.concrete_fields)
+
+
+class UserAccessToken(AccessToken):
+    """Токен доступа с данными пользователя, нужными для проверки прав."""
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token[USERNAME_CLAIM] = user.username
+        token[ROLE_CLAIM] = user.role
+        token[SUPERUSER_CLAIM] = user.is_superuser
+        return token
+
+
+class UserCache:
+    """Ограниченный по размеру кеш строк пользователей со сроком жизни."""
+
+    def __init__(self, max_size, timeout):
+        self.max_size = max_size
+        self.timeout = timeout
+        self.entries = OrderedDict()
+        self.lock = Lock()
+
+    def get(self, user_id):
+        """Значения полей и время загрузки или None."""
+        with self.lock:
+            entry = self.entries.get(user_id)
+            if entry is None:
+                return None
+            values, loaded_at, expires = entry
+            if expires < time.monotonic():
+                del self.entries[user_id]
+                return None
+            self.entries.move_to_end(user_id)
+            return values, loaded_at
+
+    def set(self, user_id, values, loaded_at):
+        with self.lock:
+            self.entries[user_id] = (
+                values, loaded_at, time.monotonic() + self.timeout)
+            self.entries.move_to_end(user_id)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def delete(self, user_id):
+        with self.lock:
+            self.entries.pop(user_id, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+class TokenCache(UserCache):
+    """Кеш проверенных токенов по хешу строки токена."""
+
+    def get_token(self, raw_token):
+        entry = self.get(hashlib.sha256(raw_token).digest())
+        if entry is None:
+            return None
+        token, _ = entry
+        if token['exp'] <= time.time():
+            return None
+        return token
+
+    def set_token(self, raw_token, token):
+        self.set(hashlib.sha256(raw_token).digest(), token, time.time())
+
+
+user_cache = UserCache(settings.USER_CACHE_SIZE, settings.USER_CACHE_TIMEOUT)
+token_cache = TokenCache(
+    settings.TOKEN_CACHE_SIZE, settings.TOKEN_CACHE_TIMEOUT)
+
+
+def issue_token(user):
+    """Токен доступа, который можно отозвать через `revoke_user_tokens`."""
+    token = UserAccessToken.for_user(user)
+    IssuedToken.objects.create(
+        user=user,
+        jti=token[api_settings.JTI_CLAIM],
+        expires_at=datetime_from_epoch(token['exp']),
+    )
+    return token
+
+
+def token_fields_changed(user, changes):
+    return any(
+        field in changes and changes[field] != getattr(user, field)
+        for field in TOKEN_USER_FIELDS
+    )
+
+
+def get_changed_at(user_id):
+    return state_cache.get(USER_CHANGED_KEY.format(user_id))
+
+
+def mark_users_changed(user_ids):
+    changed_at = time.time()
+    # Отметка нужна, пока действительны выданные до изменения токены.
+    state_cache.set_many(
+        {USER_CHANGED_KEY.format(user_id): changed_at for user_id in user_ids},
+        api_settings.ACCESS_TOKEN_LIFETIME.total_seconds()
+    )
+    for user_id in user_ids:
+        user_cache.delete(user_id)
+
+
+def mark_users_changed_on_commit(user_ids):
+    transaction.on_commit(lambda: mark_users_changed(user_ids))
+
+
+def get_full_user(user_id):
+    """Пользователь со всеми полями из LRU-кеша или БД либо None."""
+    if not is_shared_cache():
+        return User.objects.filter(pk=user_id).first()
+    entry = user_cache.get(user_id)
+    if entry is not None:
+        values, loaded_at = entry
+        changed_at = get_changed_at(user_id)
+        if changed_at is None or loaded_at > changed_at:
+            return User.from_db('default', USER_FIELDS, values)
+    loaded_at = time.time()
+    values = User.objects.filter(pk=user_id).values_list(
+        *USER_FIELDS).first()
+    if values is None:
+        return None
+    user_cache.set(user_id, values, loaded_at)
+    return User.from_db('default', USER_FIELDS, values)
+
+
+def user_from_claims(token):
+    """
+    Облегчённый пользователь из токена: заполнены только id, имя, роль и
+    признак суперпользователя. Сохранять такой объект нельзя.
+    """
+    user = User(
+        id=token[api_settings.USER_ID_CLAIM],
+        username=token[USERNAME_CLAIM],
+        role=token[ROLE_CLAIM],
+        is_superuser=token[SUPERUSER_CLAIM],
+    )
+    user._state.adding = False
+    return user
+
+
+class JWTClaimsAuthentication(JWTAuthentication):
+    """
+    Аутентификация по JWT, которая берёт пользователя из данных токена.
+    Токены без этих данных, выданные до изменения пользователя или
+    проверяемые без общего кеша обрабатываются через полную строку
+    пользователя.
+    """
+
+    def get_validated_token(self, raw_token):
+        token = token_cache.get_token(raw_token)
+        if token is None:
+            token = super().get_validated_token(raw_token)
+            token_cache.set_token(raw_token, token)
+        jti = token.get(api_settings.JTI_CLAIM)
+        if jti is not None and revocation_list.is_revoked(jti):
+            raise AuthenticationFailed('Токен отозван.', code='token_revoked')
+        return token
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(
+                'Токен не содержит идентификатора пользователя.')
+        if is_shared_cache() and all(
+            claim in validated_token for claim in USER_CLAIMS
+        ):
+            changed_at = get_changed_at(user_id)
+            issued_at = validated_token.get('iat', 0)
+            if changed_at is None or issued_at > changed_at:
+                return user_from_claims(validated_token)
+        user = get_full_user(user_id)
+        if user is None:
+            raise AuthenticationFailed(
+                'Пользователь не найден.', code='user_not_found')
+        if not user.is_active:
+            raise AuthenticationFailed(
+                'Пользователь неактивен.', code='user_inactive')
+        return user
@@ -0,0 +1,138 @@
+import hashlib
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+from django.utils.connection import ConnectionProxy
+from django.utils.http import parse_etags, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+
+VERSION_KEY = 'resource-version:{}'
+RESPONSE_KEY = 'response:{}'
+# Ресурсы вложенных эндпоинтов: своя версия у каждого родителя.
+TITLE_REVIEWS = 'review:title:{}'
+REVIEW_COMMENTS = 'comment:review:{}'
+
+# Версии и отметки, которые не вытесняются закешированными ответами.
+state_cache = ConnectionProxy(caches, settings.STATE_CACHE)
+
+
+def is_shared_cache(alias=settings.STATE_CACHE):
+    """
+    Кеш общий для воркеров: записанные в него версии и отметки видны
+    всем процессам.
+    """
+    return not isinstance(caches[alias], (LocMemCache, DummyCache))
+
+
+def new_version():
+    # Не начинаем с нуля, чтобы потерянный счётчик, например после
+    # перезапуска memcached, не совпал со старым значением.
+    return time.time_ns()
+
+
+def get_versions(resources):
+    keys = [VERSION_KEY.format(resource) for resource in resources]
+    versions = state_cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            state_cache.add(key, new_version(), timeout=None)
+            versions[key] = state_cache.get(key)
+    return tuple(versions[key] for key in keys)
+
+
+def bump_version(resource):
+    key = VERSION_KEY.format(resource)
+    try:
+        state_cache.incr(key)
+    except ValueError:
+        state_cache.set(key, new_version(), timeout=None)
+
+
+def bump_versions_on_commit(*resources):
+    """Сбрасывает закешированные ответы после фиксации транзакции."""
+    def bump():
+        for resource in resources:
+            bump_version(resource)
+    transaction.on_commit(bump)
+
+
+def get_request_key(request, *parts):
+    query = urlencode(sorted(request.query_params.lists()), doseq=True)
+    raw = '|'.join(
+        str(part) for part in
+        (request.get_host(), request.path, query, *parts)
+    )
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+def etag_matches(request, etag):
+    if_none_match = request.headers.get('If-None-Match')
+    if not if_none_match:
+        return False
+    return etag in (
+        tag[2:] if tag.startswith('W/') else tag
+        for tag in parse_etags(if_none_match)
+    )
+
+
+class CachedResponseMixin:
+    """
+    Кеширует ответы на чтение для анонимных пользователей и отдаёт
+    ETag с ответом 304 на совпадающий If-None-Match. Ключ и ETag
+    зависят от версий ресурсов `cache_resources`, которые увеличиваются
+    сигналами при изменении моделей.
+    """
+    cache_resources = ()
+
+    def get_cache_resources(self):
+        return self.cache_resources
+
+    def get_cached_response(self, handler, request, *args, **kwargs):
+        request_key = get_request_key(
+            request, self.action, request.accepted_renderer.format,
+            *get_versions(self.get_cache_resources())
+        )
+        etag = quote_etag(request_key)
+        if etag_matches(request, etag):
+            return Response(
+                status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+        if request.user.is_authenticated:
+            response = handler(request, *args, **kwargs)
+        else:
+            response = self.get_anonymous_response(
+                request_key, handler, request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            response['ETag'] = etag
+        return response
+
+    def get_anonymous_response(self, request_key, handler, request, *args,
+                               **kwargs):
+        key = RESPONSE_KEY.format(request_key)
+        data = cache.get(key)
+        if data is not None:
+            return Response(data)
+        response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            cache.set(key, response.data, settings.RESPONSE_CACHE_TIMEOUT)
+        return response
+
+
+class CachedListMixin(CachedResponseMixin):
+
+    def list(self, request, *args, **kwargs):
+        return self.get_cached_response(
+            super().list, request, *args, **kwargs)
+
+
+class CachedReadMixin(CachedListMixin):
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_cached_response(
+            super().retrieve, request, *args, **kwargs)
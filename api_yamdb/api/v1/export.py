@@ -0,0 +1,66 @@
+import csv
+import json
+
+
+EXPORT_CHUNK_SIZE = 1000
+EXPORT_FIELDS = ('id', 'name', 'year', 'description', 'category', 'genre',
+                 'rating', 'reviews_count')
+NDJSON = 'ndjson'
+CSV = 'csv'
+EXPORT_CONTENT_TYPES = {
+    NDJSON: 'application/x-ndjson',
+    CSV: 'text/csv',
+}
+
+
+class Echo:
+    """Буфер, который сразу возвращает записанную строку."""
+
+    def write(self, value):
+        return value
+
+
+def iterate_in_chunks(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    """Обходит кверисет порциями по id, сохраняя prefetch_related."""
+    queryset = queryset.order_by('id')
+    last_id = 0
+    while True:
+        chunk = list(queryset.filter(id__gt=last_id)[:chunk_size])
+        if not chunk:
+            return
+        yield from chunk
+        last_id = chunk[-1].id
+
+
+def title_to_row(title):
+    rating = title.rating
+    return {
+        'id': title.id,
+        'name': title.name,
+        'year': title.year,
+        'description': title.description,
+        'category': title.category.slug if title.category else None,
+        'genre': [genre.slug for genre in title.genre.all()],
+        'rating': None if rating is None else round(rating, 2),
+        'reviews_count': title.rating_count,
+    }
+
+
+def export_ndjson(titles):
+    for title in titles:
+        yield json.dumps(title_to_row(title), ensure_ascii=False) + '\n'
+
+
+def export_csv(titles):
+    writer = csv.writer(Echo())
+    yield writer.writerow(EXPORT_FIELDS)
+    for title in titles:
+        row = title_to_row(title)
+        row['genre'] = ','.join(row['genre'])
+        yield writer.writerow(row[field] for field in EXPORT_FIELDS)
+
+
+EXPORTERS = {
+    NDJSON: export_ndjson,
+    CSV: export_csv,
+}
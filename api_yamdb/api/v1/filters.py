@@ -1,13 +1,78 @@
-from django_filters.rest_framework import CharFilter, FilterSet
+from django.db.models import Q
+from django_filters.rest_framework import (
+    BaseInFilter, CharFilter, ChoiceFilter, FilterSet
+)
+from rest_framework.filters import OrderingFilter
 
 from reviews.models import Title
+from users.models import User
+
+
+GENRE_MATCH_ANY = 'any'
+GENRE_MATCH_ALL = 'all'
+# Больше любого символа: строки с префиксом лежат в [prefix, prefix + MAX).
+MAX_CHAR = chr(0x10FFFF)
+
+
+class CharInFilter(BaseInFilter, CharFilter):
+    pass
+
+
+class StableOrderingFilter(OrderingFilter):
+    """Сортировка с id в конце, чтобы порядок страниц был однозначным."""
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        if ordering and not {'id', '-id', 'pk', '-pk'} & set(ordering):
+            ordering = (*ordering, 'id')
+        return ordering
 
 
 class TitleFilter(FilterSet):
-    category = CharFilter(field_name='category__slug')
-    genre = CharFilter(field_name='genre__slug')
+    category = CharInFilter(field_name='category__slug')
+    genre = CharInFilter(method='filter_genre')
+    genre_match = ChoiceFilter(
+        choices=((GENRE_MATCH_ANY, 'any'), (GENRE_MATCH_ALL, 'all')),
+        method='filter_genre_match'
+    )
     name = CharFilter(lookup_expr='icontains')
+    search = CharFilter(method='filter_search')
 
     class Meta:
         model = Title
         fields = ('name', 'year', 'genre', 'category',)
+
+    def filter_genre(self, queryset, name, value):
+        match_all = (
+            self.form.cleaned_data.get('genre_match') == GENRE_MATCH_ALL)
+        return queryset.filter_genres(value, match_all)
+
+    def filter_genre_match(self, queryset, name, value):
+        return queryset
+
+    def filter_search(self, queryset, name, value):
+        return queryset.search(value)
+
+
+def prefix_range(field, prefix):
+    """
+    Условие «начинается с `prefix`» в виде диапазона значений, которое
+    читает индекс по полю, в отличие от `icontains` и `LIKE`.
+    """
+    return Q(**{
+        f'{field}__gte': prefix, f'{field}__lt': prefix + MAX_CHAR
+    })
+
+
+class UserFilter(FilterSet):
+    search = CharFilter(method='filter_search')
+    role = ChoiceFilter(choices=User.UserRole.choices)
+
+    class Meta:
+        model = User
+        fields = ('search', 'role')
+
+    def filter_search(self, queryset, name, value):
+        return queryset.filter(
+            prefix_range('username', value) | prefix_range('email', value)
+        )
@@ -0,0 +1,177 @@
+"""
+Таблицы лидеров: лучшие по рейтингу произведения всего каталога,
+каждой категории и каждого жанра.
+
+Таблица хранится в кеше как отсортированный список готовых к выдаче
+строк с запасом до `LEADERBOARD_SIZE * BUFFER_FACTOR` произведений.
+Изменение оценок обновляет затронутые таблицы на месте, а запас
+позволяет заменить выбывшее из топа произведение без обращения к БД.
+Таблица, в которой запас закончился, и все таблицы после изменения
+произведений, категорий или жанров пересобираются при следующем чтении.
+Одновременные обновления одной таблицы могут потерять изменение, поэтому
+таблицы живут не дольше RESPONSE_CACHE_TIMEOUT.
+"""
+from threading import local
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F, FloatField
+from django.db.models.functions import Cast
+
+from reviews.models import Category, Genre, Title
+from .cache import new_version, state_cache
+
+
+GENERATION_KEY = 'leaderboard-generation'
+BOARD_KEY = 'leaderboard:{}:{}'
+GLOBAL_BOARD = 'all'
+CATEGORY_BOARD = 'category:{}'
+GENRE_BOARD = 'genre:{}'
+BUFFER_FACTOR = 2
+
+_pending = local()
+
+
+def get_generation():
+    generation = state_cache.get(GENERATION_KEY)
+    if generation is None:
+        state_cache.add(GENERATION_KEY, new_version(), timeout=None)
+        generation = state_cache.get(GENERATION_KEY)
+    return generation
+
+
+def invalidate_leaderboards():
+    try:
+        state_cache.incr(GENERATION_KEY)
+    except ValueError:
+        state_cache.set(GENERATION_KEY, new_version(), timeout=None)
+
+
+def invalidate_leaderboards_on_commit():
+    transaction.on_commit(invalidate_leaderboards)
+
+
+def get_buffer_size():
+    return settings.LEADERBOARD_SIZE * BUFFER_FACTOR
+
+
+def title_boards(title):
+    boards = [GLOBAL_BOARD]
+    if title.category:
+        boards.append(CATEGORY_BOARD.format(title.category.slug))
+    boards.extend(
+        GENRE_BOARD.format(genre.slug) for genre in title.genre.all()
+    )
+    return boards
+
+
+def title_to_entry(title):
+    return {
+        'id': title.id,
+        'name': title.name,
+        'year': title.year,
+        'category': title.category.slug if title.category else None,
+        'genre': [genre.slug for genre in title.genre.all()],
+        'rating': title.rating,
+        'reviews_count': title.rating_count,
+    }
+
+
+def sort_key(entry):
+    return -entry['rating'], entry['id']
+
+
+def build_board(board):
+    """Собирает таблицу из БД или возвращает None для неизвестной."""
+    titles = Title.objects.filter(
+        rating_count__gte=settings.LEADERBOARD_MIN_REVIEWS
+    )
+    kind, _, slug = board.partition(':')
+    if kind == 'category':
+        if not Category.objects.filter(slug=slug).exists():
+            return None
+        titles = titles.filter(category__slug=slug)
+    elif kind == 'genre':
+        if not Genre.objects.filter(slug=slug).exists():
+            return None
+        titles = titles.filter(genre__slug=slug)
+    buffer_size = get_buffer_size()
+    titles = list(
+        titles.select_related('category').prefetch_related('genre').annotate(
+            rating_value=Cast('rating_sum', FloatField()) / F('rating_count')
+        ).order_by('-rating_value', 'id')[:buffer_size + 1]
+    )
+    return {
+        'titles': [title_to_entry(title) for title in titles[:buffer_size]],
+        'complete': len(titles) <= buffer_size,
+    }
+
+
+def get_leaderboard(board):
+    """Топ таблицы `board` или None, если такой категории/жанра нет."""
+    key = BOARD_KEY.format(get_generation(), board)
+    data = cache.get(key)
+    if data is None:
+        data = build_board(board)
+        if data is None:
+            return None
+        cache.set(key, data, settings.RESPONSE_CACHE_TIMEOUT)
+    return data['titles'][:settings.LEADERBOARD_SIZE]
+
+
+def update_board(data, title_id, entry):
+    """
+    Переставляет произведение в таблице. Возвращает None, если без
+    пересчёта уже нельзя гарантировать правильный топ.
+    """
+    titles = [item for item in data['titles'] if item['id'] != title_id]
+    complete = data['complete']
+    if entry is not None and (
+        complete or titles and sort_key(entry) < sort_key(titles[-1])
+    ):
+        titles.append(entry)
+        titles.sort(key=sort_key)
+    buffer_size = get_buffer_size()
+    if len(titles) > buffer_size:
+        titles, complete = titles[:buffer_size], False
+    if not complete and len(titles) < settings.LEADERBOARD_SIZE:
+        return None
+    return {'titles': titles, 'complete': complete}
+
+
+def update_title(title_id):
+    """Обновляет таблицы, в которые входит произведение."""
+    title = Title.objects.select_related('category').prefetch_related(
+        'genre').filter(pk=title_id).first()
+    if title is None:
+        return
+    entry = None
+    if title.rating_count >= settings.LEADERBOARD_MIN_REVIEWS:
+        entry = title_to_entry(title)
+    generation = get_generation()
+    for board in title_boards(title):
+        key = BOARD_KEY.format(generation, board)
+        data = cache.get(key)
+        if data is None:
+            continue
+        data = update_board(data, title.id, entry)
+        if data is None:
+            cache.delete(key)
+        else:
+            cache.set(key, data, settings.RESPONSE_CACHE_TIMEOUT)
+
+
+def update_pending_titles():
+    pending = _pending.__dict__.setdefault('title_ids', set())
+    while pending:
+        update_title(pending.pop())
+
+
+def update_titles_on_commit(*title_ids):
+    """
+    Откладывает обновление таблиц до фиксации транзакции. Каскадное
+    удаление отзывов одного произведения обновит его таблицы один раз.
+    """
+    _pending.__dict__.setdefault('title_ids', set()).update(title_ids)
+    transaction.on_commit(update_pending_titles)
@@ -0,0 +1,170 @@
+import json
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+
+PAGE_MODE = 'page'
+CURSOR_MODE = 'cursor'
+
+
+def reverse_ordering(ordering):
+    return tuple(
+        field[1:] if field.startswith('-') else f'-{field}'
+        for field in ordering
+    )
+
+
+class KeysetCursorPagination(CursorPagination):
+    """
+    Курсор по значениям всех полей сортировки. `CursorPagination` из DRF
+    сравнивает только первое поле, а равные значения пропускает смещением
+    не больше `offset_cutoff`, поэтому при длинной серии одинаковых
+    значений строки терялись. Последнее поле сортировки уникально (id),
+    так что позиция однозначна и смещение не нужно.
+    """
+
+    def _get_position_from_instance(self, instance, ordering):
+        values = []
+        for field in ordering:
+            name = field.lstrip('-')
+            if isinstance(instance, dict):
+                value = instance[name]
+            else:
+                value = getattr(instance, name)
+            if hasattr(value, 'isoformat'):
+                value = value.isoformat()
+            values.append(value)
+        return json.dumps(values)
+
+    def get_seek_filter(self, ordering, position):
+        """Строки после позиции в порядке `ordering`."""
+        try:
+            values = json.loads(position)
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list) or len(values) != len(ordering):
+            raise NotFound(self.invalid_cursor_message)
+        seek, equal = Q(), Q()
+        for field, value in zip(ordering, values):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            seek |= equal & Q(**{f'{name}__{lookup}': value})
+            equal &= Q(**{name: value})
+        return seek
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        reverse = self.cursor is not None and self.cursor.reverse
+        position = self.cursor.position if self.cursor else None
+
+        ordering = reverse_ordering(self.ordering) if reverse else (
+            self.ordering)
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(
+                self.get_seek_filter(ordering, position))
+
+        # Лишняя строка показывает, есть ли следующая страница.
+        results = list(queryset[:self.page_size + 1])
+        self.page = results[:self.page_size]
+        following = None
+        if len(results) > len(self.page):
+            following = self._get_position_from_instance(
+                results[-1], self.ordering)
+
+        if reverse:
+            self.page.reverse()
+            self.has_next = position is not None
+            self.has_previous = following is not None
+            self.next_position, self.previous_position = position, following
+        else:
+            self.has_next = following is not None
+            self.has_previous = position is not None
+            self.next_position, self.previous_position = following, position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+        return self.page
+
+
+class PageNumberOrCursorPagination(PageNumberPagination):
+    """
+    Пагинация по номеру страницы с опциональным курсорным режимом.
+    Курсорный режим включается параметром `?pagination=cursor`,
+    наличием курсора в запросе или атрибутом `pagination_mode` вьюсета.
+    """
+    mode_query_param = 'pagination'
+    ordering = None
+    cursor_paginator = None
+    # Параметры со своим порядком выдачи, который курсор не сохранит.
+    cursor_incompatible_params = ()
+
+    def get_mode(self, request, view):
+        if CursorPagination.cursor_query_param in request.query_params:
+            return CURSOR_MODE
+        mode = request.query_params.get(self.mode_query_param)
+        if mode in (PAGE_MODE, CURSOR_MODE):
+            return mode
+        return getattr(view, 'pagination_mode', PAGE_MODE)
+
+    def get_cursor_paginator(self):
+        paginator = KeysetCursorPagination()
+        paginator.ordering = self.ordering
+        return paginator
+
+    def check_cursor_ordering(self, queryset, ordering):
+        """
+        Курсор сравнивает значения полей сортировки, а с NULL сравнение
+        не выполняется: строки с пустым значением пропали бы из выдачи.
+        """
+        opts = queryset.model._meta
+        for field_name in ordering:
+            name = field_name.lstrip('-')
+            field = opts.pk if name == 'pk' else opts.get_field(name)
+            if field.null:
+                raise ValidationError({'ordering': [
+                    f'Сортировка по `{name}` недоступна в курсорном режиме.'
+                ]})
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.get_mode(request, view) == CURSOR_MODE:
+            for param in self.cursor_incompatible_params:
+                if request.query_params.get(param):
+                    raise ValidationError({self.mode_query_param: [
+                        f'Параметр `{param}` недоступен в курсорном режиме.'
+                    ]})
+            self.cursor_paginator = self.get_cursor_paginator()
+            self.check_cursor_ordering(
+                queryset,
+                self.cursor_paginator.get_ordering(request, queryset, view)
+            )
+            return self.cursor_paginator.paginate_queryset(
+                queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def to_html(self):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.to_html()
+        return super().to_html()
+
+
+class TitlePagination(PageNumberOrCursorPagination):
+    ordering = ('name', 'id')
+    # Поиск упорядочен по релевантности.
+    cursor_incompatible_params = ('search',)
+
+
+class ReviewCommentPagination(PageNumberOrCursorPagination):
+    ordering = ('-pub_date', 'id')
@@ -26,5 +26,5 @@ class IsAdminModeratorAuthorOrReadOnly(permissions.IsAuthenticatedOrReadOnly):
             request.method in permissions.SAFE_METHODS
             or request.user.is_admin()
             or request.user.is_moderator()
-            or obj.author == request.user
+            or obj.author_id == request.user.id
         )
@@ -0,0 +1,150 @@
+"""
+Отзыв токенов доступа до истечения срока действия.
+
+`UserObtainTokenView` записывает идентификатор (jti) каждого выданного
+токена в `IssuedToken`. При смене роли, деактивации или удалении
+пользователя через `UserViewSet` его действующие токены попадают в
+`RevokedToken`.
+
+Каждый процесс держит jti отозванных токенов в фильтре Блума, и проверка
+токена не обращается к БД, пока фильтр отвечает «точно нет».
+Положительный ответ перепроверяется по таблице: ложное срабатывание
+фильтра стоит одного запроса и не отклоняет действующий токен. Версия
+списка хранится в общем кеше `STATE_CACHE`, и процесс, заметивший новую
+версию, перечитывает из таблицы ещё не истёкшие записи. Если этот кеш
+хранится в памяти процесса, версией служит последний id в `RevokedToken`,
+который проверяется не чаще раза в `REVOKED_TOKENS_CHECK_INTERVAL`
+секунд.
+"""
+import hashlib
+import math
+import time
+import uuid
+from threading import Lock
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from users.models import IssuedToken, RevokedToken
+from .cache import is_shared_cache, state_cache
+
+
+REVOKED_VERSION_KEY = 'revoked-tokens-version'
+
+
+class BloomFilter:
+    """
+    Фильтр Блума на `capacity` строк с долей ложных срабатываний около
+    `error_rate`. Позиции битов берутся двойным хешированием одного
+    дайджеста blake2b.
+    """
+
+    def __init__(self, capacity, error_rate):
+        self.size = max(8, math.ceil(
+            -capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def positions(self, key):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        return (
+            (first + number * second) % self.size
+            for number in range(self.hash_count)
+        )
+
+    def add(self, key):
+        for position in self.positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key):
+        return all(
+            self.bits[position >> 3] & (1 << (position & 7))
+            for position in self.positions(key)
+        )
+
+
+class RevocationList:
+    """Отозванные токены в фильтре Блума процесса."""
+
+    def __init__(self, capacity, error_rate):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.bloom = None
+        self.version = None
+        self.checked_at = None
+        self.lock = Lock()
+
+    def new_filter(self, count=0):
+        # С запасом, чтобы доля ложных срабатываний не росла до
+        # следующей перезагрузки.
+        return BloomFilter(max(self.capacity, 2 * count), self.error_rate)
+
+    def load(self, version):
+        jtis = list(
+            RevokedToken.objects.active().values_list('jti', flat=True))
+        bloom = self.new_filter(len(jtis))
+        for jti in jtis:
+            bloom.add(jti)
+        with self.lock:
+            self.bloom, self.version = bloom, version
+
+    def reset(self):
+        """Пустой список без чтения таблицы, например для новой БД."""
+        with self.lock:
+            self.bloom = self.new_filter()
+            self.version = (
+                state_cache.get(REVOKED_VERSION_KEY)
+                if is_shared_cache() else None
+            )
+            self.checked_at = time.monotonic()
+
+    def current_version(self):
+        if is_shared_cache():
+            return state_cache.get(REVOKED_VERSION_KEY)
+        now = time.monotonic()
+        interval = settings.REVOKED_TOKENS_CHECK_INTERVAL
+        if self.checked_at is not None and now - self.checked_at < interval:
+            return self.version
+        self.checked_at = now
+        return RevokedToken.objects.aggregate(version=Max('id'))['version']
+
+    def is_revoked(self, jti):
+        # Версия читается до загрузки: отзыв во время загрузки вызовет
+        # ещё одну перезагрузку при следующей проверке.
+        version = self.current_version()
+        if self.bloom is None or version != self.version:
+            self.load(version)
+        if jti not in self.bloom:
+            return False
+        return RevokedToken.objects.filter(jti=jti).exists()
+
+
+revocation_list = RevocationList(
+    settings.REVOKED_TOKENS_CAPACITY, settings.REVOKED_TOKENS_ERROR_RATE)
+
+
+def bump_revocation_version():
+    state_cache.set(REVOKED_VERSION_KEY, uuid.uuid4().hex, None)
+    # Без общего кеша этот процесс проверит версию по БД сразу.
+    revocation_list.checked_at = None
+
+
+def revoke_user_tokens(users):
+    """
+    Отзывает действующие токены пользователей: `users` — id или кверисет
+    пользователей. Процессы узнают об отзыве после фиксации транзакции.
+    """
+    revoked = [
+        RevokedToken(jti=jti, expires_at=expires_at)
+        for jti, expires_at in IssuedToken.objects.filter(
+            user__in=users, expires_at__gt=timezone.now()
+        ).values_list('jti', 'expires_at')
+    ]
+    if revoked:
+        RevokedToken.objects.bulk_create(revoked, ignore_conflicts=True)
+        transaction.on_commit(bump_revocation_version)
+    return len(revoked)
@@ -1,12 +1,27 @@
+import re
+
+from django.conf import settings
 from django.contrib.auth.validators import UnicodeUsernameValidator
+from django.db.models import Q
 from rest_framework import serializers
-from rest_framework.exceptions import ValidationError
 
-from reviews.models import Category, Comment, Genre, Title, Review
+from reviews.models import (
+    ACTIVITY_RETENTION_HOURS, Category, Comment, Genre, Review, Title
+)
 from users.models import User, MAX_LENGTH_USERNAME, MAX_LENGTH_EMAIL
 from users.validators import validate_username_not_prohibited
 
 
+LATEST_REVIEWS_LIMIT = 3
+LATEST_REVIEWS_MAX_LIMIT = 10
+LATEST_REVIEWS_MAX_TITLES = 50
+TRENDING_LIMIT = 10
+TRENDING_MAX_LIMIT = 50
+TRENDING_WINDOW_RE = re.compile(r'^(?P<count>[1-9]\d*)(?P<unit>[hd])$')
+TRENDING_WINDOW_UNITS = {'h': 1, 'd': 24}
+BULK_USERS_MAX_COUNT = 5000
+
+
 class RegistrationSerializer(serializers.Serializer):
     username = serializers.CharField(
         max_length=MAX_LENGTH_USERNAME,
@@ -19,9 +34,16 @@ class RegistrationSerializer(serializers.Serializer):
     def validate(self, data):
         super().validate(data)
 
-        user_for_email = User.objects.filter(email=data['email']).first()
-        user_for_username = User.objects.filter(
-            username=data['username']).first()
+        # Оба кандидата одним запросом: с таким email и с таким username.
+        users = User.objects.filter(
+            Q(email=data['email']) | Q(username=data['username'])
+        )[:2]
+        user_for_email = user_for_username = None
+        for user in users:
+            if user.email == data['email']:
+                user_for_email = user
+            if user.username == data['username']:
+                user_for_username = user
 
         if user_for_username != user_for_email:
             error_msg = {}
@@ -32,6 +54,7 @@ class RegistrationSerializer(serializers.Serializer):
                 error_msg['email'] = (
                     'Пользователь с таким email уже существует!')
             raise serializers.ValidationError(error_msg)
+        self.existing_user = user_for_email
         return data
 
 
@@ -86,6 +109,18 @@ class GenreSerializer(serializers.ModelSerializer):
         fields = ('name', 'slug')
 
 
+class TitleStatsSerializer(serializers.ModelSerializer):
+    reviews_count = serializers.IntegerField(source='rating_count')
+    average = serializers.FloatField(source='rating')
+    scores = serializers.DictField(
+        source='score_histogram', child=serializers.IntegerField()
+    )
+
+    class Meta:
+        model = Title
+        fields = ('reviews_count', 'average', 'scores')
+
+
 class TitleReadSerializer(serializers.ModelSerializer):
     category = CategorySerializer()
     genre = GenreSerializer(many=True)
@@ -103,6 +138,12 @@ class TitleReadSerializer(serializers.ModelSerializer):
             'category'
         )
 
+    def get_fields(self):
+        fields = super().get_fields()
+        if self.context.get('include_stats'):
+            fields['stats'] = TitleStatsSerializer(source='*', read_only=True)
+        return fields
+
 
 class TitleSerializer(serializers.ModelSerializer):
     category = serializers.SlugRelatedField(
@@ -129,7 +170,8 @@ class TitleSerializer(serializers.ModelSerializer):
         )
 
     def to_representation(self, instance):
-        representation = TitleReadSerializer(instance).data
+        representation = TitleReadSerializer(
+            instance, context=self.context).data
         return representation
 
 
@@ -140,15 +182,15 @@ class ReviewSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Review
-        fields = ('id', 'text', 'author', 'score', 'pub_date')
-
-    def validate(self, data):
-        request = self.context['request']
-        title_id = self.context.get('view').kwargs.get('title_id')
-        if (request.method == 'POST' and Review.objects.filter(
-                title_id=title_id, author=request.user).exists()):
-            raise ValidationError('Вы уже оставили отзыв!')
-        return data
+        fields = (
+            'id',
+            'text',
+            'author',
+            'score',
+            'pub_date',
+            'comment_count',
+            'last_comment_date'
+        )
 
 
 class CommentSerializer(serializers.ModelSerializer):
@@ -159,3 +201,80 @@ class CommentSerializer(serializers.ModelSerializer):
     class Meta:
         model = Comment
         fields = ('id', 'text', 'author', 'pub_date')
+
+
+class BulkUsersSerializer(serializers.Serializer):
+    usernames = serializers.ListField(
+        child=serializers.CharField(max_length=MAX_LENGTH_USERNAME),
+        min_length=1,
+        max_length=BULK_USERS_MAX_COUNT,
+    )
+
+    def validate_usernames(self, value):
+        usernames = list(dict.fromkeys(value))
+        if self.context['request'].user.username in usernames:
+            raise serializers.ValidationError(
+                'Нельзя изменить или удалить свою учётную запись массовым '
+                'действием.'
+            )
+        return usernames
+
+
+class BulkUserUpdateSerializer(BulkUsersSerializer):
+    role = serializers.ChoiceField(choices=User.UserRole.choices,
+                                   required=False)
+    is_active = serializers.BooleanField(required=False)
+
+    def validate(self, data):
+        if not {'role', 'is_active'} & data.keys():
+            raise serializers.ValidationError(
+                'Укажите новую роль `role` или активность `is_active`.')
+        return data
+
+
+class LatestReviewsParamsSerializer(serializers.Serializer):
+    title_ids = serializers.CharField()
+    limit = serializers.IntegerField(
+        min_value=1,
+        max_value=LATEST_REVIEWS_MAX_LIMIT,
+        default=LATEST_REVIEWS_LIMIT
+    )
+
+    def validate_title_ids(self, value):
+        try:
+            title_ids = list(dict.fromkeys(
+                int(title_id) for title_id in value.split(',')
+            ))
+        except ValueError:
+            raise serializers.ValidationError(
+                'Укажите id произведений через запятую.')
+        if len(title_ids) > LATEST_REVIEWS_MAX_TITLES:
+            raise serializers.ValidationError(
+                'Можно запросить не больше '
+                f'{LATEST_REVIEWS_MAX_TITLES} произведений.'
+            )
+        return title_ids
+
+
+class TrendingParamsSerializer(serializers.Serializer):
+    window = serializers.CharField(default=settings.TRENDING_WINDOW)
+    limit = serializers.IntegerField(
+        min_value=1,
+        max_value=TRENDING_MAX_LIMIT,
+        default=TRENDING_LIMIT
+    )
+
+    def validate_window(self, value):
+        """Переводит окно вида `24h` или `7d` в часы."""
+        match = TRENDING_WINDOW_RE.match(value)
+        if match is None:
+            raise serializers.ValidationError(
+                'Укажите окно в часах или днях, например 24h или 7d.')
+        hours = (
+            int(match['count']) * TRENDING_WINDOW_UNITS[match['unit']])
+        if hours > ACTIVITY_RETENTION_HOURS:
+            raise serializers.ValidationError(
+                'Окно не может быть больше '
+                f'{ACTIVITY_RETENTION_HOURS // 24} дней.'
+            )
+        return hours
@@ -0,0 +1,136 @@
+from threading import local
+
+from django.db import transaction
+from django.db.models.signals import (
+    m2m_changed, post_delete, post_save, pre_save
+)
+from django.dispatch import receiver
+
+from reviews.models import Category, Comment, Genre, Review, Title
+from reviews.signals import aggregates_rebuilt, deleting_ids
+from users.models import User
+from .authentication import mark_users_changed_on_commit
+from .cache import (
+    REVIEW_COMMENTS, TITLE_REVIEWS, bump_version, bump_versions_on_commit
+)
+from .leaderboards import (
+    invalidate_leaderboards_on_commit, update_titles_on_commit
+)
+
+
+CACHE_RESOURCES = {
+    Category: 'category',
+    Comment: 'comment',
+    Genre: 'genre',
+    Review: 'review',
+    Title: 'title',
+}
+
+_pending = local()
+
+
+def bump_model_version(sender, **kwargs):
+    bump_versions_on_commit(CACHE_RESOURCES[sender])
+
+
+for model in CACHE_RESOURCES:
+    post_save.connect(bump_model_version, sender=model)
+    post_delete.connect(bump_model_version, sender=model)
+
+
+@receiver(post_delete, sender=Title)
+def bump_title_reviews_on_title_delete(sender, instance, **kwargs):
+    bump_versions_on_commit(TITLE_REVIEWS.format(instance.pk))
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def bump_title_reviews_version(sender, instance, **kwargs):
+    # Удаление произведения сбрасывает версию его отзывов один раз.
+    if instance.title_id in deleting_ids(Title):
+        return
+    title_ids = {getattr(instance, '_previous_title_id', None),
+                 instance.title_id} - {None}
+    bump_versions_on_commit(
+        *(TITLE_REVIEWS.format(title_id) for title_id in title_ids))
+
+
+def bump_pending_review_titles():
+    review_ids = _pending.__dict__.pop('review_ids', None)
+    if not review_ids:
+        return
+    title_ids = Review.objects.filter(pk__in=review_ids).values_list(
+        'title_id', flat=True).distinct()
+    for title_id in title_ids:
+        bump_version(TITLE_REVIEWS.format(title_id))
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def bump_review_comments_version(sender, instance, **kwargs):
+    if instance.review_id in deleting_ids(Review):
+        return
+    bump_versions_on_commit(REVIEW_COMMENTS.format(instance.review_id))
+    # В списке отзывов есть число комментариев и дата последнего.
+    if Comment.review.is_cached(instance):
+        bump_versions_on_commit(
+            TITLE_REVIEWS.format(instance.review.title_id))
+        return
+    # Удаление пользователя удаляет его комментарии к чужим отзывам:
+    # их произведения читаются одним запросом после фиксации.
+    _pending.__dict__.setdefault('review_ids', set()).add(instance.review_id)
+    transaction.on_commit(bump_pending_review_titles)
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def bump_title_genre_version(sender, action, **kwargs):
+    if action.startswith('post_'):
+        bump_versions_on_commit('title')
+        invalidate_leaderboards_on_commit()
+
+
+@receiver(pre_save, sender=Review)
+def remember_review_title(sender, instance, **kwargs):
+    instance._previous_title_id = getattr(instance, '_loaded_title_id', None)
+
+
+@receiver(post_save, sender=Review)
+def update_leaderboards_on_review_save(sender, instance, **kwargs):
+    update_titles_on_commit(
+        *{instance._previous_title_id, instance.title_id} - {None})
+
+
+@receiver(post_delete, sender=Review)
+def update_leaderboards_on_review_delete(sender, instance, **kwargs):
+    update_titles_on_commit(instance.title_id)
+
+
+def invalidate_leaderboards_on_change(sender, created=False, **kwargs):
+    # Новое произведение без отзывов в таблицы лидеров не попадает.
+    if not (sender is Title and created):
+        invalidate_leaderboards_on_commit()
+
+
+for model in (Category, Genre, Title):
+    post_save.connect(invalidate_leaderboards_on_change, sender=model)
+    post_delete.connect(invalidate_leaderboards_on_change, sender=model)
+
+
+@receiver(post_save, sender=User)
+def bump_user_version_on_save(sender, instance, created, **kwargs):
+    # У нового пользователя ещё нет отзывов, комментариев и токенов.
+    if not created:
+        bump_versions_on_commit('user')
+        mark_users_changed_on_commit((instance.pk,))
+
+
+@receiver(post_delete, sender=User)
+def bump_user_version_on_delete(sender, instance, **kwargs):
+    bump_versions_on_commit('user')
+    mark_users_changed_on_commit((instance.pk,))
+
+
+@receiver(aggregates_rebuilt)
+def bump_rebuilt_version(sender, **kwargs):
+    bump_versions_on_commit(*CACHE_RESOURCES.values(), 'user')
+    invalidate_leaderboards_on_commit()
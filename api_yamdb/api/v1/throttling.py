@@ -0,0 +1,174 @@
+"""
+Ограничение частоты запросов к регистрации и получению токена.
+
+Каждому ключу (IP-адресу, username или email) соответствует корзина
+токенов: запрос забирает токен, а корзина пополняется с постоянной
+скоростью до своей ёмкости. Ёмкость и скорость задаются в
+`DEFAULT_THROTTLE_RATES` как в DRF: `'5/min'` — пять запросов подряд и
+пять новых токенов в минуту.
+
+По умолчанию корзины хранятся в памяти процесса без блокировок:
+состояние корзины заменяется одной записью в словарь, поэтому при
+одновременных запросах ограничение может пропустить лишний запрос, но не
+сломается. При нескольких воркерах корзины можно хранить в общем кеше
+Django (`THROTTLE_CACHE`), например файловом или в memcached.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+
+KEY = 'throttle:{}:{}'
+DURATIONS = {'s': 1, 'm': 60, 'h': 60 * 60, 'd': 24 * 60 * 60}
+MAX_LOCAL_KEYS = 100_000
+REJECTED_ATTR = '_token_bucket_rejected'
+
+
+def parse_rate(rate):
+    """Ёмкость корзины и скорость пополнения в токенах в секунду."""
+    count, period = rate.split('/')
+    capacity = int(count)
+    return capacity, capacity / DURATIONS[period[0]]
+
+
+def take_token(state, capacity, rate, now):
+    """
+    Новое состояние корзины и время ожидания до следующего токена.
+    Нулевое ожидание значит, что токен выдан.
+    """
+    tokens, updated = state or (capacity, now)
+    tokens = min(capacity, tokens + (now - updated) * rate)
+    if tokens < 1:
+        return (tokens, now), (1 - tokens) / rate
+    return (tokens - 1, now), 0
+
+
+class LocalBucketStore:
+    """Корзины в памяти процесса."""
+
+    def __init__(self, max_keys=MAX_LOCAL_KEYS):
+        self.max_keys = max_keys
+        self.buckets = {}
+
+    def take(self, key, capacity, rate):
+        now = time.monotonic()
+        # Корзина переставляется в конец словаря, так что первыми в нём
+        # идут давно не обновлявшиеся, то есть уже пополненные, корзины.
+        state, wait = take_token(
+            self.buckets.pop(key, None), capacity, rate, now)
+        self.buckets[key] = state
+        while len(self.buckets) > self.max_keys:
+            self.buckets.pop(next(iter(self.buckets)), None)
+        return wait
+
+    def clear(self):
+        self.buckets.clear()
+
+
+class CacheBucketStore:
+    """Корзины в общем для воркеров кеше Django."""
+
+    def __init__(self, alias):
+        self.cache = caches[alias]
+
+    def take(self, key, capacity, rate):
+        now = time.time()
+        state, wait = take_token(self.cache.get(key), capacity, rate, now)
+        # Полная корзина не отличается от отсутствующей.
+        self.cache.set(key, state, timeout=int(capacity / rate) + 1)
+        return wait
+
+    def clear(self):
+        self.cache.clear()
+
+
+local_store = LocalBucketStore()
+
+
+def get_store():
+    if settings.THROTTLE_CACHE:
+        return CacheBucketStore(settings.THROTTLE_CACHE)
+    return local_store
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Базовый класс ограничений: каждый ключ из `get_keys` расходует токен
+    из своей корзины, запрос отклоняется, если хотя бы одна корзина пуста.
+    """
+    scope = None
+
+    def __init__(self):
+        self.capacity, self.rate = parse_rate(
+            api_settings.DEFAULT_THROTTLE_RATES[self.scope])
+        self.wait_seconds = 0
+
+    def get_keys(self, request):
+        raise NotImplementedError
+
+    def allow_request(self, request, view):
+        # DRF проверяет все ограничения. Запрос, уже отклонённый другим
+        # ограничением, не расходует токены и не заводит новых корзин.
+        if getattr(request, REJECTED_ATTR, False):
+            return True
+        store = get_store()
+        self.wait_seconds = max(
+            (
+                store.take(KEY.format(self.scope, key), self.capacity,
+                           self.rate)
+                for key in self.get_keys(request)
+            ),
+            default=0
+        )
+        if self.wait_seconds:
+            setattr(request, REJECTED_ATTR, True)
+        return not self.wait_seconds
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class IPThrottle(TokenBucketThrottle):
+    """Ограничение по IP-адресу клиента."""
+
+    def get_keys(self, request):
+        return (self.get_ident(request),)
+
+
+class IdentityThrottle(TokenBucketThrottle):
+    """Ограничение по значениям полей запроса: username, email."""
+    fields = ()
+
+    def get_keys(self, request):
+        data = request.data if hasattr(request.data, 'get') else {}
+        keys = []
+        for field in self.fields:
+            value = data.get(field)
+            if isinstance(value, str) and value.strip():
+                # Данные ещё не проверены: в ключ кеша попадает только хеш.
+                digest = hashlib.sha1(
+                    value.strip().lower().encode()).hexdigest()
+                keys.append(f'{field}:{digest}')
+        return keys
+
+
+class SignupIPThrottle(IPThrottle):
+    scope = 'signup_ip'
+
+
+class SignupIdentityThrottle(IdentityThrottle):
+    scope = 'signup_identity'
+    fields = ('username', 'email')
+
+
+class TokenIPThrottle(IPThrottle):
+    scope = 'token_ip'
+
+
+class TokenIdentityThrottle(IdentityThrottle):
+    scope = 'token_identity'
+    fields = ('username',)
@@ -2,8 +2,9 @@ from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
 from .views import (
-    CategoryViewSet, CommentViewSet, GenreViewSet, RegistrationView,
-    ReviewViewSet, TitleViewSet, UserObtainTokenView, UserViewSet
+    CategoryViewSet, CommentViewSet, GenreViewSet, LeaderboardViewSet,
+    RegistrationView, ReviewViewSet, TitleViewSet, UserObtainTokenView,
+    UserViewSet
 )
 
 
@@ -17,6 +18,9 @@ v1_router.register(
 )
 v1_router.register('categories', CategoryViewSet, basename='categories')
 v1_router.register('genres', GenreViewSet, basename='genres')
+v1_router.register(
+    'leaderboards', LeaderboardViewSet, basename='leaderboards'
+)
 v1_router.register('titles', TitleViewSet, basename='titles')
 v1_router.register('users', UserViewSet, basename='users')
 
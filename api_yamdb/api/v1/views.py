@@ -1,27 +1,52 @@
 from django.contrib.auth.tokens import default_token_generator
-from django.db.models import Avg
+from django.db import IntegrityError, transaction
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import filters, status, viewsets
+from rest_framework import status, viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import AccessToken
+from rest_framework.settings import api_settings
 from rest_framework.views import APIView
 
-from reviews.models import Category, Genre, Review, Title
+from reviews.models import (
+    Category, Genre, Review, SimilarTitle, Title, TitleActivityBucket
+)
+from reviews.signals import aggregates_rebuilt
 from users.models import User
-from .filters import TitleFilter
+from .authentication import (
+    get_full_user, issue_token, mark_users_changed_on_commit,
+    token_fields_changed
+)
+from .cache import (
+    REVIEW_COMMENTS, TITLE_REVIEWS, CachedReadMixin, bump_versions_on_commit
+)
+from .export import (
+    EXPORT_CONTENT_TYPES, EXPORTERS, NDJSON, iterate_in_chunks
+)
+from .filters import StableOrderingFilter, TitleFilter, UserFilter
+from .leaderboards import (
+    CATEGORY_BOARD, GENRE_BOARD, GLOBAL_BOARD, get_leaderboard
+)
+from .pagination import ReviewCommentPagination, TitlePagination
 from .viewsets import CategoryGenreViewSet
 from .utils import send_confirmation_code
 from .permissions import (
     IsAdminOnly, IsAdminOrReadOnly, IsAdminModeratorAuthorOrReadOnly)
+from .revocation import revoke_user_tokens
+from .throttling import (
+    SignupIdentityThrottle, SignupIPThrottle, TokenIdentityThrottle,
+    TokenIPThrottle
+)
 from .serializers import (
-    CategorySerializer, CommentSerializer, GenreSerializer,
+    BulkUsersSerializer, BulkUserUpdateSerializer, CategorySerializer,
+    CommentSerializer, GenreSerializer, LatestReviewsParamsSerializer,
     RegistrationSerializer, ReviewSerializer, TitleReadSerializer,
-    TitleSerializer, UserObtainTokenSerializer, UserProfileSerializer,
-    UserSerializer
+    TitleSerializer, TitleStatsSerializer, TrendingParamsSerializer,
+    UserObtainTokenSerializer, UserProfileSerializer, UserSerializer
 )
 
 
@@ -31,14 +56,23 @@ class RegistrationView(APIView):
     Высылает код подтверждения для получения токена.
     """
     permission_classes = (AllowAny,)
+    throttle_classes = (SignupIPThrottle, SignupIdentityThrottle)
 
     def post(self, request):
         serializer = RegistrationSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         data = serializer.validated_data
         email = data['email']
-        user, created = User.objects.get_or_create(
-            username=data['username'], email=email)
+        user = serializer.existing_user
+        if user is None:
+            try:
+                user = User.objects.create(
+                    username=data['username'], email=email)
+            except IntegrityError:
+                # Параллельная регистрация с тем же username или email.
+                serializer = RegistrationSerializer(data=request.data)
+                serializer.is_valid(raise_exception=True)
+                user = serializer.existing_user
         confirmation_code = default_token_generator.make_token(user)
         send_confirmation_code(confirmation_code, email)
         return Response(
@@ -50,6 +84,7 @@ class RegistrationView(APIView):
 class UserObtainTokenView(APIView):
     """Вьюсет для получения JWT-токена."""
     permission_classes = (AllowAny,)
+    throttle_classes = (TokenIPThrottle, TokenIdentityThrottle)
 
     def post(self, request):
         serializer = UserObtainTokenSerializer(data=request.data)
@@ -65,7 +100,7 @@ class UserObtainTokenView(APIView):
                 {'confirmation_code': ['Неверный код подтверждения!']},
                 status=status.HTTP_400_BAD_REQUEST
             )
-        token = AccessToken.for_user(user)
+        token = issue_token(user)
         return Response(
             {'token': str(token)}, status=status.HTTP_200_OK)
 
@@ -75,8 +110,8 @@ class UserViewSet(viewsets.ModelViewSet):
     queryset = User.objects.all()
     permission_classes = (IsAdminOnly,)
     pagination_class = PageNumberPagination
-    filter_backends = (filters.SearchFilter,)
-    search_fields = ('username',)
+    filter_backends = (DjangoFilterBackend,)
+    filterset_class = UserFilter
     lookup_field = 'username'
     http_method_names = ('get', 'post', 'patch', 'delete')
 
@@ -85,6 +120,21 @@ class UserViewSet(viewsets.ModelViewSet):
             return UserSerializer
         return UserProfileSerializer
 
+    def perform_update(self, serializer):
+        if not token_fields_changed(
+                serializer.instance, serializer.validated_data):
+            super().perform_update(serializer)
+            return
+        with transaction.atomic():
+            # Имя и права в старых токенах больше не действуют.
+            revoke_user_tokens((serializer.instance.pk,))
+            serializer.save()
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            revoke_user_tokens((instance.pk,))
+            instance.delete()
+
     @action(
         detail=False,
         methods=('get', 'patch',),
@@ -92,75 +142,325 @@ class UserViewSet(viewsets.ModelViewSet):
         permission_classes=(IsAuthenticated,)
     )
     def get_me(self, request):
+        # В токене только часть полей, профиль нужен целиком.
+        user = get_full_user(request.user.pk)
         serializer_class = self.get_serializer_class()
         if request.method == 'PATCH':
             serializer = serializer_class(
-                request.user,
+                user,
                 data=request.data,
                 partial=True
             )
             serializer.is_valid(raise_exception=True)
-            serializer.save()
+            self.perform_update(serializer)
             return Response(serializer.data, status=status.HTTP_200_OK)
-        serializer = serializer_class(request.user)
+        serializer = serializer_class(user)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
+    def get_bulk_users(self, serializer):
+        serializer.is_valid(raise_exception=True)
+        usernames = serializer.validated_data['usernames']
+        ids = dict(User.objects.filter(
+            username__in=usernames).values_list('username', 'id'))
+        users = {
+            username: ids[username] for username in usernames
+            if username in ids
+        }
+        return users, [
+            username for username in usernames if username not in ids]
+
+    @action(detail=False, methods=('post',), url_path='bulk-update')
+    def bulk_update(self, request):
+        """Меняет роль или активность списка пользователей одним запросом."""
+        serializer = BulkUserUpdateSerializer(
+            data=request.data, context={'request': request})
+        users, not_found = self.get_bulk_users(serializer)
+        changes = {
+            field: serializer.validated_data[field]
+            for field in ('role', 'is_active')
+            if field in serializer.validated_data
+        }
+        selected = User.objects.filter(id__in=users.values())
+        revoked = User.objects.none()
+        if 'role' in changes:
+            revoked |= selected.exclude(role=changes['role'])
+        if changes.get('is_active') is False:
+            revoked |= selected.filter(is_active=True)
+        with transaction.atomic():
+            revoke_user_tokens(revoked)
+            selected.update(**changes)
+            mark_users_changed_on_commit(list(users.values()))
+            bump_versions_on_commit('user')
+        return Response({'updated': list(users), 'not_found': not_found})
+
+    @action(detail=False, methods=('post',), url_path='bulk-delete')
+    def bulk_delete(self, request):
+        """
+        Удаляет список пользователей вместе с их отзывами и комментариями
+        и пересчитывает рейтинги затронутых произведений.
+        """
+        serializer = BulkUsersSerializer(
+            data=request.data, context={'request': request})
+        users, not_found = self.get_bulk_users(serializer)
+        with transaction.atomic():
+            revoke_user_tokens(list(users.values()))
+            reviews, comments = Review.objects.delete_by_authors(
+                list(users.values()))
+            User.objects.filter(id__in=users.values()).delete()
+            aggregates_rebuilt.send(sender=self.__class__)
+        return Response({
+            'deleted': list(users),
+            'not_found': not_found,
+            'reviews_deleted': reviews,
+            'comments_deleted': comments,
+        })
+
 
 class CategoryViewSet(CategoryGenreViewSet):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
+    cache_resources = ('category',)
 
 
 class GenreViewSet(CategoryGenreViewSet):
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
+    cache_resources = ('genre',)
 
 
-class TitleViewSet(viewsets.ModelViewSet):
-    queryset = Title.objects.all().annotate(rating=Avg('reviews__score'))
+class TitleViewSet(CachedReadMixin, viewsets.ModelViewSet):
+    queryset = Title.objects.select_related(
+        'category').prefetch_related('genre')
     permission_classes = (IsAdminOrReadOnly,)
-    pagination_class = PageNumberPagination
+    pagination_class = TitlePagination
     filter_backends = (DjangoFilterBackend,)
     filterset_class = TitleFilter
     http_method_names = ['get', 'post', 'patch', 'delete']
+    cache_resources = ('title', 'genre', 'category', 'review')
+    latest_reviews_cache_resources = ('review', 'comment', 'user')
+
+    def get_cache_resources(self):
+        if self.action == 'latest_reviews':
+            return self.latest_reviews_cache_resources
+        return super().get_cache_resources()
+
+    @property
+    def include_stats(self):
+        include = self.request.query_params.get('include', '')
+        return 'stats' in include.split(',')
+
+    def get_queryset(self):
+        if self.action == 'stats':
+            return Title.objects.prefetch_related('score_counts')
+        if self.action == 'similar':
+            return Title.objects.only('id')
+        queryset = super().get_queryset()
+        if self.include_stats:
+            queryset = queryset.prefetch_related('score_counts')
+        return queryset
 
     def get_serializer_class(self):
         if self.action in ('list', 'retrieve'):
             return TitleReadSerializer
         return TitleSerializer
 
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['include_stats'] = self.include_stats
+        return context
+
+    @action(detail=True, methods=('get',), url_path='stats')
+    def stats(self, request, pk=None):
+        """Распределение оценок, количество отзывов и средняя оценка."""
+        return self.get_cached_response(self.get_stats, request, pk=pk)
+
+    def get_stats(self, request, pk=None):
+        serializer = TitleStatsSerializer(self.get_object())
+        return Response(serializer.data)
+
+    @action(detail=True, methods=('get',), url_path='similar')
+    def similar(self, request, pk=None):
+        """Похожие произведения по совместным оценкам пользователей."""
+        return self.get_cached_response(self.get_similar, request, pk=pk)
+
+    def get_similar(self, request, pk=None):
+        title = self.get_object()
+        neighbours = SimilarTitle.objects.filter(title=title).select_related(
+            'similar__category'
+        ).prefetch_related('similar__genre').order_by('-similarity')
+        data = []
+        for neighbour in neighbours:
+            title_data = TitleReadSerializer(
+                neighbour.similar, context=self.get_serializer_context()
+            ).data
+            title_data['similarity'] = round(neighbour.similarity, 4)
+            data.append(title_data)
+        return Response(data)
+
+    @action(detail=False, methods=('get',), url_path='trending')
+    def trending(self, request):
+        """Произведения с наибольшей активностью за последнее время."""
+        params = TrendingParamsSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        scores = dict(
+            TitleActivityBucket.objects.trending(
+                params.validated_data['window']
+            )[:params.validated_data['limit']]
+        )
+        titles = self.get_queryset().in_bulk(scores)
+        data = []
+        for title_id, score in scores.items():
+            title_data = TitleReadSerializer(
+                titles[title_id], context=self.get_serializer_context()
+            ).data
+            title_data['trending_score'] = score
+            data.append(title_data)
+        return Response(data)
+
+    @action(detail=False, methods=('get',), url_path='latest-reviews')
+    def latest_reviews(self, request):
+        """Последние отзывы на несколько произведений за один запрос."""
+        return self.get_cached_response(self.get_latest_reviews, request)
+
+    def get_latest_reviews(self, request):
+        params = LatestReviewsParamsSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        title_ids = params.validated_data['title_ids']
+        reviews = {title_id: [] for title_id in title_ids}
+        for review in Review.objects.latest_by_title(
+                title_ids, params.validated_data['limit']):
+            reviews[review.title_id].append(review)
+        return Response([
+            {
+                'title_id': title_id,
+                'reviews': ReviewSerializer(
+                    title_reviews, many=True, context={'request': request}
+                ).data
+            }
+            for title_id, title_reviews in reviews.items()
+        ])
+
+    @action(
+        detail=False,
+        methods=('get',),
+        url_path='export',
+        permission_classes=(IsAdminOnly,)
+    )
+    def export(self, request):
+        """Потоковая выгрузка каталога в формате NDJSON или CSV."""
+        export_format = request.query_params.get('export_format', NDJSON)
+        if export_format not in EXPORTERS:
+            raise ValidationError({'export_format': [
+                f'Доступные форматы: {", ".join(EXPORTERS)}.'
+            ]})
+        titles = iterate_in_chunks(self.filter_queryset(self.get_queryset()))
+        response = StreamingHttpResponse(
+            EXPORTERS[export_format](titles),
+            content_type=EXPORT_CONTENT_TYPES[export_format]
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="titles.{export_format}"')
+        return response
+
+
+class LeaderboardViewSet(viewsets.ViewSet):
+    """
+    Вьюсет таблиц лидеров: произведения с наибольшим рейтингом во всём
+    каталоге, в категории и в жанре. Таблицы читаются из кеша.
+    """
+    permission_classes = (AllowAny,)
+
+    def get_leaderboard_response(self, board):
+        leaderboard = get_leaderboard(board)
+        if leaderboard is None:
+            raise NotFound
+        return Response(leaderboard)
 
-class ReviewViewSet(viewsets.ModelViewSet):
+    def list(self, request):
+        return self.get_leaderboard_response(GLOBAL_BOARD)
+
+    @action(detail=False, methods=('get',),
+            url_path=r'categories/(?P<slug>[-a-zA-Z0-9_]+)')
+    def category(self, request, slug):
+        return self.get_leaderboard_response(CATEGORY_BOARD.format(slug))
+
+    @action(detail=False, methods=('get',),
+            url_path=r'genres/(?P<slug>[-a-zA-Z0-9_]+)')
+    def genre(self, request, slug):
+        return self.get_leaderboard_response(GENRE_BOARD.format(slug))
+
+
+class ReviewViewSet(CachedReadMixin, viewsets.ModelViewSet):
     serializer_class = ReviewSerializer
     permission_classes = (IsAdminModeratorAuthorOrReadOnly,)
-    pagination_class = PageNumberPagination
+    pagination_class = ReviewCommentPagination
+    filter_backends = (StableOrderingFilter,)
+    ordering_fields = ('pub_date', 'comment_count', 'last_comment_date')
+    ordering = ('-pub_date', 'id')
     http_method_names = ['get', 'post', 'patch', 'delete']
+    # Имена авторов; версия сбрасывается и при массовых изменениях.
+    cache_resources = ('user',)
+
+    def get_cache_resources(self):
+        # Отзывы и комментарии других произведений ответ не меняют.
+        return (
+            TITLE_REVIEWS.format(int(self.kwargs['title_id'])),
+            *super().get_cache_resources()
+        )
 
     def get_title(self):
-        return get_object_or_404(Title, id=self.kwargs.get('title_id'))
+        # Вьюсет создаётся на каждый запрос, поэтому произведение
+        # достаточно загрузить один раз.
+        if not hasattr(self, '_title'):
+            self._title = get_object_or_404(
+                Title, id=self.kwargs.get('title_id'))
+        return self._title
 
     def get_queryset(self):
-        return self.get_title().reviews.all()
+        return self.get_title().reviews.select_related('author')
 
     def perform_create(self, serializer):
-        serializer.save(author=self.request.user, title=self.get_title())
+        # Повторный отзыв отсекает ограничение `unique review` в БД:
+        # отдельная проверка перед вставкой не защищает от гонки.
+        try:
+            serializer.save(author=self.request.user, title=self.get_title())
+        except IntegrityError:
+            if not Review.objects.filter(
+                    title=self.get_title(), author=self.request.user
+            ).exists():
+                raise
+            raise ValidationError(
+                {api_settings.NON_FIELD_ERRORS_KEY: ['Вы уже оставили отзыв!']}
+            )
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(CachedReadMixin, viewsets.ModelViewSet):
     serializer_class = CommentSerializer
     permission_classes = (IsAdminModeratorAuthorOrReadOnly,)
-    pagination_class = PageNumberPagination
+    pagination_class = ReviewCommentPagination
     http_method_names = ['get', 'post', 'patch', 'delete']
+    cache_resources = ('user',)
 
-    def get_review(self):
-        return get_object_or_404(
-            Review,
-            id=self.kwargs['review_id'],
-            title=self.kwargs['title_id']
+    def get_cache_resources(self):
+        # Отзывы произведения: удаление отзыва или произведения тоже
+        # сбрасывает комментарии.
+        return (
+            TITLE_REVIEWS.format(int(self.kwargs['title_id'])),
+            REVIEW_COMMENTS.format(int(self.kwargs['review_id'])),
+            *super().get_cache_resources()
         )
 
+    def get_review(self):
+        if not hasattr(self, '_review'):
+            self._review = get_object_or_404(
+                Review,
+                id=self.kwargs['review_id'],
+                title=self.kwargs['title_id']
+            )
+        return self._review
+
     def get_queryset(self):
-        return self.get_review().comments.all()
+        return self.get_review().comments.select_related('author')
 
     def perform_create(self, serializer):
         serializer.save(author=self.request.user, review=self.get_review())
@@ -1,12 +1,13 @@
 from rest_framework import filters, mixins, viewsets
 from rest_framework.pagination import PageNumberPagination
 
+from .cache import CachedListMixin
 from .permissions import IsAdminOrReadOnly
 
 
 class CategoryGenreViewSet(
-    mixins.ListModelMixin, mixins.CreateModelMixin, mixins.DestroyModelMixin,
-    viewsets.GenericViewSet
+    CachedListMixin, mixins.ListModelMixin, mixins.CreateModelMixin,
+    mixins.DestroyModelMixin, viewsets.GenericViewSet
 ):
     permission_classes = (IsAdminOrReadOnly,)
     pagination_class = PageNumberPagination
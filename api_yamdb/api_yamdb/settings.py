@@ -1,4 +1,5 @@
 import os
+import tempfile
 from datetime import timedelta
 from pathlib import Path
 
@@ -79,6 +80,90 @@ DATABASES = {
 }
 
 
+# Cache
+
+# Закешированные ответы и таблицы лидеров. Файловый и локальный кеш
+# при заполнении удаляют каждую CULL_FREQUENCY-ю запись, не разбирая,
+# какая из них нужнее, поэтому размер задан явно.
+# Остальным бэкендам, например memcached, эти параметры не передаются.
+CULLED_CACHE_BACKENDS = tuple(
+    f'django.core.cache.backends.{backend}'
+    for backend in (
+        'filebased.FileBasedCache', 'locmem.LocMemCache', 'db.DatabaseCache')
+)
+CACHE_BACKEND = os.getenv(
+    'CACHE_BACKEND', 'django.core.cache.backends.filebased.FileBasedCache')
+CACHE_OPTIONS = {}
+if CACHE_BACKEND in CULLED_CACHE_BACKENDS:
+    CACHE_OPTIONS = {
+        'MAX_ENTRIES': int(os.getenv('CACHE_MAX_ENTRIES', 10000)),
+        'CULL_FREQUENCY': int(os.getenv('CACHE_CULL_FREQUENCY', 4)),
+    }
+
+# Версии ответов, отметки об изменении пользователей и версия списка
+# отозванных токенов. Они должны быть видны всем воркерам и не должны
+# вытесняться закешированными ответами, поэтому хранятся отдельно, а
+# записей в этом кеше немного. Для нескольких серверов укажите общий
+# бэкенд без вытеснения, например redis с maxmemory-policy noeviction.
+STATE_CACHE = 'state'
+STATE_CACHE_BACKEND = os.getenv(
+    'STATE_CACHE_BACKEND',
+    'django.core.cache.backends.filebased.FileBasedCache'
+)
+STATE_CACHE_OPTIONS = {}
+if STATE_CACHE_BACKEND in CULLED_CACHE_BACKENDS:
+    STATE_CACHE_OPTIONS = {'MAX_ENTRIES': 10 ** 9}
+
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKEND,
+        'LOCATION': os.getenv(
+            'CACHE_LOCATION',
+            os.path.join(tempfile.gettempdir(), 'api_yamdb_cache')
+        ),
+        'OPTIONS': CACHE_OPTIONS,
+    },
+    STATE_CACHE: {
+        'BACKEND': STATE_CACHE_BACKEND,
+        'LOCATION': os.getenv(
+            'STATE_CACHE_LOCATION',
+            os.path.join(tempfile.gettempdir(), 'api_yamdb_state')
+        ),
+        'OPTIONS': STATE_CACHE_OPTIONS,
+    },
+}
+
+# Общее хранилище ограничений частоты запросов для нескольких воркеров,
+# например django.core.cache.backends.filebased.FileBasedCache.
+# Без него корзины хранятся в памяти каждого процесса.
+THROTTLE_CACHE = None
+if os.getenv('THROTTLE_CACHE_BACKEND'):
+    CACHES['throttle'] = {
+        'BACKEND': os.getenv('THROTTLE_CACHE_BACKEND'),
+        'LOCATION': os.getenv('THROTTLE_CACHE_LOCATION', 'api_yamdb_throttle'),
+    }
+    THROTTLE_CACHE = 'throttle'
+
+RESPONSE_CACHE_TIMEOUT = int(os.getenv('RESPONSE_CACHE_TIMEOUT', 60 * 60))
+
+LEADERBOARD_SIZE = int(os.getenv('LEADERBOARD_SIZE', 10))
+LEADERBOARD_MIN_REVIEWS = int(os.getenv('LEADERBOARD_MIN_REVIEWS', 3))
+
+TRENDING_WINDOW = os.getenv('TRENDING_WINDOW', '24h')
+
+USER_CACHE_SIZE = int(os.getenv('USER_CACHE_SIZE', 1024))
+USER_CACHE_TIMEOUT = int(os.getenv('USER_CACHE_TIMEOUT', 60))
+
+TOKEN_CACHE_SIZE = int(os.getenv('TOKEN_CACHE_SIZE', 4096))
+TOKEN_CACHE_TIMEOUT = int(os.getenv('TOKEN_CACHE_TIMEOUT', 5 * 60))
+REVOKED_TOKENS_CAPACITY = int(os.getenv('REVOKED_TOKENS_CAPACITY', 100000))
+REVOKED_TOKENS_ERROR_RATE = float(
+    os.getenv('REVOKED_TOKENS_ERROR_RATE', 0.01))
+# Как часто проверять отзыв токенов по БД, если кеш не общий.
+REVOKED_TOKENS_CHECK_INTERVAL = int(
+    os.getenv('REVOKED_TOKENS_CHECK_INTERVAL', 5))
+
+
 # Password validation
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -124,13 +209,20 @@ REST_FRAMEWORK = {
     ],
 
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.v1.authentication.JWTClaimsAuthentication',
     ),
 
     'DEFAULT_PAGINATION_CLASS': (
         'rest_framework.pagination.PageNumberPagination',
     ),
     'PAGE_SIZE': 5,
+
+    'DEFAULT_THROTTLE_RATES': {
+        'signup_ip': os.getenv('THROTTLE_SIGNUP_IP', '20/min'),
+        'signup_identity': os.getenv('THROTTLE_SIGNUP_IDENTITY', '5/min'),
+        'token_ip': os.getenv('THROTTLE_TOKEN_IP', '30/min'),
+        'token_identity': os.getenv('THROTTLE_TOKEN_IDENTITY', '10/min'),
+    },
 }
 
 
@@ -145,3 +237,9 @@ EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
 
 EMAIL_HOST_USER = 'api_yamdb@example.com'
+
+# Воркеры очереди писем в процессе; 0 — отправка сразу после запроса.
+EMAIL_QUEUE_WORKERS = int(os.getenv('EMAIL_QUEUE_WORKERS', 2))
+EMAIL_BATCH_SIZE = int(os.getenv('EMAIL_BATCH_SIZE', 50))
+EMAIL_MAX_ATTEMPTS = int(os.getenv('EMAIL_MAX_ATTEMPTS', 5))
+EMAIL_RETRY_DELAY = int(os.getenv('EMAIL_RETRY_DELAY', 30))
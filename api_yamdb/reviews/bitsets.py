@@ -0,0 +1,45 @@
+from functools import reduce
+from operator import and_, or_
+
+
+BYTE_BITS = tuple(
+    tuple(bit for bit in range(8) if byte >> bit & 1) for byte in range(256)
+)
+
+
+def to_int(bits):
+    return int.from_bytes(bits, 'little')
+
+
+def to_bytes(value):
+    return value.to_bytes((value.bit_length() + 7) // 8, 'little')
+
+
+def with_ids(bits, ids):
+    value = to_int(bits)
+    for pk in ids:
+        value |= 1 << pk
+    return to_bytes(value)
+
+
+def without_ids(bits, ids):
+    value = to_int(bits)
+    for pk in ids:
+        value &= ~(1 << pk)
+    return to_bytes(value)
+
+
+def combine(bitsets, match_all):
+    """Пересечение (`match_all`) или объединение битовых карт."""
+    values = [to_int(bits) for bits in bitsets]
+    if not values:
+        return b''
+    return to_bytes(reduce(and_ if match_all else or_, values))
+
+
+def to_ids(bits):
+    return [
+        index * 8 + bit
+        for index, byte in enumerate(bits) if byte
+        for bit in BYTE_BITS[byte]
+    ]
@@ -0,0 +1,34 @@
+from time import perf_counter
+
+from django.core.management.base import BaseCommand, CommandError
+
+from reviews.models import SimilarTitle
+from reviews.signals import aggregates_rebuilt
+from reviews.similarity import DEFAULT_TOP_K
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает похожие произведения по совместным оценкам '
+        'пользователей.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--top-k', type=int, default=DEFAULT_TOP_K,
+            help='Сколько похожих произведений хранить для каждого.'
+        )
+
+    def handle(self, *args, **options):
+        top_k = options['top_k']
+        if top_k < 1:
+            raise CommandError(
+                'Количество похожих произведений должно быть положительным.')
+        started = perf_counter()
+        SimilarTitle.objects.rebuild(top_k=top_k)
+        aggregates_rebuilt.send(sender=self.__class__)
+        self.stdout.write(self.style.SUCCESS(
+            f'Сохранено пар похожих произведений: '
+            f'{SimilarTitle.objects.count()} '
+            f'за {perf_counter() - started:.1f} с'
+        ))
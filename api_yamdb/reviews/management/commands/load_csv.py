@@ -0,0 +1,153 @@
+import csv
+import sys
+from contextlib import contextmanager
+from itertools import islice
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+
+from reviews.models import Category, Comment, Genre, Review, Title
+from reviews.signals import aggregates_rebuilt
+from users.models import User
+
+
+DATA_DIR = settings.BASE_DIR / 'static' / 'data'
+DEFAULT_BATCH_SIZE = 10000
+
+
+def build_user(row):
+    return User(
+        id=row['id'],
+        username=row['username'],
+        email=row['email'],
+        role=row['role'] or User.UserRole.USER,
+        bio=row['bio'],
+        first_name=row['first_name'],
+        last_name=row['last_name'],
+        password=make_password(None),
+    )
+
+
+def build_title(row):
+    return Title(
+        id=row['id'],
+        name=row['name'],
+        year=row['year'],
+        description=row.get('description') or None,
+        category_id=row['category'] or None,
+    )
+
+
+def build_review(row):
+    return Review(
+        id=row['id'],
+        title_id=row['title_id'],
+        text=row['text'],
+        author_id=row['author'],
+        score=row['score'],
+        pub_date=row['pub_date'],
+    )
+
+
+def build_comment(row):
+    return Comment(
+        id=row['id'],
+        review_id=row['review_id'],
+        text=row['text'],
+        author_id=row['author'],
+        pub_date=row['pub_date'],
+    )
+
+
+# Файлы в порядке зависимостей по внешним ключам.
+CSV_FILES = (
+    ('users.csv', User, build_user),
+    ('category.csv', Category, lambda row: Category(**row)),
+    ('genre.csv', Genre, lambda row: Genre(**row)),
+    ('titles.csv', Title, build_title),
+    ('genre_title.csv', Title.genre.through,
+     lambda row: Title.genre.through(**row)),
+    ('review.csv', Review, build_review),
+    ('comments.csv', Comment, build_comment),
+)
+
+
+@contextmanager
+def explicit_pub_date(*models):
+    """Отключает auto_now_add, чтобы сохранить даты из файлов."""
+    fields = [model._meta.get_field('pub_date') for model in models]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+class Command(BaseCommand):
+    help = (
+        'Загружает данные из csv-файлов в БД пакетами и пересчитывает '
+        'производные данные.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path', type=Path, default=DATA_DIR,
+            help='Директория с csv-файлами.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+            help='Количество строк в одной транзакции.'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError('Размер пакета должен быть положительным.')
+        csv.field_size_limit(sys.maxsize)
+        with explicit_pub_date(Review, Comment):
+            for filename, model, build in CSV_FILES:
+                self.load_file(
+                    options['path'] / filename, model, build, batch_size)
+        self.reset_sequences()
+        call_command('rebuild_ratings', stdout=self.stdout)
+        call_command('rebuild_genre_index', stdout=self.stdout)
+        call_command('rebuild_score_stats', stdout=self.stdout)
+        call_command('rebuild_comment_stats', stdout=self.stdout)
+        call_command('rebuild_activity', stdout=self.stdout)
+        aggregates_rebuilt.send(sender=self.__class__)
+
+    def load_file(self, path, model, build, batch_size):
+        try:
+            csv_file = open(path, encoding='utf-8', newline='')
+        except FileNotFoundError:
+            self.stdout.write(self.style.WARNING(f'Файл {path} не найден.'))
+            return
+        loaded = 0
+        with csv_file:
+            rows = csv.DictReader(csv_file)
+            while True:
+                batch = [build(row) for row in islice(rows, batch_size)]
+                if not batch:
+                    break
+                with transaction.atomic():
+                    model.objects.bulk_create(batch)
+                loaded += len(batch)
+                self.stdout.write(f'{path.name}: {loaded}', ending='\r')
+        self.stdout.write(self.style.SUCCESS(
+            f'{path.name}: загружено строк {loaded}'
+        ))
+
+    def reset_sequences(self):
+        statements = connection.ops.sequence_reset_sql(
+            no_style(), [model for _, model, _ in CSV_FILES]
+        )
+        with connection.cursor() as cursor:
+            for statement in statements:
+                cursor.execute(statement)
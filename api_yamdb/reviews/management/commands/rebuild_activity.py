@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from reviews.models import TitleActivityBucket
+from reviews.signals import aggregates_rebuilt
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает почасовые счётчики отзывов и комментариев '
+        'к произведениям за срок хранения.'
+    )
+
+    def handle(self, *args, **options):
+        TitleActivityBucket.objects.rebuild()
+        aggregates_rebuilt.send(sender=self.__class__)
+        self.stdout.write(self.style.SUCCESS(
+            'Пересчитано счётчиков активности: '
+            f'{TitleActivityBucket.objects.count()}'
+        ))
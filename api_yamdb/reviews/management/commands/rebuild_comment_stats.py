@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from reviews.models import Review
+from reviews.signals import aggregates_rebuilt
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает количество комментариев и дату последнего '
+        'комментария отзывов.'
+    )
+
+    def handle(self, *args, **options):
+        updated = Review.objects.rebuild_comment_stats()
+        aggregates_rebuilt.send(sender=self.__class__)
+        self.stdout.write(
+            self.style.SUCCESS(f'Пересчитано отзывов: {updated}')
+        )
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from reviews.models import GenreTitleIndex
+from reviews.signals import aggregates_rebuilt
+
+
+class Command(BaseCommand):
+    help = 'Пересобирает битовые карты произведений по жанрам.'
+
+    def handle(self, *args, **options):
+        GenreTitleIndex.objects.rebuild()
+        aggregates_rebuilt.send(sender=self.__class__)
+        self.stdout.write(self.style.SUCCESS(
+            f'Пересобрано индексов жанров: {GenreTitleIndex.objects.count()}'
+        ))
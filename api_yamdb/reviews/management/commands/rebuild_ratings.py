@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from reviews.models import Title
+from reviews.signals import aggregates_rebuilt
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает рейтинги произведений по оставленным отзывам.'
+
+    def handle(self, *args, **options):
+        updated = Title.objects.rebuild_ratings()
+        aggregates_rebuilt.send(sender=self.__class__)
+        self.stdout.write(
+            self.style.SUCCESS(f'Пересчитано произведений: {updated}')
+        )
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from reviews.models import TitleScoreCount
+from reviews.signals import aggregates_rebuilt
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает распределение оценок произведений по отзывам или '
+        'проверяет его согласованность.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check', action='store_true',
+            help='Только найти расхождения, ничего не изменяя.'
+        )
+
+    def handle(self, *args, **options):
+        if options['check']:
+            differences = TitleScoreCount.objects.differences()
+            for (title_id, score), (stored, actual) in sorted(
+                    differences.items()):
+                self.stdout.write(
+                    f'Произведение {title_id}, оценка {score}: '
+                    f'сохранено {stored}, по отзывам {actual}'
+                )
+            if differences:
+                raise CommandError(
+                    f'Найдено расхождений: {len(differences)}')
+            self.stdout.write(self.style.SUCCESS('Расхождений нет.'))
+            return
+        TitleScoreCount.objects.rebuild()
+        aggregates_rebuilt.send(sender=self.__class__)
+        self.stdout.write(self.style.SUCCESS(
+            'Пересчитано записей распределения оценок: '
+            f'{TitleScoreCount.objects.count()}'
+        ))
@@ -0,0 +1,43 @@
+# Generated by Django 3.2 on 2026-10-18 16:47
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def build_genre_index(apps, schema_editor):
+    Genre = apps.get_model('reviews', 'Genre')
+    GenreTitleIndex = apps.get_model('reviews', 'GenreTitleIndex')
+    Title = apps.get_model('reviews', 'Title')
+    values = dict.fromkeys(Genre.objects.values_list('id', flat=True), 0)
+    links = Title.genre.through.objects.values_list('genre_id', 'title_id')
+    for genre_id, title_id in links.iterator():
+        values[genre_id] |= 1 << title_id
+    GenreTitleIndex.objects.bulk_create(
+        GenreTitleIndex(
+            genre_id=genre_id,
+            title_bits=value.to_bytes((value.bit_length() + 7) // 8, 'little')
+        )
+        for genre_id, value in values.items()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0005_title_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GenreTitleIndex',
+            fields=[
+                ('genre', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='title_index', serialize=False, to='reviews.genre', verbose_name='Жанр')),
+                ('title_bits', models.BinaryField(default=bytes, verbose_name='Битовая карта произведений')),
+            ],
+            options={
+                'verbose_name': 'индекс произведений жанра',
+                'verbose_name_plural': 'Индексы произведений жанров',
+            },
+        ),
+        migrations.RunPython(build_genre_index, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,74 @@
+# Generated by Django 3.2 on 2026-10-18 17:18
+
+from collections import Counter
+from datetime import timedelta
+
+from django.db import migrations, models
+import django.db.models.deletion
+from django.utils import timezone
+
+
+BUCKET_SECONDS = 60 * 60
+RETENTION_HOURS = 7 * 24
+
+
+def build_activity_buckets(apps, schema_editor):
+    Comment = apps.get_model('reviews', 'Comment')
+    Review = apps.get_model('reviews', 'Review')
+    TitleActivityBucket = apps.get_model('reviews', 'TitleActivityBucket')
+    start = timezone.now() - timedelta(hours=RETENTION_HOURS)
+    reviews = Counter(
+        (title_id, int(pub_date.timestamp()) // BUCKET_SECONDS)
+        for title_id, pub_date in Review.objects.filter(
+            pub_date__gt=start).values_list('title_id', 'pub_date')
+    )
+    comments = Counter(
+        (title_id, int(pub_date.timestamp()) // BUCKET_SECONDS)
+        for title_id, pub_date in Comment.objects.filter(
+            pub_date__gt=start).values_list('review__title_id', 'pub_date')
+    )
+    TitleActivityBucket.objects.bulk_create(
+        TitleActivityBucket(
+            title_id=title_id, bucket=bucket,
+            reviews=reviews[title_id, bucket],
+            comments=comments[title_id, bucket]
+        )
+        for title_id, bucket in reviews.keys() | comments.keys()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0009_review_comment_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TitleActivityBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.PositiveIntegerField(verbose_name='Час от начала эпохи')),
+                ('reviews', models.PositiveIntegerField(default=0, verbose_name='Количество отзывов')),
+                ('comments', models.PositiveIntegerField(default=0, verbose_name='Количество комментариев')),
+                ('title', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='activity_buckets', to='reviews.title', verbose_name='Произведение')),
+            ],
+            options={
+                'verbose_name': 'активность за час',
+                'verbose_name_plural': 'Активность произведений',
+                'ordering': ('title', 'bucket'),
+                'default_related_name': 'activity_buckets',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='titleactivitybucket',
+            index=models.Index(fields=['bucket', 'title'], name='activity_bucket_title_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='titleactivitybucket',
+            constraint=models.UniqueConstraint(fields=('title', 'bucket'), name='unique title bucket'),
+        ),
+        migrations.RunPython(
+            build_activity_buckets, migrations.RunPython.noop
+        ),
+    ]
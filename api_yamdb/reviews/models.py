@@ -1,6 +1,19 @@
+import json
+from collections import defaultdict
+from datetime import timedelta
+
 from django.core.validators import (MaxValueValidator, MinValueValidator)
-from django.db import models
+from django.db import connections, models, transaction
+from django.db.models import (
+    Count, F, Max, OuterRef, Q, Subquery, Sum, Window,
+    prefetch_related_objects
+)
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Coalesce, RowNumber
+from django.utils import timezone
 
+from reviews import bitsets, similarity
+from reviews.search import SEARCH_TABLE, TITLE_TABLE, build_match_query
 from reviews.validators import year_validation
 from users.models import User
 
@@ -9,6 +22,10 @@ STR_LIMIT = 21
 MAX_LENGTH = 256
 MIN_SCORE = 1
 MAX_SCORE = 10
+ACTIVITY_BUCKET_SECONDS = 60 * 60
+ACTIVITY_RETENTION_HOURS = 7 * 24
+REVIEW_ACTIVITY_WEIGHT = 3
+COMMENT_ACTIVITY_WEIGHT = 1
 
 
 class CategoryGenreModel(models.Model):
@@ -28,6 +45,7 @@ class Category(CategoryGenreModel):
 
     class Meta:
         ordering = ('name',)
+        indexes = (models.Index(fields=('name',), name='category_name_idx'),)
         verbose_name = 'категория'
         verbose_name_plural = 'Категории'
 
@@ -40,6 +58,7 @@ class Genre(CategoryGenreModel):
 
     class Meta:
         ordering = ('name',)
+        indexes = (models.Index(fields=('name',), name='genre_name_idx'),)
         verbose_name = 'жанр'
         verbose_name_plural = 'Жанры'
 
@@ -47,7 +66,124 @@ class Genre(CategoryGenreModel):
         return f'Жанр: {self.name[:STR_LIMIT]}'
 
 
-class Title(models.Model):
+class GenreTitleIndexQuerySet(models.QuerySet):
+    """Кверисет битовых карт произведений по жанрам."""
+
+    def _update_bits(self, genre_ids, title_ids, change):
+        with transaction.atomic():
+            indexes = self.select_for_update().in_bulk(genre_ids)
+            created = [
+                GenreTitleIndex(genre_id=genre_id)
+                for genre_id in genre_ids if genre_id not in indexes
+            ]
+            for index in (*indexes.values(), *created):
+                index.title_bits = change(bytes(index.title_bits), title_ids)
+            self.bulk_update(indexes.values(), ('title_bits',))
+            self.bulk_create(created)
+
+    def add_titles(self, genre_ids, title_ids):
+        self._update_bits(genre_ids, title_ids, bitsets.with_ids)
+
+    def remove_titles(self, genre_ids, title_ids):
+        self._update_bits(genre_ids, title_ids, bitsets.without_ids)
+
+    def title_ids(self, slugs, match_all=False):
+        slugs = set(slugs)
+        title_bits = self.filter(genre__slug__in=slugs).values_list(
+            'title_bits', flat=True)
+        title_bits = [bytes(bits) for bits in title_bits]
+        if match_all and len(title_bits) < len(slugs):
+            return []
+        return bitsets.to_ids(bitsets.combine(title_bits, match_all))
+
+    def rebuild(self):
+        """Пересобирает битовые карты по связям произведений и жанров."""
+        values = {genre_id: 0 for genre_id in Genre.objects.values_list(
+            'id', flat=True)}
+        links = Title.genre.through.objects.values_list(
+            'genre_id', 'title_id')
+        for genre_id, title_id in links.iterator():
+            values[genre_id] |= 1 << title_id
+        with transaction.atomic():
+            self.all().delete()
+            self.bulk_create(
+                GenreTitleIndex(
+                    genre_id=genre_id, title_bits=bitsets.to_bytes(value)
+                )
+                for genre_id, value in values.items()
+            )
+
+
+class TitleQuerySet(models.QuerySet):
+    """Кверисет произведений."""
+
+    def rebuild_ratings(self):
+        """Пересчитывает сумму и количество оценок по отзывам."""
+        reviews = Review.objects.filter(
+            title=OuterRef('pk')
+        ).order_by().values('title')
+        return self.update(
+            rating_sum=Coalesce(
+                Subquery(reviews.annotate(total=Sum('score')).values('total')),
+                0
+            ),
+            rating_count=Coalesce(
+                Subquery(reviews.annotate(total=Count('id')).values('total')),
+                0
+            ),
+        )
+
+    def search(self, text):
+        """Ищет произведения по словам названия, лучшие совпадения первыми."""
+        if connections[self.db].vendor != 'sqlite':
+            return self.filter(name__icontains=text)
+        query = build_match_query(text)
+        if not query:
+            return self.none()
+        return self.extra(
+            select={'search_rank': f'{SEARCH_TABLE}.rank'},
+            tables=(SEARCH_TABLE,),
+            where=(
+                f'{SEARCH_TABLE}.rowid = {TITLE_TABLE}.id',
+                f'{SEARCH_TABLE} MATCH %s',
+            ),
+            params=(query,),
+        ).order_by('search_rank', 'name', 'id')
+
+    def filter_ids(self, ids):
+        """Фильтр по списку id любой длины."""
+        if connections[self.db].vendor != 'sqlite':
+            return self.filter(id__in=ids)
+        return self.filter(id__in=RawSQL(
+            'SELECT value FROM json_each(%s)', (json.dumps(ids),)
+        ))
+
+    def filter_genres(self, slugs, match_all=False):
+        """Произведения с любым (или со всеми) из жанров `slugs`."""
+        return self.filter_ids(
+            GenreTitleIndex.objects.title_ids(slugs, match_all)
+        )
+
+
+class AggregateFieldsMixin:
+    """
+    Не перезаписывает при сохранении поля `aggregate_fields`: они
+    меняются только атомарными UPDATE, и значения из экземпляра
+    могут быть устаревшими.
+    """
+    aggregate_fields = ()
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.aggregate_fields
+            ]
+        super().save(*args, **kwargs)
+
+
+class Title(AggregateFieldsMixin, models.Model):
     """Модель произведения."""
     name = models.TextField(max_length=MAX_LENGTH, verbose_name='Название')
     year = models.PositiveSmallIntegerField(
@@ -64,18 +200,386 @@ class Title(models.Model):
         Category, on_delete=models.SET_NULL, null=True,
         verbose_name='Категория'
     )
+    rating_sum = models.PositiveIntegerField(
+        default=0, editable=False, verbose_name='Сумма оценок'
+    )
+    rating_count = models.PositiveIntegerField(
+        default=0, editable=False, verbose_name='Количество оценок'
+    )
+
+    objects = TitleQuerySet.as_manager()
+
+    aggregate_fields = ('rating_sum', 'rating_count')
 
     class Meta:
         default_related_name = 'titles'
         ordering = ('name',)
+        indexes = (
+            models.Index(fields=('name', 'id'), name='title_name_idx'),
+            models.Index(
+                fields=('year', 'name', 'id'), name='title_year_name_idx'
+            ),
+            models.Index(
+                fields=('category', 'name', 'id'),
+                name='title_category_name_idx'
+            ),
+        )
         verbose_name = 'произведение'
         verbose_name_plural = 'Произведения'
 
     def __str__(self):
         return f'Произведение: {self.name[:STR_LIMIT]}'
 
+    @property
+    def rating(self):
+        if not self.rating_count:
+            return None
+        return self.rating_sum / self.rating_count
+
+    @property
+    def score_histogram(self):
+        """Количество отзывов по каждой оценке от MIN_SCORE до MAX_SCORE."""
+        histogram = dict.fromkeys(range(MIN_SCORE, MAX_SCORE + 1), 0)
+        for score_count in self.score_counts.all():
+            histogram[score_count.score] = score_count.count
+        return histogram
+
+
+class GenreTitleIndex(models.Model):
+    """Битовая карта id произведений жанра."""
+    genre = models.OneToOneField(
+        Genre, on_delete=models.CASCADE, primary_key=True,
+        related_name='title_index', verbose_name='Жанр'
+    )
+    title_bits = models.BinaryField(
+        default=bytes, verbose_name='Битовая карта произведений'
+    )
+
+    objects = GenreTitleIndexQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = 'индекс произведений жанра'
+        verbose_name_plural = 'Индексы произведений жанров'
+
+    def __str__(self):
+        return f'Индекс произведений: {self.genre}'
+
+
+class TitleScoreCountQuerySet(models.QuerySet):
+    """Кверисет распределения оценок произведений."""
+
+    def change(self, title_id, score, delta):
+        """Атомарно изменяет количество отзывов с оценкой `score`."""
+        updated = self.filter(title_id=title_id, score=score).update(
+            count=F('count') + delta)
+        if not updated and delta > 0:
+            self.create(title_id=title_id, score=score, count=delta)
+
+    def from_reviews(self, reviews=None):
+        """Распределение оценок, посчитанное по отзывам."""
+        if reviews is None:
+            reviews = Review.objects.all()
+        return {
+            (title_id, score): count
+            for title_id, score, count in reviews.order_by().values(
+                'title_id', 'score').annotate(
+                count=Count('id')).values_list('title_id', 'score', 'count')
+        }
+
+    def differences(self):
+        """Расхождения сохранённого распределения с отзывами."""
+        stored = {
+            (title_id, score): count
+            for title_id, score, count in self.values_list(
+                'title_id', 'score', 'count')
+            if count
+        }
+        actual = self.from_reviews()
+        return {
+            key: (stored.get(key, 0), actual.get(key, 0))
+            for key in stored.keys() | actual.keys()
+            if stored.get(key, 0) != actual.get(key, 0)
+        }
+
+    def rebuild(self):
+        """Пересчитывает распределение оценок по отзывам."""
+        with transaction.atomic():
+            self.all().delete()
+            self.bulk_create(
+                TitleScoreCount(title_id=title_id, score=score, count=count)
+                for (title_id, score), count in self.from_reviews().items()
+            )
+
+    def rebuild_titles(self, title_ids):
+        """Пересчитывает распределение оценок нескольких произведений."""
+        counts = self.from_reviews(
+            Review.objects.filter(title_id__in=title_ids))
+        with transaction.atomic():
+            self.filter(title_id__in=title_ids).delete()
+            self.bulk_create(
+                TitleScoreCount(title_id=title_id, score=score, count=count)
+                for (title_id, score), count in counts.items()
+            )
+
+
+class TitleScoreCount(models.Model):
+    """Количество отзывов на произведение с одной оценкой."""
+    title = models.ForeignKey(
+        Title, on_delete=models.CASCADE, verbose_name='Произведение'
+    )
+    score = models.PositiveSmallIntegerField(verbose_name='Оценка')
+    count = models.PositiveIntegerField(
+        default=0, verbose_name='Количество отзывов'
+    )
+
+    objects = TitleScoreCountQuerySet.as_manager()
+
+    class Meta:
+        default_related_name = 'score_counts'
+        ordering = ('title', 'score')
+        verbose_name = 'количество оценок'
+        verbose_name_plural = 'Распределение оценок'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['title', 'score'], name='unique title score'
+            )
+        ]
+
+    def __str__(self):
+        return (f'Оценка {self.score}: {self.count} к произведению:'
+                f' {self.title}')
+
+
+class TitleActivityBucketQuerySet(models.QuerySet):
+    """Кверисет почасовых счётчиков активности произведений."""
+
+    def record(self, title_id, date, reviews=0, comments=0):
+        """Учитывает отзывы и комментарии в часе, на который пришлась дата."""
+        bucket = activity_bucket(date)
+        updated = self.filter(title_id=title_id, bucket=bucket).update(
+            reviews=F('reviews') + reviews,
+            comments=F('comments') + comments,
+        )
+        if updated:
+            return
+        self.create(
+            title_id=title_id, bucket=bucket,
+            reviews=reviews, comments=comments
+        )
+        # Новый час: заодно удаляем часы, вышедшие за срок хранения.
+        self.expire(bucket)
+
+    def expire(self, current_bucket):
+        return self.filter(
+            bucket__lte=current_bucket - ACTIVITY_RETENTION_HOURS
+        ).delete()
 
-class Review(models.Model):
+    def trending(self, hours, now=None):
+        """
+        Пары (id произведения, вес активности) за последние `hours`
+        часов по убыванию веса. Вклад часа линейно растёт от самого
+        старого к текущему.
+        """
+        start = activity_bucket(now or timezone.now()) - hours + 1
+        return self.filter(bucket__gte=start).values('title_id').annotate(
+            score=Sum(
+                (F('reviews') * REVIEW_ACTIVITY_WEIGHT
+                 + F('comments') * COMMENT_ACTIVITY_WEIGHT)
+                * (F('bucket') - start + 1)
+            )
+        ).order_by('-score', 'title_id').values_list('title_id', 'score')
+
+    def rebuild(self, now=None):
+        """Пересчитывает счётчики по отзывам и комментариям."""
+        now = now or timezone.now()
+        start = now - timedelta(hours=ACTIVITY_RETENTION_HOURS)
+        counters = defaultdict(lambda: [0, 0])
+        reviews = Review.objects.filter(pub_date__gt=start).values_list(
+            'title_id', 'pub_date')
+        for title_id, pub_date in reviews.iterator():
+            counters[title_id, activity_bucket(pub_date)][0] += 1
+        comments = Comment.objects.filter(pub_date__gt=start).values_list(
+            'review__title_id', 'pub_date')
+        for title_id, pub_date in comments.iterator():
+            counters[title_id, activity_bucket(pub_date)][1] += 1
+        with transaction.atomic():
+            self.all().delete()
+            self.bulk_create(
+                TitleActivityBucket(
+                    title_id=title_id, bucket=bucket,
+                    reviews=reviews, comments=comments
+                )
+                for (title_id, bucket), (reviews, comments)
+                in counters.items()
+            )
+
+
+def activity_bucket(date):
+    """Номер часа от начала эпохи."""
+    return int(date.timestamp()) // ACTIVITY_BUCKET_SECONDS
+
+
+class TitleActivityBucket(models.Model):
+    """Количество отзывов и комментариев к произведению за час."""
+    title = models.ForeignKey(
+        Title, on_delete=models.CASCADE, verbose_name='Произведение'
+    )
+    bucket = models.PositiveIntegerField(verbose_name='Час от начала эпохи')
+    reviews = models.PositiveIntegerField(
+        default=0, verbose_name='Количество отзывов'
+    )
+    comments = models.PositiveIntegerField(
+        default=0, verbose_name='Количество комментариев'
+    )
+
+    objects = TitleActivityBucketQuerySet.as_manager()
+
+    class Meta:
+        default_related_name = 'activity_buckets'
+        ordering = ('title', 'bucket')
+        verbose_name = 'активность за час'
+        verbose_name_plural = 'Активность произведений'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['title', 'bucket'], name='unique title bucket'
+            )
+        ]
+        indexes = (
+            models.Index(
+                fields=('bucket', 'title'), name='activity_bucket_title_idx'
+            ),
+        )
+
+    def __str__(self):
+        return f'Активность за час {self.bucket}: {self.title}'
+
+
+class SimilarTitleQuerySet(models.QuerySet):
+    """Кверисет похожих произведений."""
+
+    def rebuild(self, top_k=similarity.DEFAULT_TOP_K, batch_size=10000):
+        """Пересчитывает соседей всех произведений по оценкам в отзывах."""
+        title_ids, similar_ids, values = similarity.compute_similar(
+            *similarity.load_reviews(Review.objects.all()), top_k=top_k
+        )
+        with transaction.atomic():
+            self.all().delete()
+            self.bulk_create(
+                (
+                    SimilarTitle(
+                        title_id=title_id, similar_id=similar_id,
+                        similarity=value
+                    )
+                    for title_id, similar_id, value in zip(
+                        title_ids.tolist(), similar_ids.tolist(),
+                        values.tolist()
+                    )
+                ),
+                batch_size=batch_size,
+            )
+
+
+class SimilarTitle(models.Model):
+    """Произведение, похожее на другое по оценкам пользователей."""
+    title = models.ForeignKey(
+        Title, on_delete=models.CASCADE, related_name='similar_titles',
+        verbose_name='Произведение'
+    )
+    similar = models.ForeignKey(
+        Title, on_delete=models.CASCADE, related_name='+',
+        verbose_name='Похожее произведение'
+    )
+    similarity = models.FloatField(verbose_name='Сходство')
+
+    objects = SimilarTitleQuerySet.as_manager()
+
+    class Meta:
+        ordering = ('title', '-similarity')
+        verbose_name = 'похожее произведение'
+        verbose_name_plural = 'Похожие произведения'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['title', 'similar'], name='unique similar title'
+            )
+        ]
+        indexes = (
+            models.Index(
+                fields=('title', '-similarity'),
+                name='similar_title_rank_idx'
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.similar} похоже на {self.title}'
+
+
+class ReviewQuerySet(models.QuerySet):
+    """Кверисет отзывов."""
+
+    def rebuild_comment_stats(self):
+        """Пересчитывает количество и дату последнего комментария."""
+        comments = Comment.objects.filter(
+            review=OuterRef('pk')
+        ).order_by().values('review')
+        return self.update(
+            comment_count=Coalesce(
+                Subquery(comments.annotate(total=Count('id')).values('total')),
+                0
+            ),
+            last_comment_date=Subquery(
+                comments.annotate(last=Max('pub_date')).values('last')
+            ),
+        )
+
+    def delete_by_authors(self, author_ids):
+        """
+        Удаляет отзывы авторов и все комментарии к ним и от них
+        несколькими запросами, без загрузки строк и сигналов на каждую
+        строку. Затем пересчитывает рейтинги и распределения оценок
+        затронутых произведений и счётчики комментариев оставшихся
+        отзывов. Возвращает количество удалённых отзывов и комментариев.
+        """
+        with transaction.atomic():
+            reviews = self.filter(author__in=author_ids)
+            comments = Comment.objects.filter(
+                Q(author__in=author_ids) | Q(review__author__in=author_ids))
+            title_ids = set(reviews.values_list('title_id', flat=True))
+            commented_review_ids = set(
+                comments.exclude(review__author__in=author_ids).values_list(
+                    'review_id', flat=True)
+            )
+            # Каскады и агрегаты обрабатываются ниже набором запросов.
+            deleted_comments = comments._raw_delete(comments.db)
+            deleted_reviews = reviews._raw_delete(reviews.db)
+            Title.objects.filter(id__in=title_ids).rebuild_ratings()
+            TitleScoreCount.objects.rebuild_titles(title_ids)
+            self.filter(id__in=commented_review_ids).rebuild_comment_stats()
+        return deleted_reviews, deleted_comments
+
+    def latest_by_title(self, title_ids, limit):
+        """
+        Не больше `limit` последних отзывов на каждое из произведений
+        одним запросом с оконной функцией.
+        """
+        ranked = self.filter(title_id__in=title_ids).annotate(
+            position=Window(
+                RowNumber(),
+                partition_by=F('title_id'),
+                order_by=(F('pub_date').desc(), F('id').asc()),
+            )
+        ).order_by()
+        sql, params = ranked.query.sql_with_params()
+        # PostgreSQL и MySQL требуют псевдоним у подзапроса во FROM.
+        reviews = list(self.raw(
+            f'SELECT * FROM ({sql}) AS ranked WHERE ranked.position <= %s '
+            'ORDER BY ranked.title_id, ranked.position',
+            (*params, limit)
+        ))
+        prefetch_related_objects(reviews, 'author')
+        return reviews
+
+
+class Review(AggregateFieldsMixin, models.Model):
     """Модель отзыва."""
     author = models.ForeignKey(
         User, on_delete=models.CASCADE, verbose_name='Автор'
@@ -98,10 +602,34 @@ class Review(models.Model):
     pub_date = models.DateTimeField(
         auto_now_add=True, verbose_name='Дата публикации'
     )
+    comment_count = models.PositiveIntegerField(
+        default=0, editable=False, verbose_name='Количество комментариев'
+    )
+    last_comment_date = models.DateTimeField(
+        null=True, editable=False, verbose_name='Дата последнего комментария'
+    )
+
+    objects = ReviewQuerySet.as_manager()
+
+    aggregate_fields = ('comment_count', 'last_comment_date')
 
     class Meta:
         default_related_name = 'reviews'
         ordering = ('-pub_date',)
+        indexes = (
+            models.Index(
+                fields=('title', '-pub_date', 'id'),
+                name='review_title_pub_date_idx'
+            ),
+            models.Index(
+                fields=('title', '-last_comment_date', 'id'),
+                name='review_title_activity_idx'
+            ),
+            models.Index(
+                fields=('title', '-comment_count', 'id'),
+                name='review_title_comments_idx'
+            ),
+        )
         verbose_name = 'отзыв'
         verbose_name_plural = 'Отзывы'
         constraints = [
@@ -113,6 +641,21 @@ class Review(models.Model):
     def __str__(self):
         return f'Отзыв: {self.text[:STR_LIMIT]} к произведению: {self.title}'
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.remember_score()
+        return instance
+
+    def remember_score(self):
+        """Запоминает сохранённые в БД произведение и оценку."""
+        self._loaded_title_id = self.__dict__.get('title_id')
+        self._loaded_score = self.__dict__.get('score')
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
 
 class Comment(models.Model):
     """Модель комментария."""
@@ -130,9 +673,19 @@ class Comment(models.Model):
     class Meta:
         default_related_name = 'comments'
         ordering = ('-pub_date',)
+        indexes = (
+            models.Index(
+                fields=('review', '-pub_date', 'id'),
+                name='comment_review_pub_date_idx'
+            ),
+        )
         verbose_name = 'комментарий'
         verbose_name_plural = 'Комментарии'
 
     def __str__(self):
         return (f'Комментарий: {self.text[:STR_LIMIT]} к отзыву:'
                 f' {self.review}')
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            super().save(*args, **kwargs)
@@ -0,0 +1,72 @@
+"""
+Полнотекстовый поиск произведений по названию.
+
+Названия индексируются в виртуальной таблице SQLite FTS5, которую
+синхронизируют триггеры на таблице произведений. Токенизатор unicode61
+приводит к одному регистру в том числе кириллицу, а `ё` заменяется
+на `е` как в индексе, так и в поисковом запросе.
+"""
+import re
+
+
+SEARCH_TABLE = 'reviews_title_search'
+TITLE_TABLE = 'reviews_title'
+
+NORMALIZED_NAME_SQL = "replace(replace({}.name, 'ё', 'е'), 'Ё', 'Е')"
+
+CREATE_SEARCH_SQL = (
+    f'CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5('
+    "name, tokenize = 'unicode61 remove_diacritics 2')",
+    f'CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_insert '
+    f'AFTER INSERT ON {TITLE_TABLE} BEGIN '
+    f'INSERT INTO {SEARCH_TABLE}(rowid, name) '
+    f'VALUES (new.id, {NORMALIZED_NAME_SQL.format("new")}); END',
+    f'CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_update '
+    f'AFTER UPDATE OF name ON {TITLE_TABLE} BEGIN '
+    f'UPDATE {SEARCH_TABLE} SET name = {NORMALIZED_NAME_SQL.format("new")} '
+    'WHERE rowid = new.id; END',
+    f'CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_delete '
+    f'AFTER DELETE ON {TITLE_TABLE} BEGIN '
+    f'DELETE FROM {SEARCH_TABLE} WHERE rowid = old.id; END',
+)
+
+DROP_SEARCH_SQL = (
+    f'DROP TRIGGER IF EXISTS {SEARCH_TABLE}_insert',
+    f'DROP TRIGGER IF EXISTS {SEARCH_TABLE}_update',
+    f'DROP TRIGGER IF EXISTS {SEARCH_TABLE}_delete',
+    f'DROP TABLE IF EXISTS {SEARCH_TABLE}',
+)
+
+REBUILD_SEARCH_SQL = (
+    f'DELETE FROM {SEARCH_TABLE}',
+    f'INSERT INTO {SEARCH_TABLE}(rowid, name) '
+    f'SELECT id, {NORMALIZED_NAME_SQL.format(TITLE_TABLE)} '
+    f'FROM {TITLE_TABLE}',
+)
+
+TOKEN_RE = re.compile(r'\w+')
+
+
+def normalize_search_text(text):
+    return text.casefold().replace('ё', 'е')
+
+
+def build_match_query(text):
+    """Строит запрос FTS5: все слова запроса как префиксы."""
+    tokens = TOKEN_RE.findall(normalize_search_text(text))
+    return ' '.join(f'"{token}"*' for token in tokens)
+
+
+def ensure_search_index(connection):
+    """Создаёт поисковую таблицу и триггеры, если их нет."""
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for statement in CREATE_SEARCH_SQL:
+            cursor.execute(statement)
+
+
+def rebuild_search_index(connection):
+    with connection.cursor() as cursor:
+        for statement in REBUILD_SEARCH_SQL:
+            cursor.execute(statement)
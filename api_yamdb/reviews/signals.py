@@ -0,0 +1,195 @@
+from threading import local
+
+from django.core.signals import request_finished
+from django.db import connections
+from django.db.models import F, Max, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.db.models.signals import (
+    m2m_changed, post_delete, post_migrate, post_save, pre_delete, pre_save
+)
+from django.dispatch import Signal, receiver
+
+from reviews.models import (
+    Comment, GenreTitleIndex, Review, Title, TitleActivityBucket,
+    TitleScoreCount
+)
+from reviews.search import ensure_search_index
+
+
+# Отправляется после массового пересчёта данных в обход сигналов моделей.
+aggregates_rebuilt = Signal()
+
+# id объектов, которые удаляются в этом потоке прямо сейчас. Агрегаты на
+# них не пересчитываются при каскадном удалении дочерних строк: строки
+# агрегатов всё равно удаляются вместе с объектом.
+_deleting = local()
+
+
+def deleting_ids(model):
+    ids = getattr(_deleting, model._meta.label_lower, None)
+    if ids is None:
+        ids = set()
+        setattr(_deleting, model._meta.label_lower, ids)
+    return ids
+
+
+@receiver(pre_delete, sender=Title)
+def remember_deleting_title(sender, instance, **kwargs):
+    deleting_ids(Title).add(instance.pk)
+
+
+@receiver(post_delete, sender=Title)
+def forget_deleted_title(sender, instance, **kwargs):
+    deleting_ids(Title).discard(instance.pk)
+
+
+@receiver(pre_delete, sender=Review)
+def remember_deleting_review(sender, instance, **kwargs):
+    deleting_ids(Review).add(instance.pk)
+
+
+@receiver(post_delete, sender=Review)
+def forget_deleted_review(sender, instance, **kwargs):
+    deleting_ids(Review).discard(instance.pk)
+
+
+@receiver(request_finished)
+def forget_failed_deletions(**kwargs):
+    # post_delete не отправляется, если удаление прервалось ошибкой.
+    _deleting.__dict__.clear()
+
+
+def change_title_rating(title_id, score_delta, count_delta=0):
+    """Атомарно изменяет сумму и количество оценок произведения."""
+    if not score_delta and not count_delta:
+        return
+    Title.objects.filter(pk=title_id).update(
+        rating_sum=F('rating_sum') + score_delta,
+        rating_count=F('rating_count') + count_delta,
+    )
+
+
+@receiver(pre_save, sender=Review)
+def load_previous_score(sender, instance, raw, **kwargs):
+    if raw or instance._state.adding:
+        return
+    if getattr(instance, '_loaded_score', None) is None:
+        previous = Review.objects.filter(pk=instance.pk).values(
+            'title_id', 'score').first()
+        if previous:
+            instance._loaded_title_id = previous['title_id']
+            instance._loaded_score = previous['score']
+
+
+@receiver(post_save, sender=Review)
+def update_rating_on_save(sender, instance, created, raw, **kwargs):
+    if raw:
+        return
+    if created or getattr(instance, '_loaded_score', None) is None:
+        change_title_rating(instance.title_id, instance.score, 1)
+        TitleScoreCount.objects.change(instance.title_id, instance.score, 1)
+    elif (instance._loaded_title_id, instance._loaded_score) != (
+            instance.title_id, instance.score):
+        if instance._loaded_title_id != instance.title_id:
+            change_title_rating(
+                instance._loaded_title_id, -instance._loaded_score, -1)
+            change_title_rating(instance.title_id, instance.score, 1)
+        else:
+            change_title_rating(
+                instance.title_id, instance.score - instance._loaded_score)
+        TitleScoreCount.objects.change(
+            instance._loaded_title_id, instance._loaded_score, -1)
+        TitleScoreCount.objects.change(instance.title_id, instance.score, 1)
+    instance.remember_score()
+
+
+@receiver(post_delete, sender=Review)
+def update_rating_on_delete(sender, instance, **kwargs):
+    if instance.title_id in deleting_ids(Title):
+        return
+    change_title_rating(instance.title_id, -instance.score, -1)
+    TitleScoreCount.objects.change(instance.title_id, instance.score, -1)
+
+
+@receiver(post_save, sender=Comment)
+def update_review_on_comment_create(sender, instance, created, raw,
+                                    **kwargs):
+    if raw or not created:
+        return
+    pub_date = Value(instance.pub_date)
+    Review.objects.filter(pk=instance.review_id).update(
+        comment_count=F('comment_count') + 1,
+        last_comment_date=Greatest(
+            Coalesce('last_comment_date', pub_date), pub_date),
+    )
+
+
+@receiver(post_delete, sender=Comment)
+def update_review_on_comment_delete(sender, instance, **kwargs):
+    if instance.review_id in deleting_ids(Review):
+        return
+    last_comment_date = Comment.objects.filter(
+        review=instance.review_id
+    ).order_by().values('review').annotate(
+        last=Max('pub_date')).values('last')
+    Review.objects.filter(pk=instance.review_id).update(
+        comment_count=F('comment_count') - 1,
+        last_comment_date=Subquery(last_comment_date),
+    )
+
+
+@receiver(post_save, sender=Review)
+def record_review_activity(sender, instance, created, raw, **kwargs):
+    if created and not raw:
+        TitleActivityBucket.objects.record(
+            instance.title_id, instance.pub_date, reviews=1)
+
+
+@receiver(post_save, sender=Comment)
+def record_comment_activity(sender, instance, created, raw, **kwargs):
+    if created and not raw:
+        TitleActivityBucket.objects.record(
+            instance.review.title_id, instance.pub_date, comments=1)
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def update_genre_index(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'pre_clear':
+        instance._cleared_pks = set(
+            getattr(instance, 'titles' if reverse else 'genre').values_list(
+                'pk', flat=True)
+        )
+        return
+    if action == 'post_clear':
+        pk_set = instance.__dict__.pop('_cleared_pks', set())
+    elif action not in ('post_add', 'post_remove'):
+        return
+    if not pk_set:
+        return
+    if reverse:
+        genre_ids, title_ids = (instance.pk,), pk_set
+    else:
+        genre_ids, title_ids = pk_set, (instance.pk,)
+    if action == 'post_add':
+        GenreTitleIndex.objects.add_titles(genre_ids, title_ids)
+    else:
+        GenreTitleIndex.objects.remove_titles(genre_ids, title_ids)
+
+
+@receiver(pre_delete, sender=Title)
+def remember_title_genres(sender, instance, **kwargs):
+    instance._deleted_genre_pks = list(
+        instance.genre.values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=Title)
+def remove_title_from_genre_index(sender, instance, **kwargs):
+    GenreTitleIndex.objects.remove_titles(
+        getattr(instance, '_deleted_genre_pks', ()), (instance.pk,))
+
+
+@receiver(post_migrate)
+def restore_search_index(sender, using, **kwargs):
+    # SQLite пересоздаёт таблицу при изменении её схемы и теряет триггеры.
+    if sender.name == 'reviews':
+        ensure_search_index(connections[using])
@@ -0,0 +1,132 @@
+"""
+Похожие произведения по оценкам пользователей.
+
+Оценки центрируются по среднему каждого пользователя, после чего
+сходство двух произведений считается как косинус между их векторами
+оценок (adjusted cosine). Матрица пользователь × произведение хранится
+в разреженном виде — массивами (пользователь, произведение, оценка),
+упорядоченными по пользователю. Скалярные произведения считаются
+порциями произведений: для каждой оценки из порции берутся все оценки
+того же пользователя, а попарные произведения суммируются через
+`np.bincount`. Размер порции ограничен числом таких пар и размером
+плотного блока сходств, поэтому память не растёт с размером каталога.
+"""
+import numpy as np
+
+
+DEFAULT_TOP_K = 10
+PAIR_BUDGET = 4_000_000
+BLOCK_BUDGET = 4_000_000
+
+
+def load_reviews(reviews):
+    """Массивы автор, произведение и оценка из кверисета отзывов."""
+    count = reviews.count()
+    rows = np.fromiter(
+        (
+            value for row in reviews.values_list(
+                'author_id', 'title_id', 'score').iterator()
+            for value in row
+        ),
+        dtype=np.int64,
+        count=count * 3,
+    ).reshape(count, 3)
+    return rows[:, 0], rows[:, 1], rows[:, 2]
+
+
+def center_scores(users, scores):
+    """Вычитает из оценок среднюю оценку их автора."""
+    totals = np.bincount(users, weights=scores)
+    counts = np.bincount(users)
+    return (scores - totals[users] / counts[users]).astype(np.float32)
+
+
+def chunk_bounds(pair_counts, max_titles, pair_budget):
+    """Границы порций произведений с ограниченным числом пар."""
+    cumulative = np.cumsum(pair_counts)
+    start = 0
+    while start < len(pair_counts):
+        done = cumulative[start - 1] if start else 0
+        end = int(np.searchsorted(
+            cumulative, done + pair_budget, side='right'))
+        end = min(max(end, start + 1), start + max_titles)
+        yield start, end
+        start = end
+
+
+def compute_similar(author_ids, title_ids, scores, top_k=DEFAULT_TOP_K,
+                    pair_budget=PAIR_BUDGET, block_budget=BLOCK_BUDGET):
+    """
+    Для каждого произведения до `top_k` самых похожих с положительным
+    сходством. Возвращает массивы id произведения, id похожего
+    произведения и сходства.
+    """
+    empty = (
+        np.empty(0, np.int64), np.empty(0, np.int64), np.empty(0, np.float32)
+    )
+    if not len(scores):
+        return empty
+    user_ids, users = np.unique(author_ids, return_inverse=True)
+    titles_index, titles = np.unique(title_ids, return_inverse=True)
+    values = center_scores(users, np.asarray(scores, dtype=np.float64))
+
+    # Нулевые после центрирования оценки не влияют на сходство.
+    nonzero = values != 0
+    users, titles, values = users[nonzero], titles[nonzero], values[nonzero]
+    titles_count = len(titles_index)
+    norms = np.sqrt(
+        np.bincount(titles, weights=values ** 2, minlength=titles_count)
+    ).astype(np.float32)
+
+    # Разреженная матрица, упорядоченная по пользователю.
+    by_user = np.argsort(users, kind='stable')
+    user_degrees = np.bincount(users, minlength=len(user_ids))
+    user_starts = np.concatenate(([0], np.cumsum(user_degrees)[:-1]))
+    by_title = np.argsort(titles, kind='stable')
+    title_starts = np.searchsorted(titles[by_title], np.arange(titles_count))
+    title_starts = np.append(title_starts, len(titles))
+    pair_counts = np.bincount(
+        titles, weights=user_degrees[users], minlength=titles_count)
+
+    max_titles = max(1, block_budget // titles_count)
+    result = ([], [], [])
+    for start, end in chunk_bounds(pair_counts, max_titles, pair_budget):
+        entries = by_title[title_starts[start]:title_starts[end]]
+        if not len(entries):
+            continue
+        lengths = user_degrees[users[entries]]
+        total = int(lengths.sum())
+        offsets = np.arange(total) - np.repeat(
+            np.cumsum(lengths) - lengths, lengths)
+        partners = by_user[
+            np.repeat(user_starts[users[entries]], lengths) + offsets]
+        keys = (
+            np.repeat(titles[entries] - start, lengths) * titles_count
+            + titles[partners]
+        )
+        block = np.bincount(
+            keys,
+            weights=np.repeat(values[entries], lengths) * values[partners],
+            minlength=(end - start) * titles_count,
+        ).reshape(end - start, titles_count).astype(np.float32)
+        denominators = np.outer(norms[start:end], norms)
+        np.divide(block, denominators, out=block, where=denominators > 0)
+        block[np.arange(end - start), np.arange(start, end)] = 0
+        block[denominators == 0] = 0
+
+        k = min(top_k, titles_count - 1)
+        if k <= 0:
+            break
+        best = np.argpartition(-block, k - 1, axis=1)[:, :k]
+        similarity = np.take_along_axis(block, best, axis=1)
+        order = np.argsort(-similarity, axis=1, kind='stable')
+        best = np.take_along_axis(best, order, axis=1)
+        similarity = np.take_along_axis(similarity, order, axis=1)
+        rows = np.repeat(np.arange(start, end), k).reshape(end - start, k)
+        positive = similarity > 0
+        result[0].append(titles_index[rows[positive]])
+        result[1].append(titles_index[best[positive]])
+        result[2].append(similarity[positive])
+    if not result[0]:
+        return empty
+    return tuple(np.concatenate(parts) for parts in result)
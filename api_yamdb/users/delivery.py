@@ -0,0 +1,146 @@
+"""
+Фоновая отправка писем из очереди `EmailDelivery`.
+
+Запрос только сохраняет письмо и будит пул воркеров после фиксации
+транзакции. Воркер забирает пачку писем, отправляет её через одно
+соединение `get_connection()` и записывает результат. Неудачные письма
+повторяются с экспоненциальной задержкой, после `EMAIL_MAX_ATTEMPTS`
+попыток письмо получает статус `failed`. Текст отправленного или
+окончательно неотправленного письма стирается: в нём код подтверждения.
+
+При `EMAIL_QUEUE_WORKERS = 0` письма отправляются сразу после фиксации
+транзакции в потоке запроса. Письма, оставшиеся в очереди после
+перезапуска, отправляет команда `send_emails`.
+"""
+import logging
+import threading
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from users.models import EmailDelivery
+
+
+LEASE = timedelta(minutes=5)
+POLL_INTERVAL = 60
+
+logger = logging.getLogger(__name__)
+
+
+def retry_delay(attempts):
+    return timedelta(seconds=settings.EMAIL_RETRY_DELAY * 2 ** (attempts - 1))
+
+
+def mark_sent(delivery):
+    EmailDelivery.objects.filter(pk=delivery.pk).update(
+        status=EmailDelivery.Status.SENT,
+        attempts=delivery.attempts + 1,
+        sent_at=timezone.now(),
+        message='',
+        last_error='',
+        claim_token=None,
+    )
+
+
+def mark_failed(delivery, error):
+    attempts = delivery.attempts + 1
+    changes = {
+        'attempts': attempts, 'last_error': repr(error), 'claim_token': None
+    }
+    if attempts >= settings.EMAIL_MAX_ATTEMPTS:
+        changes.update(status=EmailDelivery.Status.FAILED, message='')
+    else:
+        changes['next_attempt_at'] = timezone.now() + retry_delay(attempts)
+    EmailDelivery.objects.filter(pk=delivery.pk).update(**changes)
+    logger.warning('Письмо %s не отправлено: %r', delivery.pk, error)
+
+
+def send_batch(deliveries):
+    """Отправляет письма через одно соединение с почтовым сервером."""
+    connection = get_connection()
+    try:
+        connection.open()
+    except Exception as error:
+        for delivery in deliveries:
+            mark_failed(delivery, error)
+        return
+    try:
+        for delivery in deliveries:
+            message = EmailMessage(
+                subject=delivery.subject,
+                body=delivery.message,
+                from_email=settings.EMAIL_HOST_USER,
+                to=[delivery.email],
+                connection=connection,
+            )
+            try:
+                message.send()
+            except Exception as error:
+                mark_failed(delivery, error)
+            else:
+                mark_sent(delivery)
+    finally:
+        connection.close()
+
+
+def deliver_pending(batch_size=None):
+    """Отправляет одну пачку писем. Возвращает количество писем в ней."""
+    deliveries = EmailDelivery.objects.claim(
+        batch_size or settings.EMAIL_BATCH_SIZE, LEASE, uuid.uuid4())
+    if deliveries:
+        send_batch(deliveries)
+    return len(deliveries)
+
+
+class DeliveryPool:
+    """Пул потоков, отправляющих письма из очереди."""
+
+    def __init__(self):
+        self.wakeup = threading.Event()
+        self.threads = []
+        self.lock = threading.Lock()
+
+    def start(self, workers):
+        with self.lock:
+            self.threads = [
+                thread for thread in self.threads if thread.is_alive()]
+            while len(self.threads) < workers:
+                thread = threading.Thread(
+                    target=self.run, name='email-delivery', daemon=True)
+                thread.start()
+                self.threads.append(thread)
+
+    def notify(self):
+        workers = settings.EMAIL_QUEUE_WORKERS
+        if not workers:
+            deliver_pending()
+            return
+        self.start(workers)
+        self.wakeup.set()
+
+    def run(self):
+        while True:
+            # Без сигнала воркер раз в POLL_INTERVAL проверяет повторы.
+            self.wakeup.wait(POLL_INTERVAL)
+            self.wakeup.clear()
+            try:
+                while deliver_pending():
+                    pass
+            except Exception:
+                logger.exception('Ошибка при отправке писем из очереди')
+            finally:
+                close_old_connections()
+
+
+pool = DeliveryPool()
+
+
+def queue_email(email, subject, message):
+    """Ставит письмо в очередь и будит воркеры после фиксации транзакции."""
+    EmailDelivery.objects.create(
+        email=email, subject=subject, message=message)
+    transaction.on_commit(pool.notify)
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from users.models import IssuedToken, RevokedToken
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаляет записи о выданных и отозванных токенах, срок действия '
+        'которых истёк.'
+    )
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        issued, _ = IssuedToken.objects.filter(expires_at__lte=now).delete()
+        revoked, _ = RevokedToken.objects.filter(
+            expires_at__lte=now).delete()
+        self.stdout.write(self.style.SUCCESS(
+            f'Удалено выданных токенов: {issued}, отозванных: {revoked}.'))
@@ -0,0 +1,34 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from users.delivery import POLL_INTERVAL, deliver_pending
+
+
+class Command(BaseCommand):
+    help = (
+        'Отправляет письма из очереди: однократно или в цикле как '
+        'отдельный воркер.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Не завершаться, а проверять очередь каждые '
+                 f'{POLL_INTERVAL} с.'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            sent = 0
+            while True:
+                batch = deliver_pending()
+                if not batch:
+                    break
+                sent += batch
+            if sent:
+                self.stdout.write(f'Обработано писем: {sent}')
+            if not options['loop']:
+                break
+            time.sleep(POLL_INTERVAL)
+        self.stdout.write(self.style.SUCCESS('Очередь писем обработана.'))
@@ -0,0 +1,55 @@
+# Generated by Django 3.2 on 2026-10-18 17:49
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0011_user_role_username_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IssuedToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('jti', models.CharField(max_length=255, unique=True, verbose_name='Идентификатор токена')),
+                ('expires_at', models.DateTimeField(verbose_name='Действует до')),
+            ],
+            options={
+                'verbose_name': 'выданный токен',
+                'verbose_name_plural': 'Выданные токены',
+                'ordering': ('-expires_at',),
+            },
+        ),
+        migrations.CreateModel(
+            name='RevokedToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('jti', models.CharField(max_length=255, unique=True, verbose_name='Идентификатор токена')),
+                ('expires_at', models.DateTimeField(verbose_name='Действует до')),
+                ('revoked_at', models.DateTimeField(auto_now_add=True, verbose_name='Отозван')),
+            ],
+            options={
+                'verbose_name': 'отозванный токен',
+                'verbose_name_plural': 'Отозванные токены',
+                'ordering': ('-revoked_at',),
+            },
+        ),
+        migrations.AddIndex(
+            model_name='revokedtoken',
+            index=models.Index(fields=['expires_at'], name='revoked_token_expires_idx'),
+        ),
+        migrations.AddField(
+            model_name='issuedtoken',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='issued_tokens', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь'),
+        ),
+        migrations.AddIndex(
+            model_name='issuedtoken',
+            index=models.Index(fields=['user', 'expires_at'], name='issued_token_user_idx'),
+        ),
+    ]
@@ -1,6 +1,7 @@
 from django.contrib.auth.models import AbstractUser
 from django.contrib.auth.validators import UnicodeUsernameValidator
 from django.db import models
+from django.utils import timezone
 
 from .validators import validate_username_not_prohibited
 
@@ -8,6 +9,9 @@ from .validators import validate_username_not_prohibited
 MAX_LENGTH_USERNAME = 150
 MAX_LENGTH_USER_ROLE = 20
 MAX_LENGTH_EMAIL = 254
+MAX_LENGTH_SUBJECT = 256
+MAX_LENGTH_DELIVERY_STATUS = 10
+MAX_LENGTH_JTI = 255
 
 
 class User(AbstractUser):
@@ -36,6 +40,11 @@ class User(AbstractUser):
         ordering = ('username', 'role')
         verbose_name = 'пользователь'
         verbose_name_plural = 'Пользователи'
+        indexes = (
+            models.Index(
+                fields=('role', 'username'), name='user_role_username_idx'
+            ),
+        )
 
     def __str__(self):
         return f'Пользователь: {self.username}'
@@ -45,3 +54,125 @@ class User(AbstractUser):
 
     def is_admin(self):
         return self.is_superuser or (self.role == self.UserRole.ADMIN)
+
+
+class EmailDeliveryQuerySet(models.QuerySet):
+    """Кверисет очереди писем."""
+
+    def due(self, now=None):
+        """Письма, которые пора отправить."""
+        return self.filter(
+            status=EmailDelivery.Status.PENDING,
+            next_attempt_at__lte=now or timezone.now(),
+        )
+
+    def claim(self, limit, lease, token):
+        """
+        Забирает до `limit` писем на время `lease`. Письма, не отправленные
+        за это время (например, из-за остановки воркера), снова попадут в
+        выборку `due`.
+        """
+        now = timezone.now()
+        ids = list(self.due(now).order_by(
+            'next_attempt_at', 'id').values_list('id', flat=True)[:limit])
+        self.due(now).filter(id__in=ids).update(
+            next_attempt_at=now + lease, claim_token=token)
+        return list(self.filter(claim_token=token).order_by('id'))
+
+
+class EmailDelivery(models.Model):
+    """Письмо в очереди на отправку и его статус."""
+    class Status(models.TextChoices):
+        PENDING = 'pending'
+        SENT = 'sent'
+        FAILED = 'failed'
+    email = models.EmailField('Получатель', max_length=MAX_LENGTH_EMAIL)
+    subject = models.CharField('Тема', max_length=MAX_LENGTH_SUBJECT)
+    message = models.TextField('Текст', blank=True)
+    status = models.CharField(
+        'Статус',
+        max_length=MAX_LENGTH_DELIVERY_STATUS,
+        choices=Status.choices,
+        default=Status.PENDING
+    )
+    attempts = models.PositiveSmallIntegerField('Попыток отправки', default=0)
+    next_attempt_at = models.DateTimeField(
+        'Следующая попытка', default=timezone.now)
+    claim_token = models.UUIDField('Метка воркера', null=True, blank=True)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+    created_at = models.DateTimeField('Создано', auto_now_add=True)
+    sent_at = models.DateTimeField('Отправлено', null=True, blank=True)
+
+    objects = EmailDeliveryQuerySet.as_manager()
+
+    class Meta:
+        ordering = ('-created_at',)
+        verbose_name = 'письмо'
+        verbose_name_plural = 'Очередь писем'
+        indexes = (
+            models.Index(
+                fields=('status', 'next_attempt_at'),
+                name='email_delivery_due_idx'
+            ),
+            models.Index(fields=('claim_token',), name='email_claim_idx'),
+        )
+
+    def __str__(self):
+        return f'Письмо {self.email}: {self.status}'
+
+
+class IssuedToken(models.Model):
+    """Выданный токен доступа: по нему отзываются токены пользователя."""
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='issued_tokens',
+        verbose_name='Пользователь'
+    )
+    jti = models.CharField(
+        'Идентификатор токена', max_length=MAX_LENGTH_JTI, unique=True)
+    expires_at = models.DateTimeField('Действует до')
+
+    class Meta:
+        ordering = ('-expires_at',)
+        verbose_name = 'выданный токен'
+        verbose_name_plural = 'Выданные токены'
+        indexes = (
+            models.Index(
+                fields=('user', 'expires_at'), name='issued_token_user_idx'
+            ),
+        )
+
+    def __str__(self):
+        return f'Токен {self.jti} пользователя {self.user_id}'
+
+
+class RevokedTokenQuerySet(models.QuerySet):
+    """Кверисет отозванных токенов."""
+
+    def active(self, now=None):
+        """Отозванные токены, срок действия которых ещё не истёк."""
+        return self.filter(expires_at__gt=now or timezone.now())
+
+
+class RevokedToken(models.Model):
+    """Токен доступа, отозванный до истечения срока действия."""
+    jti = models.CharField(
+        'Идентификатор токена', max_length=MAX_LENGTH_JTI, unique=True)
+    expires_at = models.DateTimeField('Действует до')
+    revoked_at = models.DateTimeField('Отозван', auto_now_add=True)
+
+    objects = RevokedTokenQuerySet.as_manager()
+
+    class Meta:
+        ordering = ('-revoked_at',)
+        verbose_name = 'отозванный токен'
+        verbose_name_plural = 'Отозванные токены'
+        indexes = (
+            models.Index(
+                fields=('expires_at',), name='revoked_token_expires_idx'
+            ),
+        )
+
+    def __str__(self):
+        return f'Отозванный токен {self.jti}'
@@ -1,7 +1,7 @@
 from django.core.exceptions import ValidationError
 
 
-PROHIBITED_USERNAMES = ('me',)
+PROHIBITED_USERNAMES = ('me', 'bulk-update', 'bulk-delete')
 
 
 def validate_username_not_prohibited(value):
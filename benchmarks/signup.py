@@ -0,0 +1,90 @@
+"""
+Пропускная способность регистрации при большой таблице пользователей.
+
+Запуск из корня репозитория:
+    python -m benchmarks.signup --users 1000000
+
+Письма только ставятся в очередь и не отправляются, чтобы замер
+показывал стоимость самой регистрации.
+"""
+import argparse
+import time
+
+from benchmarks.utils import benchmark_database, print_table, setup_django
+
+
+def populate(users_count, batch_size=10000):
+    from users.models import User
+
+    for start in range(0, users_count, batch_size):
+        User.objects.bulk_create(
+            User(
+                username=f'user{number}',
+                email=f'user{number}@yamdb.fake',
+                password='!',
+            )
+            for number in range(
+                start, min(start + batch_size, users_count))
+        )
+
+
+def signups_per_second(view, factory, payloads):
+    from django.db import connection
+
+    queries = 0
+
+    def count_queries(execute, *args):
+        nonlocal queries
+        queries += 1
+        return execute(*args)
+
+    with connection.execute_wrapper(count_queries):
+        start = time.perf_counter()
+        for payload in payloads:
+            response = view(factory.post('/api/v1/auth/signup/', payload))
+            assert response.status_code == 200, response.data
+        elapsed = time.perf_counter() - start
+    return len(payloads) / elapsed, queries / len(payloads)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--users', type=int, default=1000000)
+    parser.add_argument('--signups', type=int, default=2000)
+    args = parser.parse_args()
+
+    setup_django()
+    from rest_framework.test import APIRequestFactory
+
+    from api.v1.views import RegistrationView
+    from users import delivery
+
+    # Пул писем не запускаем: письма остаются в очереди.
+    delivery.pool.notify = lambda: None
+    # Измеряется регистрация, а не ограничение частоты запросов.
+    view = RegistrationView.as_view(throttle_classes=())
+    factory = APIRequestFactory()
+
+    with benchmark_database():
+        populate(args.users)
+        new_users = [
+            {'username': f'new{number}', 'email': f'new{number}@yamdb.fake'}
+            for number in range(args.signups)
+        ]
+        existing_users = [
+            {'username': f'user{number}', 'email': f'user{number}@yamdb.fake'}
+            for number in range(0, args.users, args.users // args.signups or 1)
+        ][:args.signups]
+        rows = []
+        for name, payloads in (
+            ('новый пользователь', new_users),
+            ('повторный запрос кода', existing_users),
+        ):
+            rate, queries = signups_per_second(view, factory, payloads)
+            rows.append((name, f'{rate:.0f}', f'{queries:.1f}'))
+        print(f'Пользователей в таблице: {args.users}')
+        print_table(('сценарий', 'регистраций/с', 'запросов к БД'), rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""
+Время расчёта похожих произведений по матрице оценок.
+
+Запуск из корня репозитория:
+    python -m benchmarks.similar_titles --reviews 1000000
+
+С флагом --database отзывы записываются во временную БД и замеряется
+полная пересборка таблицы похожих произведений, включая чтение и запись.
+"""
+import argparse
+
+import numpy as np
+
+from benchmarks.utils import (
+    benchmark_database, measure, print_table, setup_django
+)
+
+
+def generate_reviews(reviews_count, users_count, titles_count, seed=0):
+    """
+    Оценки с неравномерной популярностью: небольшая часть произведений
+    собирает большую часть отзывов. Пара автор–произведение уникальна.
+    """
+    rng = np.random.default_rng(seed)
+    count = int(reviews_count * 1.2)
+    titles = np.minimum(
+        rng.zipf(1.3, count) - 1, titles_count - 1
+    ) + rng.integers(0, 2, count) * rng.integers(0, titles_count, count)
+    titles %= titles_count
+    users = rng.integers(0, users_count, count)
+    _, first = np.unique(users * titles_count + titles, return_index=True)
+    first = rng.permutation(first)[:reviews_count]
+    tastes = rng.normal(size=(users_count, 4))
+    features = rng.normal(size=(titles_count, 4))
+    scores = np.clip(np.rint(
+        5.5 + (tastes[users[first]] * features[titles[first]]).sum(axis=1)
+    ), 1, 10).astype(np.int64)
+    return users[first] + 1, titles[first] + 1, scores
+
+
+def populate(users, titles, scores, batch_size=10000):
+    from reviews.models import Review, Title
+    from users.models import User
+
+    User.objects.bulk_create(
+        (User(id=user_id, username=f'user{user_id}',
+              email=f'user{user_id}@yamdb.fake')
+         for user_id in np.unique(users).tolist()),
+        batch_size=batch_size,
+    )
+    Title.objects.bulk_create(
+        (Title(id=title_id, name=f'Произведение {title_id}', year=2000)
+         for title_id in np.unique(titles).tolist()),
+        batch_size=batch_size,
+    )
+    Review.objects.bulk_create(
+        (Review(author_id=user_id, title_id=title_id, text='Текст',
+                score=score)
+         for user_id, title_id, score in zip(
+             users.tolist(), titles.tolist(), scores.tolist())),
+        batch_size=batch_size,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--reviews', type=int, default=1000000)
+    parser.add_argument('--users', type=int, default=100000)
+    parser.add_argument('--titles', type=int, default=20000)
+    parser.add_argument('--top-k', type=int, default=10)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--database', action='store_true')
+    args = parser.parse_args()
+
+    setup_django()
+    from reviews.models import SimilarTitle
+    from reviews.similarity import compute_similar
+
+    users, titles, scores = generate_reviews(
+        args.reviews, args.users, args.titles)
+    compute = measure(
+        lambda: compute_similar(users, titles, scores, args.top_k),
+        args.repeat
+    )
+    rows = [('compute_similar', f'{compute:.0f}')]
+    if args.database:
+        with benchmark_database():
+            populate(users, titles, scores)
+            rebuild = measure(
+                lambda: SimilarTitle.objects.rebuild(args.top_k), args.repeat)
+            rows.append(('SimilarTitle.objects.rebuild', f'{rebuild:.0f}'))
+    print(
+        f'Отзывов: {len(scores)}, пользователей: {len(np.unique(users))}, '
+        f'произведений: {len(np.unique(titles))}'
+    )
+    print_table(('этап', 'время, мс'), rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""
+Сравнение поиска произведений через FTS5 и `icontains`.
+
+Запуск из корня репозитория:
+    python -m benchmarks.title_search --titles 100000
+"""
+import argparse
+import random
+
+from benchmarks.utils import (
+    benchmark_database, measure, print_table, setup_django
+)
+
+
+WORDS = (
+    'война', 'мир', 'звёздные', 'войны', 'ёжик', 'туман', 'побег',
+    'крёстный', 'отец', 'список', 'властелин', 'колец', 'братство',
+    'матрица', 'гнездо', 'кукушка', 'будущее', 'операция', 'шурик',
+    'джентльмены', 'удача', 'страх', 'ненависть', 'история', 'игрушек',
+    'город', 'ночь', 'день', 'море', 'остров', 'сокровищ', 'дорога',
+    'stairway', 'heaven', 'smoke', 'water', 'blue', 'suede', 'shoes',
+)
+QUERIES = ('мир', 'ёжик', 'ЗВЁЗДНЫЕ ВОЙНЫ', 'сокров', 'heaven')
+
+
+def populate(titles_count, batch_size=10000):
+    from reviews.models import Title
+
+    rng = random.Random(0)
+    for start in range(0, titles_count, batch_size):
+        Title.objects.bulk_create(
+            Title(
+                name=' '.join(rng.sample(WORDS, rng.randint(1, 5))).title(),
+                year=rng.randint(1900, 2020),
+            )
+            for _ in range(min(batch_size, titles_count - start))
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--titles', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+    from reviews.models import Title
+
+    with benchmark_database():
+        populate(args.titles)
+        rows = []
+        for query in QUERIES:
+            icontains = Title.objects.filter(name__icontains=query)
+            search = Title.objects.search(query)
+            rows.append((
+                query,
+                icontains.count(),
+                search.count(),
+                f'{measure(lambda: list(icontains[:5]), args.repeat):.2f}',
+                f'{measure(lambda: list(search[:5]), args.repeat):.2f}',
+                f'{measure(icontains.count, args.repeat):.2f}',
+                f'{measure(search.count, args.repeat):.2f}',
+            ))
+        print(f'Произведений: {args.titles}')
+        print_table(
+            ('запрос', 'icontains', 'fts5', 'страница icontains, мс',
+             'страница fts5, мс', 'count icontains, мс', 'count fts5, мс'),
+            rows
+        )
+
+
+if __name__ == '__main__':
+    main()
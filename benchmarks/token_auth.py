@@ -0,0 +1,78 @@
+"""
+Аутентификация по JWT: проверка подписи на каждый запрос против кеша
+проверенных токенов с проверкой отзыва по фильтру Блума.
+
+Запуск из корня репозитория:
+    python -m benchmarks.token_auth --revoked 100000
+"""
+import argparse
+import time
+import uuid
+from datetime import timedelta
+
+from benchmarks.utils import benchmark_database, print_table, setup_django
+
+
+def populate(revoked_count, batch_size=10000):
+    from django.utils import timezone
+
+    from users.models import RevokedToken
+
+    expires_at = timezone.now() + timedelta(days=1)
+    for start in range(0, revoked_count, batch_size):
+        RevokedToken.objects.bulk_create(
+            RevokedToken(jti=uuid.uuid4().hex, expires_at=expires_at)
+            for _ in range(start, min(start + batch_size, revoked_count))
+        )
+
+
+def authentications_per_second(authentication, requests):
+    start = time.perf_counter()
+    for request in requests:
+        authentication.authenticate(request)
+    return len(requests) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--revoked', type=int, default=100000)
+    parser.add_argument('--requests', type=int, default=20000)
+    args = parser.parse_args()
+
+    setup_django()
+    from rest_framework.test import APIRequestFactory
+    from rest_framework_simplejwt.authentication import JWTAuthentication
+
+    from api.v1.authentication import JWTClaimsAuthentication, issue_token
+    from api.v1.revocation import revocation_list
+    from users.models import User
+
+    with benchmark_database():
+        populate(args.revoked)
+        user = User.objects.create(
+            username='reader', email='reader@yamdb.fake', password='!')
+        factory = APIRequestFactory()
+        request = factory.get(
+            '/api/v1/categories/',
+            HTTP_AUTHORIZATION=f'Bearer {issue_token(user)}'
+        )
+        requests = [request] * args.requests
+        start = time.perf_counter()
+        revocation_list.load(None)
+        load_ms = (time.perf_counter() - start) * 1000
+        rows = [
+            (name, f'{authentications_per_second(method, requests):.0f}')
+            for name, method in (
+                ('подпись на каждый запрос + пользователь из БД',
+                 JWTAuthentication()),
+                ('кеш токенов + отзыв по фильтру Блума',
+                 JWTClaimsAuthentication()),
+            )
+        ]
+        print(f'Отозванных токенов: {args.revoked}, '
+              f'загрузка фильтра: {load_ms:.0f} мс')
+        print_table(('способ', 'аутентификаций/с'), rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""
+Поиск пользователей в админке: `icontains` против поиска по префиксу.
+
+Запуск из корня репозитория:
+    python -m benchmarks.user_search --users 1000000
+"""
+import argparse
+import random
+
+from benchmarks.utils import (
+    benchmark_database, measure, print_table, setup_django
+)
+
+
+QUERIES = ('user12', 'user99999', 'mod', 'nobody')
+ROLES = ('user',) * 18 + ('moderator', 'admin')
+PAGE_SIZE = 5
+
+
+def populate(users_count, batch_size=10000):
+    from users.models import User
+
+    rng = random.Random(0)
+    for start in range(0, users_count, batch_size):
+        users = []
+        for number in range(start, min(start + batch_size, users_count)):
+            role = rng.choice(ROLES)
+            prefix = 'user' if role == 'user' else role[:3]
+            users.append(User(
+                username=f'{prefix}{number}',
+                email=f'{prefix}{number}@yamdb.fake',
+                role=role,
+                password='!',
+            ))
+        User.objects.bulk_create(users)
+
+
+def page(queryset):
+    """Как в списке пользователей: количество и первая страница."""
+    return queryset.count(), list(queryset[:PAGE_SIZE])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--users', type=int, default=1000000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+    from api.v1.filters import UserFilter
+    from users.models import User
+
+    def prefix_search(**params):
+        return UserFilter(params, queryset=User.objects.all()).qs
+
+    with benchmark_database():
+        populate(args.users)
+        rows = []
+        for query in QUERIES:
+            icontains = User.objects.filter(username__icontains=query)
+            prefix = prefix_search(search=query)
+            rows.append((
+                f'search={query}',
+                icontains.count(),
+                prefix.count(),
+                f'{measure(lambda: page(icontains), args.repeat):.2f}',
+                f'{measure(lambda: page(prefix), args.repeat):.2f}',
+            ))
+        for role in ('admin', 'moderator'):
+            scan = User.objects.filter(role__iexact=role)
+            indexed = prefix_search(role=role)
+            rows.append((
+                f'role={role}',
+                scan.count(),
+                indexed.count(),
+                f'{measure(lambda: page(scan), args.repeat):.2f}',
+                f'{measure(lambda: page(indexed), args.repeat):.2f}',
+            ))
+        print(f'Пользователей: {args.users}')
+        print_table(
+            ('запрос', 'найдено icontains/iexact', 'найдено по индексу',
+             'icontains/iexact, мс', 'по индексу, мс'),
+            rows
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,25 @@
+import pytest
+from django.core.cache import cache
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    from api.v1.authentication import token_cache, user_cache
+    from api.v1.cache import state_cache
+    from api.v1.revocation import revocation_list
+    from api.v1.throttling import local_store
+
+    cache.clear()
+    state_cache.clear()
+    user_cache.clear()
+    token_cache.clear()
+    local_store.clear()
+    # БД теста пуста, отозванных токенов в ней нет.
+    revocation_list.reset()
+    yield
+    cache.clear()
+    state_cache.clear()
+    user_cache.clear()
+    token_cache.clear()
+    local_store.clear()
+    revocation_list.reset()
@@ -0,0 +1,7 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def synchronous_email(settings):
+    # Письма отправляются сразу, чтобы проверять mail.outbox после запроса.
+    settings.EMAIL_QUEUE_WORKERS = 0
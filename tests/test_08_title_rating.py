@@ -0,0 +1,126 @@
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Review, Title
+from tests.utils import create_reviews
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08TitleRating:
+
+    TITLE_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+    REVIEW_DETAIL_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/'
+    )
+
+    def get_title(self, client, title_id):
+        response = client.get(
+            self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=title_id)
+        )
+        assert response.status_code == HTTPStatus.OK
+        return response.json()
+
+    def test_01_rating_follows_reviews(self, client, admin_client, admin,
+                                       user_client, user, moderator_client,
+                                       moderator):
+        author_map = {
+            admin: admin_client,
+            user: user_client,
+            moderator: moderator_client
+        }
+        reviews, titles = create_reviews(admin_client, author_map)
+        title_id = titles[0]['id']
+        assert self.get_title(client, title_id)['rating'] == 5, (
+            'Проверьте, что рейтинг произведения равен средней оценке '
+            'оставленных к нему отзывов.'
+        )
+        assert self.get_title(client, titles[1]['id'])['rating'] is None, (
+            'Проверьте, что у произведения без отзывов рейтинг равен `None`.'
+        )
+
+        user_review = next(
+            review for review in reviews if review['author'] == user.username
+        )
+        response = user_client.patch(
+            self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=title_id, review_id=user_review['id']
+            ),
+            data={'score': 8}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert self.get_title(client, title_id)['rating'] == 6, (
+            'Проверьте, что рейтинг произведения пересчитывается при '
+            'изменении оценки отзыва.'
+        )
+
+        response = admin_client.delete(
+            self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=title_id, review_id=user_review['id']
+            )
+        )
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert self.get_title(client, title_id)['rating'] == 5, (
+            'Проверьте, что рейтинг произведения пересчитывается при '
+            'удалении отзыва.'
+        )
+
+        moderator_review = next(
+            review for review in reviews
+            if review['author'] == moderator.username
+        )
+        moderator_client.patch(
+            self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=title_id, review_id=moderator_review['id']
+            ),
+            data={'score': 9}
+        )
+        assert self.get_title(client, title_id)['rating'] == 7
+        moderator.delete()
+        assert self.get_title(client, title_id)['rating'] == 5, (
+            'Проверьте, что рейтинг произведения пересчитывается при '
+            'каскадном удалении отзывов вместе с автором.'
+        )
+
+    def test_02_rebuild_ratings_command(self, client, admin_client, admin,
+                                        user_client, user):
+        author_map = {admin: admin_client, user: user_client}
+        _, titles = create_reviews(admin_client, author_map)
+        Title.objects.update(rating_sum=0, rating_count=0)
+        assert self.get_title(client, titles[0]['id'])['rating'] is None
+        call_command('rebuild_ratings', stdout=StringIO())
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert (title.rating_sum, title.rating_count) == (10, 2), (
+            'Проверьте, что команда `rebuild_ratings` пересчитывает сумму и '
+            'количество оценок произведений.'
+        )
+
+    def test_03_title_delete_skips_rating_updates(self, django_user_model,
+                                                  user):
+        authors = [
+            django_user_model.objects.create_user(
+                username=f'critic{i}', email=f'critic{i}@yamdb.fake')
+            for i in range(5)
+        ]
+        counts = []
+        for reviews_count in (1, 5):
+            title = Title.objects.create(name='Произведение', year=2000)
+            for author in authors[:reviews_count]:
+                Review.objects.create(
+                    author=author, title=title, text='Текст', score=5)
+            with CaptureQueriesContext(connection) as context:
+                title.delete()
+            counts.append(len(context))
+        assert counts[0] == counts[1], (
+            'Проверьте, что удаление произведения не пересчитывает его '
+            'рейтинг для каждого удаляемого отзыва.'
+        )
+        survivor = Title.objects.create(name='Другое', year=2000)
+        Review.objects.create(author=user, title=survivor, text='Т', score=4)
+        Review.objects.get(title=survivor).delete()
+        survivor.refresh_from_db()
+        assert survivor.rating_count == 0
@@ -0,0 +1,147 @@
+import pytest
+
+from reviews.models import Category, Comment, Genre, Review, Title
+
+
+TITLES_COUNT = 6
+REVIEWS_COUNT = 6
+
+QUERY_COUNT_CASES = (
+    ('titles-list', 'client', 'get', '/api/v1/titles/', None, 3),
+    ('titles-retrieve', 'client', 'get', '/api/v1/titles/{title_id}/',
+     None, 2),
+    ('titles-create', 'admin_client', 'post', '/api/v1/titles/',
+     {'name': 'Новое', 'year': 2000, 'genre': ['genre-0', 'genre-1'],
+      'category': 'category-0'}, 14),
+    ('titles-partial-update', 'admin_client', 'patch',
+     '/api/v1/titles/{title_id}/', {'name': 'Другое', 'genre': ['genre-2']},
+     19),
+    ('titles-destroy', 'admin_client', 'delete',
+     '/api/v1/titles/{title_id}/', None, 19),
+    ('titles-stats', 'client', 'get', '/api/v1/titles/{title_id}/stats/',
+     None, 2),
+    ('titles-similar', 'client', 'get',
+     '/api/v1/titles/{title_id}/similar/', None, 2),
+    ('titles-trending', 'client', 'get', '/api/v1/titles/trending/', None,
+     3),
+    ('reviews-list', 'client', 'get', '/api/v1/titles/{title_id}/reviews/',
+     None, 3),
+    ('reviews-list-cursor', 'client', 'get',
+     '/api/v1/titles/{title_id}/reviews/?pagination=cursor', None, 2),
+    ('reviews-retrieve', 'client', 'get',
+     '/api/v1/titles/{title_id}/reviews/{review_id}/', None, 2),
+    ('reviews-create', 'admin_client', 'post',
+     '/api/v1/titles/{other_title_id}/reviews/',
+     {'text': 'Отзыв', 'score': 7}, 12),
+    ('reviews-partial-update', 'moderator_client', 'patch',
+     '/api/v1/titles/{title_id}/reviews/{review_id}/', {'score': 3}, 10),
+    ('reviews-destroy', 'moderator_client', 'delete',
+     '/api/v1/titles/{title_id}/reviews/{review_id}/', None, 11),
+    ('comments-list', 'client', 'get',
+     '/api/v1/titles/{title_id}/reviews/{review_id}/comments/', None, 3),
+    ('comments-retrieve', 'client', 'get',
+     '/api/v1/titles/{title_id}/reviews/{review_id}/comments/{comment_id}/',
+     None, 2),
+    ('comments-create', 'user_client', 'post',
+     '/api/v1/titles/{title_id}/reviews/{review_id}/comments/',
+     {'text': 'Комментарий'}, 6),
+    ('comments-partial-update', 'moderator_client', 'patch',
+     '/api/v1/titles/{title_id}/reviews/{review_id}/comments/{comment_id}/',
+     {'text': 'Исправлено'}, 5),
+    ('comments-destroy', 'moderator_client', 'delete',
+     '/api/v1/titles/{title_id}/reviews/{review_id}/comments/{comment_id}/',
+     None, 6),
+    ('users-list', 'admin_client', 'get', '/api/v1/users/', None, 3),
+    ('users-retrieve', 'admin_client', 'get', '/api/v1/users/{username}/',
+     None, 2),
+    # Письмо в тестах отправляется синхронно: вставка в очередь и ещё
+    # 4 запроса на отправку.
+    ('auth-signup', 'client', 'post', '/api/v1/auth/signup/',
+     {'username': 'new_user', 'email': 'new_user@yamdb.fake'}, 7),
+    ('auth-signup-existing', 'client', 'post', '/api/v1/auth/signup/',
+     {'username': 'TestUser', 'email': 'testuser@yamdb.fake'}, 6),
+    ('users-create', 'admin_client', 'post', '/api/v1/users/',
+     {'username': 'new_user', 'email': 'new_user@yamdb.fake'}, 4),
+    ('users-partial-update', 'admin_client', 'patch',
+     '/api/v1/users/{username}/', {'bio': 'Новая биография'}, 3),
+    ('users-destroy', 'admin_client', 'delete', '/api/v1/users/{username}/',
+     None, 20),
+    ('users-me', 'user_client', 'get', '/api/v1/users/me/', None, 1),
+    ('users-me-update', 'user_client', 'patch', '/api/v1/users/me/',
+     {'bio': 'Моя биография'}, 2),
+    ('categories-list', 'client', 'get', '/api/v1/categories/', None, 2),
+    ('categories-create', 'admin_client', 'post', '/api/v1/categories/',
+     {'name': 'Музыка', 'slug': 'music'}, 3),
+    ('categories-destroy', 'admin_client', 'delete',
+     '/api/v1/categories/{category_slug}/', None, 6),
+    ('genres-list', 'client', 'get', '/api/v1/genres/', None, 2),
+    ('genres-create', 'admin_client', 'post', '/api/v1/genres/',
+     {'name': 'Рок', 'slug': 'rock'}, 3),
+    ('genres-destroy', 'admin_client', 'delete',
+     '/api/v1/genres/{genre_slug}/', None, 6),
+)
+
+
+@pytest.fixture
+def catalog(django_user_model, admin, moderator, user):
+    categories = [
+        Category.objects.create(name=f'Категория {i}', slug=f'category-{i}')
+        for i in range(2)
+    ]
+    genres = [
+        Genre.objects.create(name=f'Жанр {i}', slug=f'genre-{i}')
+        for i in range(3)
+    ]
+    titles = []
+    for i in range(TITLES_COUNT):
+        title = Title.objects.create(
+            name=f'Произведение {i}', year=2000 + i,
+            category=categories[i % len(categories)]
+        )
+        title.genre.set(genres[:i % len(genres) + 1])
+        titles.append(title)
+    authors = [user] + [
+        django_user_model.objects.create_user(
+            username=f'author_{i}', email=f'author_{i}@yamdb.fake'
+        )
+        for i in range(REVIEWS_COUNT - 1)
+    ]
+    reviews = [
+        Review.objects.create(
+            author=author, title=titles[0], text='Текст', score=i + 1
+        )
+        for i, author in enumerate(authors)
+    ]
+    comments = [
+        Comment.objects.create(author=author, review=reviews[0], text='Текст')
+        for author in authors
+    ]
+    return {
+        'title_id': titles[0].id,
+        'other_title_id': titles[1].id,
+        'review_id': reviews[0].id,
+        'comment_id': comments[0].id,
+        'username': authors[1].username,
+        'category_slug': categories[0].slug,
+        'genre_slug': genres[0].slug,
+    }
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09QueryCount:
+
+    @pytest.mark.parametrize(
+        'client_name,method,url,data,expected_queries',
+        [case[1:] for case in QUERY_COUNT_CASES],
+        ids=[case[0] for case in QUERY_COUNT_CASES]
+    )
+    def test_query_count(self, request, catalog, django_assert_num_queries,
+                         client_name, method, url, data, expected_queries):
+        client = request.getfixturevalue(client_name)
+        url = url.format(**catalog)
+        with django_assert_num_queries(expected_queries):
+            response = getattr(client, method)(url, data=data)
+        assert response.status_code < 400, (
+            f'Запрос {method.upper()} к `{url}` завершился ошибкой: '
+            f'{response.status_code}.'
+        )
@@ -0,0 +1,118 @@
+from http import HTTPStatus
+
+import pytest
+
+from reviews.models import Category, Review, Title
+
+
+OBJECTS_COUNT = 12
+MAX_PAGES = 300
+
+
+@pytest.fixture
+def title_with_reviews(django_user_model):
+    category = Category.objects.create(name='Фильм', slug='movie')
+    titles = [
+        Title.objects.create(
+            name=f'Произведение {i % 3}', year=2000, category=category
+        )
+        for i in range(OBJECTS_COUNT)
+    ]
+    for i in range(OBJECTS_COUNT):
+        author = django_user_model.objects.create_user(
+            username=f'author_{i}', email=f'author_{i}@yamdb.fake'
+        )
+        Review.objects.create(
+            author=author, title=titles[0], text='Текст', score=5
+        )
+    return titles[0]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10CursorPagination:
+
+    TITLES_URL = '/api/v1/titles/'
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+
+    def walk(self, client, url):
+        ids = []
+        pages = 0
+        while url:
+            response = client.get(url)
+            assert response.status_code == HTTPStatus.OK
+            data = response.json()
+            assert 'count' not in data, (
+                'Проверьте, что в курсорном режиме пагинации не выполняется '
+                'подсчёт общего количества объектов.'
+            )
+            assert {'next', 'previous', 'results'} <= set(data)
+            ids.extend(obj['id'] for obj in data['results'])
+            url = data['next']
+            pages += 1
+            assert pages <= MAX_PAGES, (
+                'Проверьте, что курсорная пагинация не зацикливается.')
+        return ids, pages
+
+    @pytest.mark.parametrize('url_template,ordering', (
+        (REVIEWS_URL_TEMPLATE, ('-pub_date', 'id')),
+        (TITLES_URL, ('name', 'id')),
+    ))
+    def test_01_cursor_walks_all_objects(self, client, title_with_reviews,
+                                         url_template, ordering):
+        url = url_template.format(title_id=title_with_reviews.id)
+        ids, pages = self.walk(client, f'{url}?pagination=cursor')
+        queryset = (
+            title_with_reviews.reviews.all()
+            if url_template == self.REVIEWS_URL_TEMPLATE
+            else Title.objects.all()
+        )
+        expected = list(
+            queryset.order_by(*ordering).values_list('id', flat=True)
+        )
+        assert ids == expected, (
+            f'Проверьте, что курсорная пагинация `{url}` возвращает все '
+            'объекты ровно по одному разу в порядке сортировки модели.'
+        )
+        assert pages > 1
+
+    def test_02_page_number_is_default(self, client, title_with_reviews):
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=title_with_reviews.id)
+        data = client.get(url).json()
+        assert data['count'] == OBJECTS_COUNT, (
+            f'Проверьте, что по умолчанию `{url}` использует пагинацию по '
+            'номеру страницы.'
+        )
+        data = client.get(f'{url}?page=2').json()
+        assert data['count'] == OBJECTS_COUNT
+
+    def test_03_previous_cursor(self, client, title_with_reviews):
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=title_with_reviews.id)
+        first = client.get(f'{url}?pagination=cursor').json()
+        second = client.get(first['next']).json()
+        back = client.get(second['previous']).json()
+        assert back['results'] == first['results'], (
+            'Проверьте, что курсор `previous` возвращает предыдущую страницу.'
+        )
+
+    def test_04_long_runs_of_equal_values(self, client, django_user_model):
+        # Больше offset_cutoff (1000) отзывов с одинаковым comment_count.
+        title = Title.objects.create(name='Популярное', year=2000)
+        django_user_model.objects.bulk_create(
+            django_user_model(
+                username=f'reader_{i}', email=f'reader_{i}@yamdb.fake')
+            for i in range(1020)
+        )
+        Review.objects.bulk_create(
+            Review(author_id=author_id, title=title, text='Текст', score=5)
+            for author_id in django_user_model.objects.filter(
+                username__startswith='reader_').values_list('id', flat=True)
+        )
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=title.id)
+        ids, _ = self.walk(
+            client, f'{url}?pagination=cursor&ordering=-comment_count')
+        expected = list(title.reviews.order_by(
+            '-comment_count', 'id').values_list('id', flat=True))
+        assert ids == expected, (
+            'Проверьте, что курсорная пагинация не теряет и не повторяет '
+            'объекты при длинной серии одинаковых значений сортировки.'
+        )
@@ -0,0 +1,83 @@
+from http import HTTPStatus
+
+import pytest
+
+from reviews.models import Title
+
+
+TITLE_NAMES = (
+    'Ёжик в тумане',
+    'Побег из Шоушенка',
+    'ЗВЁЗДНЫЕ ВОЙНЫ',
+    'Звездная пыль',
+    'Война и мир',
+    'Мир',
+)
+
+
+@pytest.fixture
+def titles():
+    return {
+        name: Title.objects.create(name=name, year=2000)
+        for name in TITLE_NAMES
+    }
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11TitleSearch:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def search(self, client, text):
+        response = client.get(self.TITLES_URL, {'search': text})
+        assert response.status_code == HTTPStatus.OK
+        return [title['name'] for title in response.json()['results']]
+
+    @pytest.mark.parametrize('text,expected', (
+        ('ежик', ['Ёжик в тумане']),
+        ('ТУМАН', ['Ёжик в тумане']),
+        ('шоушенк', ['Побег из Шоушенка']),
+        ('звезд', ['Звездная пыль', 'ЗВЁЗДНЫЕ ВОЙНЫ']),
+        ('звёздные войны', ['ЗВЁЗДНЫЕ ВОЙНЫ']),
+        ('!!!', []),
+    ))
+    def test_01_search_folds_case_and_yo(self, client, titles, text,
+                                         expected):
+        assert sorted(self.search(client, text)) == sorted(expected), (
+            f'Проверьте, что поиск `{self.TITLES_URL}?search=` находит '
+            'произведения без учёта регистра и различия `е`/`ё`.'
+        )
+
+    def test_02_search_is_ranked(self, client, titles):
+        assert self.search(client, 'мир') == ['Мир', 'Война и мир'], (
+            'Проверьте, что результаты поиска отсортированы по '
+            'релевантности.'
+        )
+
+    def test_03_search_follows_title_writes(self, client, admin_client,
+                                            titles):
+        title = titles['Мир']
+        response = admin_client.patch(
+            f'{self.TITLES_URL}{title.id}/', data={'name': 'Тишина'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert self.search(client, 'тишина') == ['Тишина'], (
+            'Проверьте, что поисковый индекс обновляется при изменении '
+            'названия произведения.'
+        )
+        assert self.search(client, 'мир') == ['Война и мир']
+        titles['Война и мир'].delete()
+        assert self.search(client, 'мир') == [], (
+            'Проверьте, что удалённые произведения исчезают из поиска.'
+        )
+
+    def test_04_search_rejected_in_cursor_mode(self, client, titles):
+        response = client.get(
+            self.TITLES_URL, {'search': 'мир', 'pagination': 'cursor'})
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что поиск с курсорной пагинацией отклоняется: '
+            'курсор не сохраняет порядок по релевантности.'
+        )
+        response = client.get(
+            self.TITLES_URL, {'search': '', 'pagination': 'cursor'})
+        assert response.status_code == HTTPStatus.OK
@@ -0,0 +1,94 @@
+from http import HTTPStatus
+
+import pytest
+
+from reviews.models import Category, Genre, GenreTitleIndex, Title
+
+
+@pytest.fixture
+def catalog():
+    movie = Category.objects.create(name='Фильм', slug='movie')
+    book = Category.objects.create(name='Книга', slug='book')
+    music = Category.objects.create(name='Музыка', slug='music')
+    drama, comedy, horror = (
+        Genre.objects.create(name=slug, slug=slug)
+        for slug in ('drama', 'comedy', 'horror')
+    )
+    titles = {}
+    for name, category, genres in (
+        ('Драма', movie, (drama,)),
+        ('Комедия', book, (comedy,)),
+        ('Трагикомедия', movie, (drama, comedy)),
+        ('Ужасы', music, (horror,)),
+    ):
+        title = Title.objects.create(name=name, year=2000, category=category)
+        title.genre.set(genres)
+        titles[name] = title
+    return titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12GenreFilter:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def filter_names(self, client, **params):
+        response = client.get(self.TITLES_URL, params)
+        assert response.status_code == HTTPStatus.OK
+        return sorted(title['name'] for title in response.json()['results'])
+
+    @pytest.mark.parametrize('params,expected', (
+        ({'genre': 'drama'}, ['Драма', 'Трагикомедия']),
+        ({'genre': 'drama,comedy'}, ['Драма', 'Комедия', 'Трагикомедия']),
+        ({'genre': 'drama,comedy', 'genre_match': 'any'},
+         ['Драма', 'Комедия', 'Трагикомедия']),
+        ({'genre': 'drama,comedy', 'genre_match': 'all'}, ['Трагикомедия']),
+        ({'genre': 'drama,unknown', 'genre_match': 'all'}, []),
+        ({'genre': 'drama,comedy', 'category': 'book'}, ['Комедия']),
+        ({'category': 'movie,music'}, ['Драма', 'Трагикомедия', 'Ужасы']),
+    ))
+    def test_01_multi_value_filters(self, client, catalog, params, expected):
+        assert self.filter_names(client, **params) == expected, (
+            f'Проверьте, что `{self.TITLES_URL}` фильтрует произведения по '
+            'нескольким жанрам и категориям.'
+        )
+
+    def test_02_index_follows_genre_changes(self, client, admin_client,
+                                            catalog):
+        title = catalog['Ужасы']
+        response = admin_client.patch(
+            f'{self.TITLES_URL}{title.id}/', data={'genre': ['comedy']}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert self.filter_names(client, genre='comedy') == [
+            'Комедия', 'Трагикомедия', 'Ужасы'
+        ], (
+            'Проверьте, что индекс жанров обновляется при изменении жанров '
+            'произведения.'
+        )
+        assert self.filter_names(client, genre='horror') == []
+
+        Genre.objects.get(slug='drama').titles.clear()
+        assert self.filter_names(client, genre='drama') == []
+
+        catalog['Комедия'].delete()
+        assert self.filter_names(client, genre='comedy') == [
+            'Трагикомедия', 'Ужасы'
+        ]
+
+    def test_03_rebuild_matches_incremental_index(self, catalog):
+        Genre.objects.get(slug='horror').titles.add(catalog['Драма'])
+        catalog['Комедия'].genre.clear()
+        incremental = {
+            index.genre_id: bytes(index.title_bits)
+            for index in GenreTitleIndex.objects.all()
+        }
+        GenreTitleIndex.objects.rebuild()
+        rebuilt = {
+            index.genre_id: bytes(index.title_bits)
+            for index in GenreTitleIndex.objects.all()
+        }
+        assert incremental == rebuilt, (
+            'Проверьте, что инкрементально поддерживаемый индекс жанров '
+            'совпадает с пересобранным.'
+        )
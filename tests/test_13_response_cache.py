@@ -0,0 +1,136 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.checks import run_checks
+
+from reviews.models import Category, Genre, Review, Title
+
+
+@pytest.fixture
+def title():
+    category = Category.objects.create(name='Фильм', slug='movie')
+    genre = Genre.objects.create(name='Драма', slug='drama')
+    title = Title.objects.create(name='Фильм', year=2000, category=category)
+    title.genre.set((genre,))
+    return title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13ResponseCache:
+
+    TITLES_URL = '/api/v1/titles/'
+    READ_URLS = (
+        '/api/v1/titles/',
+        '/api/v1/titles/{title_id}/',
+        '/api/v1/titles/{title_id}/reviews/',
+        '/api/v1/categories/',
+        '/api/v1/genres/',
+    )
+
+    @pytest.mark.parametrize('url', READ_URLS)
+    def test_01_anonymous_reads_are_cached(self, client, title,
+                                           django_assert_num_queries, url):
+        url = url.format(title_id=title.id)
+        first = client.get(url)
+        assert first.status_code == HTTPStatus.OK
+        with django_assert_num_queries(0):
+            second = client.get(url)
+        assert second.status_code == HTTPStatus.OK
+        assert second.json() == first.json(), (
+            f'Проверьте, что повторный GET-запрос к `{url}` возвращает '
+            'закешированный ответ.'
+        )
+
+    def test_02_writes_invalidate_cache(self, client, admin_client, user,
+                                        title):
+        detail_url = f'{self.TITLES_URL}{title.id}/'
+        assert client.get(detail_url).json()['rating'] is None
+        Review.objects.create(author=user, title=title, text='Текст', score=8)
+        assert client.get(detail_url).json()['rating'] == 8, (
+            'Проверьте, что новый отзыв сбрасывает закешированный рейтинг '
+            'произведения.'
+        )
+
+        assert client.get(self.TITLES_URL).json()['count'] == 1
+        response = admin_client.post(self.TITLES_URL, data={
+            'name': 'Новое', 'year': 2001, 'genre': ['drama'],
+            'category': 'movie'
+        })
+        assert response.status_code == HTTPStatus.CREATED
+        assert client.get(self.TITLES_URL).json()['count'] == 2, (
+            'Проверьте, что создание произведения сбрасывает закешированный '
+            'список произведений.'
+        )
+
+        genre = Genre.objects.get(slug='drama')
+        genre.name = 'Трагедия'
+        genre.save()
+        genres = client.get(detail_url).json()['genre']
+        assert genres == [{'name': 'Трагедия', 'slug': 'drama'}], (
+            'Проверьте, что изменение жанра сбрасывает закешированные '
+            'произведения.'
+        )
+
+    def test_03_authenticated_reads_are_not_cached(self, client, user_client,
+                                                   title,
+                                                   django_assert_num_queries):
+        client.get(self.TITLES_URL)
+        with django_assert_num_queries(4):
+            response = user_client.get(self.TITLES_URL)
+        assert response.status_code == HTTPStatus.OK
+
+    def test_04_invalidation_reaches_other_workers(self, client, admin_client,
+                                                    title, settings,
+                                                    tmp_path):
+        # Каждый воркер кеширует ответы в своей памяти, а версии хранит
+        # в общем файловом кеше.
+        def worker(name):
+            settings.CACHES = {
+                'default': {
+                    'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                    'LOCATION': name,
+                },
+                'state': {
+                    'BACKEND': (
+                        'django.core.cache.backends.filebased.FileBasedCache'),
+                    'LOCATION': str(tmp_path),
+                },
+            }
+
+        worker('b')
+        assert client.get(self.TITLES_URL).json()['count'] == 1
+        worker('a')
+        response = admin_client.post(self.TITLES_URL, data={
+            'name': 'Новое', 'year': 2001, 'genre': ['drama'],
+            'category': 'movie'
+        })
+        assert response.status_code == HTTPStatus.CREATED
+        worker('b')
+        assert client.get(self.TITLES_URL).json()['count'] == 2, (
+            'Проверьте, что изменение в одном воркере сбрасывает '
+            'закешированные ответы других воркеров.'
+        )
+
+    def test_05_process_local_cache_warning(self, settings):
+        assert 'api.W001' not in [check.id for check in run_checks()]
+        settings.CACHES = {**settings.CACHES, 'state': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }}
+        assert 'api.W001' in [check.id for check in run_checks()], (
+            'Проверьте, что кеш версий в памяти процесса вызывает '
+            'предупреждение при запуске.'
+        )
+
+    def test_06_versions_survive_response_eviction(self, client, title,
+                                                   settings):
+        settings.CACHES = {**settings.CACHES, 'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'OPTIONS': {'MAX_ENTRIES': 2, 'CULL_FREQUENCY': 1},
+        }}
+        etag = client.get(self.TITLES_URL)['ETag']
+        for year in range(2001, 2011):
+            client.get(self.TITLES_URL, {'year': year})
+        assert client.get(self.TITLES_URL)['ETag'] == etag, (
+            'Проверьте, что закешированные ответы не вытесняют версии '
+            'ресурсов.'
+        )
@@ -0,0 +1,125 @@
+from http import HTTPStatus
+
+import pytest
+
+from api.v1.serializers import (
+    CommentSerializer, ReviewSerializer, TitleReadSerializer
+)
+from reviews.models import Category, Comment, Genre, Review, Title
+
+
+@pytest.fixture
+def review(user):
+    category = Category.objects.create(name='Фильм', slug='movie')
+    genre = Genre.objects.create(name='Драма', slug='drama')
+    title = Title.objects.create(name='Фильм', year=2000, category=category)
+    title.genre.set((genre,))
+    review = Review.objects.create(
+        author=user, title=title, text='Текст', score=7)
+    Comment.objects.create(author=user, review=review, text='Текст')
+    return review
+
+
+@pytest.fixture
+def no_serialization(monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError('Сериализатор не должен вызываться.')
+
+    for serializer in (
+        TitleReadSerializer, ReviewSerializer, CommentSerializer
+    ):
+        monkeypatch.setattr(serializer, 'to_representation', fail)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14ETag:
+
+    URLS = (
+        '/api/v1/titles/',
+        '/api/v1/titles/{title_id}/',
+        '/api/v1/titles/{title_id}/reviews/',
+        '/api/v1/titles/{title_id}/reviews/{review_id}/',
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/',
+    )
+
+    def get_url(self, url, review):
+        return url.format(title_id=review.title_id, review_id=review.id)
+
+    @pytest.mark.parametrize('url', URLS)
+    @pytest.mark.parametrize('client_name', ('client', 'user_client'))
+    def test_01_not_modified(self, request, review, url, client_name,
+                             django_assert_max_num_queries):
+        client = request.getfixturevalue(client_name)
+        url = self.get_url(url, review)
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        etag = response.get('ETag')
+        assert etag and etag.startswith('"'), (
+            f'Проверьте, что ответ на GET-запрос к `{url}` содержит '
+            'сильный ETag.'
+        )
+
+        request.getfixturevalue('no_serialization')
+        with django_assert_max_num_queries(1):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            f'Проверьте, что GET-запрос к `{url}` с совпадающим '
+            '`If-None-Match` возвращает ответ со статусом 304.'
+        )
+        assert response['ETag'] == etag
+
+    def test_02_etag_changes_on_write(self, client, review):
+        url = self.get_url(self.URLS[2], review)
+        etag = client.get(url)['ETag']
+        review.score = 3
+        review.save()
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что после изменения отзыва ETag списка отзывов '
+            'меняется.'
+        )
+        assert response['ETag'] != etag
+        assert response.json()['results'][0]['score'] == 3
+
+    def test_03_etag_depends_on_query(self, client, review):
+        etag = client.get(self.URLS[0])['ETag']
+        response = client.get(
+            self.URLS[0], {'year': 1999}, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['count'] == 0
+
+    def test_04_nested_etag_depends_on_parent(self, client, user, review):
+        other = Title.objects.create(name='Другой', year=2001)
+        other_review = Review.objects.create(
+            author=user, title=other, text='Текст', score=5)
+        reviews_url = self.get_url(self.URLS[2], review)
+        comments_url = self.get_url(self.URLS[4], review)
+        etags = {url: client.get(url)['ETag']
+                 for url in (reviews_url, comments_url)}
+        Comment.objects.create(author=user, review=other_review, text='Ещё')
+        for url, etag in etags.items():
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+                'Проверьте, что изменения отзывов и комментариев другого '
+                'произведения не меняют ETag вложенных списков.'
+            )
+        Comment.objects.get(review=review).delete()
+        response = client.get(
+            reviews_url, HTTP_IF_NONE_MATCH=etags[reviews_url])
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что комментарий к отзыву меняет ETag списка отзывов '
+            'произведения.'
+        )
+        assert response.json()['results'][0]['comment_count'] == 0
+        assert client.get(comments_url).json()['count'] == 0
+
+    def test_05_parent_delete_resets_nested_cache(self, client, review):
+        urls = [self.get_url(url, review) for url in self.URLS[2:]]
+        for url in urls:
+            assert client.get(url).status_code == HTTPStatus.OK
+        review.title.delete()
+        for url in urls:
+            assert client.get(url).status_code == HTTPStatus.NOT_FOUND, (
+                'Проверьте, что удаление произведения сбрасывает '
+                'закешированные ответы его отзывов и комментариев.'
+            )
@@ -0,0 +1,59 @@
+import csv
+from io import StringIO
+
+import pytest
+from django.conf import settings
+from django.core.management import call_command
+
+from reviews.models import Comment, Genre, Review, Title
+from users.models import User
+
+
+DATA_DIR = settings.BASE_DIR / 'static' / 'data'
+
+
+def read_rows(filename):
+    with open(DATA_DIR / filename, encoding='utf-8', newline='') as csv_file:
+        return list(csv.DictReader(csv_file))
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15LoadCsv:
+
+    def test_01_load_static_data(self):
+        call_command('load_csv', batch_size=7, stdout=StringIO())
+        for filename, queryset in (
+            ('users.csv', User.objects.all()),
+            ('genre.csv', Genre.objects.all()),
+            ('titles.csv', Title.objects.all()),
+            ('genre_title.csv', Title.genre.through.objects.all()),
+            ('review.csv', Review.objects.all()),
+            ('comments.csv', Comment.objects.all()),
+        ):
+            assert queryset.count() == len(read_rows(filename)), (
+                f'Проверьте, что команда `load_csv` загружает все строки '
+                f'файла `{filename}`.'
+            )
+
+        review_row = read_rows('review.csv')[0]
+        review = Review.objects.get(pk=review_row['id'])
+        assert review.pub_date.isoformat().startswith(
+            review_row['pub_date'][:19]), (
+            'Проверьте, что команда `load_csv` сохраняет даты публикации '
+            'из файла.'
+        )
+
+        scores = [
+            int(row['score']) for row in read_rows('review.csv')
+            if row['title_id'] == review_row['title_id']
+        ]
+        title = Title.objects.get(pk=review_row['title_id'])
+        assert (title.rating_sum, title.rating_count) == (
+            sum(scores), len(scores)), (
+            'Проверьте, что после загрузки пересчитываются рейтинги '
+            'произведений.'
+        )
+        genre_title = read_rows('genre_title.csv')[0]
+        genre = Genre.objects.get(pk=genre_title['genre_id'])
+        assert int(genre_title['title_id']) in Title.objects.filter_genres(
+            (genre.slug,)).values_list('id', flat=True)
@@ -0,0 +1,82 @@
+import csv
+import json
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+
+from reviews.models import Category, Genre, Review, Title
+
+
+TITLES_COUNT = 7
+
+
+@pytest.fixture
+def catalog(user):
+    movie = Category.objects.create(name='Фильм', slug='movie')
+    drama = Genre.objects.create(name='Драма', slug='drama')
+    comedy = Genre.objects.create(name='Комедия', slug='comedy')
+    for i in range(TITLES_COUNT):
+        title = Title.objects.create(
+            name=f'Произведение {i}', year=2000 + i,
+            category=movie if i % 2 else None
+        )
+        title.genre.set((drama, comedy) if i % 2 else (drama,))
+    Review.objects.create(
+        author=user, title=title, text='Текст', score=7)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16TitleExport:
+
+    EXPORT_URL = '/api/v1/titles/export/'
+
+    def read(self, response):
+        return b''.join(response.streaming_content).decode()
+
+    def test_01_export_permissions(self, client, user_client):
+        assert client.get(self.EXPORT_URL).status_code == (
+            HTTPStatus.UNAUTHORIZED)
+        assert user_client.get(self.EXPORT_URL).status_code == (
+            HTTPStatus.FORBIDDEN), (
+            f'Проверьте, что `{self.EXPORT_URL}` доступен только '
+            'администратору.'
+        )
+
+    def test_02_export_ndjson(self, admin_client, catalog):
+        response = admin_client.get(self.EXPORT_URL)
+        assert response.status_code == HTTPStatus.OK
+        assert response.streaming, (
+            f'Проверьте, что `{self.EXPORT_URL}` отдаёт потоковый ответ.'
+        )
+        rows = [json.loads(line) for line in self.read(response).splitlines()]
+        assert len(rows) == TITLES_COUNT
+        assert rows[-1] == {
+            'id': Title.objects.order_by('id').last().id,
+            'name': f'Произведение {TITLES_COUNT - 1}',
+            'year': 2000 + TITLES_COUNT - 1,
+            'description': None,
+            'category': None,
+            'genre': ['drama'],
+            'rating': 7.0,
+            'reviews_count': 1,
+        }
+
+    def test_03_export_csv_with_filters(self, admin_client, catalog):
+        response = admin_client.get(
+            self.EXPORT_URL,
+            {'export_format': 'csv', 'genre': 'comedy', 'category': 'movie'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert response['Content-Type'].startswith('text/csv')
+        rows = list(csv.DictReader(StringIO(self.read(response))))
+        assert len(rows) == TITLES_COUNT // 2, (
+            f'Проверьте, что `{self.EXPORT_URL}` поддерживает фильтры '
+            'списка произведений.'
+        )
+        assert {row['genre'] for row in rows} == {'drama,comedy'}
+
+    def test_04_export_unknown_format(self, admin_client):
+        response = admin_client.get(
+            self.EXPORT_URL, {'export_format': 'xml'})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
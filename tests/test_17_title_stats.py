@@ -0,0 +1,105 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from reviews.models import MAX_SCORE, MIN_SCORE, Review, Title, TitleScoreCount
+
+
+def histogram(**counts):
+    scores = dict.fromkeys(
+        (str(score) for score in range(MIN_SCORE, MAX_SCORE + 1)), 0)
+    scores.update({score[1:]: count for score, count in counts.items()})
+    return scores
+
+
+@pytest.fixture
+def titles():
+    return (
+        Title.objects.create(name='Первое', year=2000),
+        Title.objects.create(name='Второе', year=2000),
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17TitleStats:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def get_stats(self, client, title):
+        response = client.get(f'{self.TITLES_URL}{title.id}/stats/')
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что `{self.TITLES_URL}{{title_id}}/stats/` '
+            'доступен без авторизации.'
+        )
+        return response.json()
+
+    def test_01_stats_follow_review_changes(self, client, user,
+                                            moderator, titles):
+        first, second = titles
+        assert self.get_stats(client, first) == {
+            'reviews_count': 0, 'average': None, 'scores': histogram()
+        }
+        review = Review.objects.create(
+            author=user, title=first, text='Текст', score=3)
+        Review.objects.create(
+            author=moderator, title=first, text='Текст', score=10)
+        assert self.get_stats(client, first) == {
+            'reviews_count': 2, 'average': 6.5,
+            'scores': histogram(_3=1, _10=1)
+        }, (
+            'Проверьте, что распределение оценок обновляется при создании '
+            'отзыва.'
+        )
+
+        review.score = 10
+        review.save()
+        assert self.get_stats(client, first)['scores'] == histogram(_10=2)
+
+        review.title = second
+        review.save()
+        assert self.get_stats(client, first)['scores'] == histogram(_10=1)
+        assert self.get_stats(client, second)['scores'] == histogram(_10=1)
+
+        review.delete()
+        assert self.get_stats(client, second) == {
+            'reviews_count': 0, 'average': None, 'scores': histogram()
+        }, (
+            'Проверьте, что распределение оценок обновляется при удалении '
+            'отзыва.'
+        )
+
+    def test_02_stats_embedded_on_request(self, client, user, titles):
+        Review.objects.create(
+            author=user, title=titles[0], text='Текст', score=7)
+        response = client.get(self.TITLES_URL)
+        assert 'stats' not in response.json()['results'][0]
+        response = client.get(self.TITLES_URL, {'include': 'stats'})
+        stats = {
+            title['name']: title['stats']
+            for title in response.json()['results']
+        }
+        assert stats['Первое'] == {
+            'reviews_count': 1, 'average': 7.0, 'scores': histogram(_7=1)
+        }, (
+            f'Проверьте, что `{self.TITLES_URL}?include=stats` добавляет '
+            'распределение оценок к произведениям.'
+        )
+        response = client.get(
+            f'{self.TITLES_URL}{titles[1].id}/', {'include': 'stats'})
+        assert response.json()['stats']['scores'] == histogram()
+
+    def test_03_rebuild_command_checks_consistency(self, user, titles):
+        Review.objects.create(
+            author=user, title=titles[0], text='Текст', score=5)
+        call_command('rebuild_score_stats', '--check')
+
+        TitleScoreCount.objects.update(count=3)
+        with pytest.raises(CommandError):
+            call_command('rebuild_score_stats', '--check')
+
+        call_command('rebuild_score_stats')
+        assert TitleScoreCount.objects.differences() == {}, (
+            'Проверьте, что команда `rebuild_score_stats` пересчитывает '
+            'распределение оценок по отзывам.'
+        )
@@ -0,0 +1,35 @@
+from http import HTTPStatus
+
+import pytest
+from rest_framework.settings import api_settings
+
+from reviews.models import Review, Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18DuplicateReview:
+
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+
+    def test_01_duplicate_review_rejected_by_constraint(
+            self, user, user_client, django_assert_num_queries):
+        title = Title.objects.create(name='Произведение', year=2000)
+        Review.objects.create(author=user, title=title, text='Текст', score=5)
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=title.id)
+        with django_assert_num_queries(5):
+            response = user_client.post(url, data={'text': 'Ещё', 'score': 1})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert response.json() == {
+            api_settings.NON_FIELD_ERRORS_KEY: ['Вы уже оставили отзыв!']
+        }, (
+            'Проверьте, что повторный отзыв пользователя на произведение '
+            'возвращает ошибку валидации.'
+        )
+        assert Review.objects.filter(title=title).count() == 1
+
+    def test_02_unknown_title_returns_404(self, user_client):
+        response = user_client.post(
+            self.REVIEWS_URL_TEMPLATE.format(title_id=0),
+            data={'text': 'Текст', 'score': 1}
+        )
+        assert response.status_code == HTTPStatus.NOT_FOUND
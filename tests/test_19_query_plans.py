@@ -0,0 +1,102 @@
+import re
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Category, Comment, Genre, Review, Title
+
+
+# Полный просмотр таблицы без индекса или сортировка во временном B-дереве.
+BAD_PLAN_RE = re.compile(r'^SCAN \S+$|^SCAN TABLE \S+$|USE TEMP B-TREE')
+
+LIST_CASES = (
+    ('titles', '/api/v1/titles/', 'reviews_title'),
+    ('titles-cursor', '/api/v1/titles/?pagination=cursor', 'reviews_title'),
+    ('titles-year', '/api/v1/titles/?year=2001', 'reviews_title'),
+    ('titles-category', '/api/v1/titles/?category=movie', 'reviews_title'),
+    ('reviews', '/api/v1/titles/{title_id}/reviews/', 'reviews_review'),
+    ('reviews-cursor',
+     '/api/v1/titles/{title_id}/reviews/?pagination=cursor',
+     'reviews_review'),
+    ('reviews-activity',
+     '/api/v1/titles/{title_id}/reviews/?ordering=-last_comment_date',
+     'reviews_review'),
+    ('reviews-discussed-cursor',
+     '/api/v1/titles/{title_id}/reviews/?ordering=-comment_count'
+     '&pagination=cursor', 'reviews_review'),
+    ('comments', '/api/v1/titles/{title_id}/reviews/{review_id}/comments/',
+     'reviews_comment'),
+    ('comments-cursor',
+     '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+     '?pagination=cursor', 'reviews_comment'),
+    ('categories', '/api/v1/categories/', 'reviews_category'),
+    ('genres', '/api/v1/genres/', 'reviews_genre'),
+    ('users', '/api/v1/users/', 'users_user'),
+    ('users-role', '/api/v1/users/?role=admin', 'users_user'),
+    ('users-role-search', '/api/v1/users/?role=user&search=Test',
+     'users_user'),
+)
+
+
+@pytest.fixture
+def catalog(admin, user):
+    movie = Category.objects.create(name='Фильм', slug='movie')
+    drama = Genre.objects.create(name='Драма', slug='drama')
+    titles = []
+    for i in range(3):
+        title = Title.objects.create(
+            name=f'Произведение {i}', year=2000 + i, category=movie)
+        title.genre.set((drama,))
+        titles.append(title)
+    review = Review.objects.create(
+        author=user, title=titles[0], text='Текст', score=5)
+    Comment.objects.create(author=admin, review=review, text='Текст')
+    return {'title_id': titles[0].id, 'review_id': review.id}
+
+
+def explain(sql):
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+        return [row[-1] for row in cursor.fetchall()]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19QueryPlans:
+
+    @pytest.mark.parametrize(
+        'url,table', [case[1:] for case in LIST_CASES],
+        ids=[case[0] for case in LIST_CASES]
+    )
+    def test_list_queries_use_indexes(self, admin_client, catalog, url,
+                                      table):
+        url = url.format(**catalog)
+        with CaptureQueriesContext(connection) as context:
+            admin_client.get(url)
+        queries = [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith('SELECT')
+            and f'FROM "{table}"' in query['sql']
+        ]
+        assert queries, f'Запрос к `{table}` не выполнялся.'
+        for sql in queries:
+            bad_steps = [
+                step for step in explain(sql) if BAD_PLAN_RE.search(step)
+            ]
+            assert not bad_steps, (
+                f'Проверьте индексы для запроса к `{url}`: план '
+                f'{bad_steps} для `{sql}`.'
+            )
+
+    def test_title_genre_probed_by_covering_index(self, catalog):
+        queryset = Title.genre.through.objects.filter(
+            genre=Genre.objects.get(slug='drama')
+        ).values_list('title_id', flat=True)
+        plan = explain(str(queryset.query))
+        assert any(
+            'reviews_title_genre USING COVERING INDEX' in step
+            for step in plan
+        ), (
+            'Проверьте, что выборка произведений жанра из промежуточной '
+            f'таблицы использует покрывающий индекс: {plan}.'
+        )
@@ -0,0 +1,148 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Comment, Review, Title
+
+
+@pytest.fixture
+def reviews(user, moderator):
+    title = Title.objects.create(name='Произведение', year=2000)
+    return [
+        Review.objects.create(author=author, title=title, text='Текст',
+                              score=5)
+        for author in (user, moderator)
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test20ReviewCommentStats:
+
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+
+    def get_reviews(self, client, review, **params):
+        response = client.get(
+            self.REVIEWS_URL_TEMPLATE.format(title_id=review.title_id),
+            params
+        )
+        assert response.status_code == HTTPStatus.OK
+        return response.json()['results']
+
+    def test_01_counters_follow_comments(self, client, user_client,
+                                         moderator_client, moderator,
+                                         reviews):
+        review = reviews[0]
+        url = (
+            self.REVIEWS_URL_TEMPLATE.format(title_id=review.title_id)
+            + f'{review.id}/comments/'
+        )
+        detail_url = (
+            self.REVIEWS_URL_TEMPLATE.format(title_id=review.title_id)
+            + f'{review.id}/'
+        )
+        assert client.get(detail_url).json()['comment_count'] == 0
+        for text in ('Первый', 'Второй'):
+            response = user_client.post(url, data={'text': text})
+            assert response.status_code == HTTPStatus.CREATED
+        last_comment = Comment.objects.get(id=response.json()['id'])
+
+        data = client.get(detail_url).json()
+        assert data['comment_count'] == 2, (
+            'Проверьте, что отзыв содержит количество комментариев и '
+            'новый комментарий сбрасывает закешированный отзыв.'
+        )
+        assert data['last_comment_date'] == response.json()['pub_date'], (
+            'Проверьте, что отзыв содержит дату последнего комментария.'
+        )
+
+        response = moderator_client.delete(f'{url}{last_comment.id}/')
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        review.refresh_from_db()
+        first_comment = Comment.objects.get(review=review)
+        assert review.comment_count == 1
+        assert review.last_comment_date == first_comment.pub_date, (
+            'Проверьте, что при удалении последнего комментария дата '
+            'последнего комментария отзыва пересчитывается.'
+        )
+
+        Comment.objects.create(author=moderator, review=review, text='Текст')
+        moderator.delete()
+        review.refresh_from_db()
+        assert review.comment_count == 1, (
+            'Проверьте, что счётчик комментариев учитывает каскадное '
+            'удаление комментариев.'
+        )
+
+    def test_02_reviews_ordered_by_activity(self, client, user, reviews):
+        quiet, discussed = reviews
+        for _ in range(2):
+            Comment.objects.create(author=user, review=discussed, text='Т')
+        Comment.objects.create(author=user, review=quiet, text='Т')
+        for params, expected in (
+            ({'ordering': '-comment_count'}, [discussed.id, quiet.id]),
+            ({'ordering': '-last_comment_date'}, [quiet.id, discussed.id]),
+            ({'ordering': '-comment_count', 'pagination': 'cursor'},
+             [discussed.id, quiet.id]),
+        ):
+            ids = [data['id'] for data in self.get_reviews(
+                client, quiet, **params)]
+            assert ids == expected, (
+                'Проверьте, что отзывы можно упорядочить по количеству '
+                'комментариев и дате последнего комментария.'
+            )
+
+    def test_03_cursor_pages_include_uncommented_reviews(
+            self, client, django_user_model, user):
+        title = Title.objects.create(name='Обсуждаемое', year=2000)
+        reviews = [
+            Review.objects.create(
+                author=django_user_model.objects.create_user(
+                    username=f'reader{i}', email=f'reader{i}@yamdb.fake'),
+                title=title, text='Текст', score=5)
+            for i in range(8)
+        ]
+        for review in reviews[:2]:
+            Comment.objects.create(author=user, review=review, text='Т')
+        list_url = self.REVIEWS_URL_TEMPLATE.format(title_id=title.id)
+        url, ids = list_url, []
+        params = {'ordering': '-comment_count', 'pagination': 'cursor'}
+        while url:
+            data = client.get(url, params).json()
+            ids += [review['id'] for review in data['results']]
+            url, params = data['next'], None
+        assert sorted(ids) == sorted(review.id for review in reviews), (
+            'Проверьте, что курсорная пагинация возвращает все отзывы, '
+            'включая отзывы без комментариев.'
+        )
+        response = client.get(list_url, {
+            'ordering': '-last_comment_date', 'pagination': 'cursor'})
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что сортировка по полю, которое может быть пустым, '
+            'отклоняется в курсорном режиме.'
+        )
+
+    def test_04_rebuild_command(self, user, reviews):
+        review = reviews[0]
+        comment = Comment.objects.create(
+            author=user, review=review, text='Т')
+        Review.objects.update(comment_count=0, last_comment_date=None)
+        call_command('rebuild_comment_stats')
+        review.refresh_from_db()
+        assert review.comment_count == 1
+        assert review.last_comment_date == comment.pub_date
+
+    def test_05_review_delete_skips_comment_stats(self, user, reviews):
+        counts = []
+        for review, comments_count in zip(reviews, (1, 10)):
+            for _ in range(comments_count):
+                Comment.objects.create(author=user, review=review, text='Т')
+            with CaptureQueriesContext(connection) as context:
+                review.delete()
+            counts.append(len(context))
+        assert counts[0] == counts[1], (
+            'Проверьте, что удаление отзыва не пересчитывает его счётчики '
+            'для каждого удаляемого комментария.'
+        )
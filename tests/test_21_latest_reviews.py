@@ -0,0 +1,79 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.utils import timezone
+
+from reviews.models import Review, Title
+
+
+@pytest.fixture
+def titles(django_user_model):
+    authors = [
+        django_user_model.objects.create_user(
+            username=f'author_{i}', email=f'author_{i}@yamdb.fake')
+        for i in range(4)
+    ]
+    titles = [
+        Title.objects.create(name=f'Произведение {i}', year=2000)
+        for i in range(3)
+    ]
+    now = timezone.now()
+    for title, reviews_count in zip(titles, (4, 1, 0)):
+        for i, author in enumerate(authors[:reviews_count]):
+            review = Review.objects.create(
+                author=author, title=title, text=f'Отзыв {i}', score=5)
+            Review.objects.filter(pk=review.pk).update(
+                pub_date=now - timedelta(days=i))
+    return titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test21LatestReviews:
+
+    URL = '/api/v1/titles/latest-reviews/'
+
+    def test_01_latest_reviews_per_title(self, client, titles,
+                                         django_assert_num_queries):
+        title_ids = [title.id for title in reversed(titles)]
+        with django_assert_num_queries(2) as captured:
+            response = client.get(self.URL, {
+                'title_ids': ','.join(map(str, title_ids)), 'limit': 2
+            })
+        assert response.status_code == HTTPStatus.OK
+        assert any(
+            ') AS ranked WHERE' in query['sql']
+            for query in captured.captured_queries
+        ), (
+            'Проверьте, что подзапрос с оконной функцией имеет псевдоним: '
+            'без него запрос не работает в PostgreSQL и MySQL.'
+        )
+        data = response.json()
+        assert [item['title_id'] for item in data] == title_ids, (
+            f'Проверьте, что `{self.URL}` возвращает отзывы для каждого '
+            'запрошенного произведения в порядке запроса.'
+        )
+        texts = {
+            item['title_id']: [review['text'] for review in item['reviews']]
+            for item in data
+        }
+        assert texts == {
+            titles[0].id: ['Отзыв 0', 'Отзыв 1'],
+            titles[1].id: ['Отзыв 0'],
+            titles[2].id: [],
+        }, (
+            f'Проверьте, что `{self.URL}` возвращает не больше `limit` '
+            'последних отзывов на каждое произведение.'
+        )
+        assert data[-1]['reviews'][0]['author'] == 'author_0'
+
+    @pytest.mark.parametrize('params', (
+        {},
+        {'title_ids': '1,x'},
+        {'title_ids': ','.join(str(i) for i in range(1, 52))},
+        {'title_ids': '1', 'limit': 0},
+        {'title_ids': '1', 'limit': 11},
+    ))
+    def test_02_invalid_params(self, client, params):
+        response = client.get(self.URL, params)
+        assert response.status_code == HTTPStatus.BAD_REQUEST
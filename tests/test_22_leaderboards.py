@@ -0,0 +1,126 @@
+from http import HTTPStatus
+
+import pytest
+
+from api.v1.leaderboards import update_board
+from reviews.models import Category, Genre, Review, Title
+
+
+@pytest.fixture
+def leaderboard_settings(settings):
+    settings.LEADERBOARD_SIZE = 2
+    settings.LEADERBOARD_MIN_REVIEWS = 2
+
+
+@pytest.fixture
+def authors(django_user_model):
+    return [
+        django_user_model.objects.create_user(
+            username=f'author_{i}', email=f'author_{i}@yamdb.fake')
+        for i in range(3)
+    ]
+
+
+@pytest.fixture
+def catalog(leaderboard_settings, authors):
+    movie = Category.objects.create(name='Фильм', slug='movie')
+    book = Category.objects.create(name='Книга', slug='book')
+    drama = Genre.objects.create(name='Драма', slug='drama')
+    titles = {}
+    for name, category, scores in (
+        ('Лучший', movie, (10, 9)),
+        ('Хороший', book, (8, 8)),
+        ('Средний', movie, (6, 6)),
+        ('Плохой', book, (3, 4)),
+        ('Одинокий', movie, (10,)),
+    ):
+        title = Title.objects.create(name=name, year=2000, category=category)
+        title.genre.set((drama,))
+        for author, score in zip(authors, scores):
+            Review.objects.create(
+                author=author, title=title, text='Текст', score=score)
+        titles[name] = title
+    return titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22Leaderboards:
+
+    URL = '/api/v1/leaderboards/'
+
+    def get_names(self, client, url):
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что `{url}` доступен без авторизации.'
+        )
+        return [title['name'] for title in response.json()]
+
+    def test_01_leaderboards(self, client, catalog):
+        assert self.get_names(client, self.URL) == ['Лучший', 'Хороший'], (
+            f'Проверьте, что `{self.URL}` возвращает лучшие произведения с '
+            'достаточным количеством отзывов.'
+        )
+        assert self.get_names(
+            client, f'{self.URL}categories/movie/') == ['Лучший', 'Средний']
+        assert self.get_names(
+            client, f'{self.URL}genres/drama/') == ['Лучший', 'Хороший']
+        response = client.get(f'{self.URL}genres/unknown/')
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    def test_02_leaderboards_follow_reviews(self, client, catalog, authors,
+                                            django_assert_num_queries):
+        self.get_names(client, self.URL)
+        with django_assert_num_queries(0):
+            self.get_names(client, self.URL)
+
+        Review.objects.create(
+            author=authors[1], title=catalog['Одинокий'], text='Т', score=10)
+        assert self.get_names(client, self.URL) == ['Одинокий', 'Лучший'], (
+            'Проверьте, что таблица лидеров обновляется при появлении '
+            'нового отзыва.'
+        )
+
+        for review in catalog['Одинокий'].reviews.all():
+            review.score = 1
+            review.save()
+        catalog['Лучший'].reviews.first().delete()
+        assert self.get_names(client, self.URL) == ['Хороший', 'Средний'], (
+            'Проверьте, что произведение выбывает из таблицы лидеров при '
+            'снижении рейтинга или числа отзывов.'
+        )
+
+    def test_03_leaderboards_follow_catalog_changes(self, client, catalog):
+        url = f'{self.URL}categories/book/'
+        assert self.get_names(client, url) == ['Хороший', 'Плохой']
+        title = catalog['Лучший']
+        title.category = Category.objects.get(slug='book')
+        title.save()
+        assert self.get_names(client, url) == ['Лучший', 'Хороший'], (
+            'Проверьте, что таблицы лидеров обновляются при изменении '
+            'категории произведения.'
+        )
+        catalog['Хороший'].delete()
+        assert self.get_names(client, url) == ['Лучший', 'Плохой']
+
+    def test_04_partial_board_is_rebuilt_when_drained(self,
+                                                      leaderboard_settings):
+        def entry(title_id, rating):
+            return {'id': title_id, 'rating': rating}
+
+        data = {
+            'titles': [entry(1, 9), entry(2, 8), entry(3, 7), entry(4, 6)],
+            'complete': False,
+        }
+        data = update_board(data, 5, entry(5, 5))
+        assert [item['id'] for item in data['titles']] == [1, 2, 3, 4], (
+            'Проверьте, что в неполную таблицу не попадает произведение '
+            'ниже последнего известного.'
+        )
+        data = update_board(data, 2, entry(2, 9.5))
+        assert [item['id'] for item in data['titles']] == [2, 1, 3, 4]
+        for title_id in (1, 2):
+            data = update_board(data, title_id, None)
+        assert [item['id'] for item in data['titles']] == [3, 4]
+        assert update_board(data, 3, None) is None, (
+            'Проверьте, что таблица без запаса пересобирается из БД.'
+        )
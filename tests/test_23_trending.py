@@ -0,0 +1,88 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.utils import timezone
+
+from reviews.models import (
+    ACTIVITY_RETENTION_HOURS, Comment, Review, Title, TitleActivityBucket,
+    activity_bucket
+)
+
+
+@pytest.fixture
+def titles():
+    return [
+        Title.objects.create(name=f'Произведение {i}', year=2000)
+        for i in range(3)
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test23Trending:
+
+    URL = '/api/v1/titles/trending/'
+
+    def get_trending(self, client, **params):
+        response = client.get(self.URL, params)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что `{self.URL}` доступен без авторизации.'
+        )
+        return [
+            (title['name'], title['trending_score'])
+            for title in response.json()
+        ]
+
+    def test_01_activity_is_counted(self, client, user, moderator, titles):
+        review = Review.objects.create(
+            author=user, title=titles[1], text='Текст', score=5)
+        Comment.objects.create(author=moderator, review=review, text='Т')
+        Review.objects.create(
+            author=moderator, title=titles[2], text='Текст', score=5)
+        assert self.get_trending(client) == [
+            ('Произведение 1', (3 + 1) * 24),
+            ('Произведение 2', 3 * 24),
+        ], (
+            f'Проверьте, что `{self.URL}` упорядочивает произведения по '
+            'количеству новых отзывов и комментариев.'
+        )
+        assert self.get_trending(client, limit=1) == [
+            ('Произведение 1', (3 + 1) * 24)
+        ]
+
+    def test_02_window_and_recency(self, client, titles):
+        now = timezone.now()
+        TitleActivityBucket.objects.record(
+            titles[0].id, now - timedelta(hours=20), reviews=2)
+        TitleActivityBucket.objects.record(titles[1].id, now, reviews=1)
+        TitleActivityBucket.objects.record(
+            titles[2].id, now - timedelta(days=3), reviews=5)
+        assert self.get_trending(client, window='24h') == [
+            ('Произведение 1', 3 * 24), ('Произведение 0', 2 * 3 * 4)
+        ], (
+            'Проверьте, что недавняя активность весит больше и '
+            'учитывается только активность внутри окна.'
+        )
+        names = [name for name, _ in self.get_trending(client, window='7d')]
+        assert names == [
+            'Произведение 2', 'Произведение 0', 'Произведение 1'
+        ]
+
+    def test_03_expired_buckets_are_removed(self, titles):
+        now = timezone.now()
+        TitleActivityBucket.objects.record(
+            titles[0].id,
+            now - timedelta(hours=ACTIVITY_RETENTION_HOURS + 1),
+            reviews=1
+        )
+        TitleActivityBucket.objects.record(titles[1].id, now, comments=1)
+        assert list(
+            TitleActivityBucket.objects.values_list('title_id', 'bucket')
+        ) == [(titles[1].id, activity_bucket(now))], (
+            'Проверьте, что устаревшие часы удаляются при начале нового.'
+        )
+
+    @pytest.mark.parametrize('window', ('0h', '8d', 'week', '-1h'))
+    def test_04_invalid_window(self, client, window):
+        response = client.get(self.URL, {'window': window})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
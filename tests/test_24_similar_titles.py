@@ -0,0 +1,88 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from reviews.models import Review, SimilarTitle, Title
+from reviews.similarity import compute_similar
+
+
+# Оценки пользователей: первые два любят «Первое» и «Второе»,
+# третий — «Третье».
+SCORES = {
+    'user': {'Первое': 10, 'Второе': 9, 'Третье': 1, 'Четвёртое': 6},
+    'moderator': {'Первое': 9, 'Второе': 10, 'Третье': 2},
+    'admin': {'Первое': 2, 'Второе': 1, 'Третье': 10, 'Четвёртое': 5},
+}
+
+
+@pytest.fixture
+def titles(user, moderator, admin):
+    authors = {'user': user, 'moderator': moderator, 'admin': admin}
+    titles = {
+        name: Title.objects.create(name=name, year=2000)
+        for name in ('Первое', 'Второе', 'Третье', 'Четвёртое')
+    }
+    for author, scores in SCORES.items():
+        for name, score in scores.items():
+            Review.objects.create(
+                author=authors[author], title=titles[name], text='Текст',
+                score=score
+            )
+    return titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test24SimilarTitles:
+
+    URL = '/api/v1/titles/{title_id}/similar/'
+
+    def test_01_compute_similar(self):
+        title_ids, similar_ids, values = compute_similar(
+            [1, 1, 1, 2, 2, 2, 3, 3, 3],
+            [10, 20, 30, 10, 20, 30, 10, 20, 30],
+            [10, 9, 1, 9, 10, 2, 2, 1, 10],
+            top_k=1,
+        )
+        assert list(zip(title_ids, similar_ids)) == [(10, 20), (20, 10)], (
+            'Проверьте, что для каждого произведения выбираются самые '
+            'похожие по центрированным оценкам, а произведения без '
+            'положительного сходства остаются без соседей.'
+        )
+        assert values[0] == pytest.approx(values[1]) and values[0] > 0.9, (
+            'Проверьте, что сходство симметрично и близко к единице для '
+            'одинаково оценённых произведений.'
+        )
+        assert not compute_similar([], [], [])[0].size
+
+    def test_02_similar_endpoint(self, client, titles):
+        call_command('build_similar_titles', '--top-k', '2')
+        response = client.get(self.URL.format(title_id=titles['Первое'].id))
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что похожие произведения доступны без авторизации.'
+        )
+        data = response.json()
+        assert [title['name'] for title in data][0] == 'Второе', (
+            'Проверьте, что похожие произведения упорядочены по убыванию '
+            'сходства.'
+        )
+        assert 'Третье' not in [title['name'] for title in data], (
+            'Проверьте, что произведения с отрицательным сходством не '
+            'считаются похожими.'
+        )
+        assert all(0 < title['similarity'] <= 1 for title in data)
+        assert {'rating', 'genre', 'category'} <= set(data[0])
+        assert SimilarTitle.objects.filter(
+            title=titles['Первое'], similar=titles['Первое']
+        ).count() == 0
+
+    def test_03_title_without_neighbours(self, client):
+        title = Title.objects.create(name='Одинокое', year=2000)
+        response = client.get(self.URL.format(title_id=title.id))
+        assert response.status_code == HTTPStatus.OK
+        assert response.json() == []
+        response = client.get(self.URL.format(title_id=title.id + 1))
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что для несуществующего произведения возвращается '
+            'статус 404.'
+        )
@@ -0,0 +1,122 @@
+from http import HTTPStatus
+
+import pytest
+from django.contrib.auth.tokens import default_token_generator
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.v1.authentication import UserAccessToken, UserCache
+
+
+def claims_client(user):
+    client = APIClient()
+    client.credentials(
+        HTTP_AUTHORIZATION=f'Bearer {UserAccessToken.for_user(user)}')
+    return client
+
+
+@pytest.mark.django_db(transaction=True)
+class Test25JWTClaims:
+
+    def test_01_token_contains_claims(self, client, user):
+        response = client.post('/api/v1/auth/token/', data={
+            'username': user.username,
+            'confirmation_code': default_token_generator.make_token(user),
+        })
+        assert response.status_code == HTTPStatus.OK
+        token = AccessToken(response.json()['token'])
+        assert (
+            token['username'], token['role'], token['is_superuser']
+        ) == (user.username, 'user', False), (
+            'Проверьте, что токен содержит имя, роль и признак '
+            'суперпользователя.'
+        )
+
+    def test_02_no_user_query(self, user, django_assert_num_queries):
+        client = claims_client(user)
+        # Только COUNT пустого списка категорий.
+        with django_assert_num_queries(1):
+            response = client.get('/api/v1/categories/')
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что пользователь с токеном, содержащим роль, не '
+            'читается из БД.'
+        )
+
+    def test_03_me_returns_full_profile(self, user):
+        response = claims_client(user).get('/api/v1/users/me/')
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['bio'] == 'user bio', (
+            'Проверьте, что `/api/v1/users/me/` возвращает профиль целиком.'
+        )
+
+    def test_04_role_change_invalidates_claims(self, admin_client, user):
+        client = claims_client(user)
+        assert client.get('/api/v1/users/').status_code == (
+            HTTPStatus.FORBIDDEN)
+        response = admin_client.patch(
+            f'/api/v1/users/{user.username}/', data={'role': 'admin'})
+        assert response.status_code == HTTPStatus.OK
+        assert client.get('/api/v1/users/').status_code == HTTPStatus.OK, (
+            'Проверьте, что после смены роли старый токен пользователя '
+            'получает права новой роли.'
+        )
+        admin_client.patch(
+            f'/api/v1/users/{user.username}/', data={'role': 'user'})
+        assert client.get('/api/v1/users/').status_code == (
+            HTTPStatus.FORBIDDEN)
+
+    def test_05_deleted_user_is_rejected(self, admin_client, user):
+        client = claims_client(user)
+        assert client.get('/api/v1/users/me/').status_code == HTTPStatus.OK
+        response = admin_client.delete(f'/api/v1/users/{user.username}/')
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert client.get('/api/v1/categories/').status_code == (
+            HTTPStatus.UNAUTHORIZED
+        ), 'Проверьте, что токен удалённого пользователя отклоняется.'
+
+    def test_06_user_cache_is_bounded(self):
+        user_cache = UserCache(max_size=2, timeout=60)
+        for user_id in (1, 2):
+            user_cache.set(user_id, (user_id,), 0)
+        user_cache.get(1)
+        user_cache.set(3, (3,), 0)
+        assert user_cache.get(2) is None, (
+            'Проверьте, что из кеша вытесняется давно не читавшаяся запись.'
+        )
+        assert user_cache.get(1) == ((1,), 0)
+        expired = UserCache(max_size=2, timeout=-1)
+        expired.set(1, (1,), 0)
+        assert expired.get(1) is None
+
+    @pytest.mark.parametrize('backend, shared', (
+        ('django.core.cache.backends.locmem.LocMemCache', False),
+        ('django.core.cache.backends.filebased.FileBasedCache', True),
+    ))
+    def test_07_demotion_reaches_other_workers(self, admin_client, user,
+                                               settings, tmp_path, backend,
+                                               shared):
+        # Каждый воркер создаёт свой экземпляр кеша. LocMemCache с разными
+        # LOCATION не делит данные, файловый кеш с общим каталогом делит.
+        def worker(name):
+            location = tmp_path if shared else f'{tmp_path}-{name}'
+            settings.CACHES = {
+                'default': {'BACKEND': backend, 'LOCATION': str(location)},
+                'state': {'BACKEND': backend, 'LOCATION': f'{location}-state'},
+            }
+
+        user.role = 'admin'
+        user.save()
+        client = claims_client(user)
+        worker('b')
+        assert client.get('/api/v1/users/').status_code == HTTPStatus.OK
+        worker('a')
+        response = admin_client.patch(
+            f'/api/v1/users/{user.username}/', data={'role': 'user'})
+        assert response.status_code == HTTPStatus.OK
+        worker('b')
+        assert client.get('/api/v1/users/').status_code == (
+            HTTPStatus.FORBIDDEN
+        ), (
+            'Проверьте, что понижение роли в одном воркере сразу действует '
+            'в других воркерах.'
+        )
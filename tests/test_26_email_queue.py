@@ -0,0 +1,99 @@
+import time
+from datetime import timedelta
+
+import pytest
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.utils import timezone
+
+from users.delivery import deliver_pending, queue_email
+from users.models import EmailDelivery
+
+
+class CountingBackend(EmailBackend):
+    opened = 0
+
+    def open(self):
+        CountingBackend.opened += 1
+        return True
+
+
+class FailingBackend(EmailBackend):
+
+    def send_messages(self, messages):
+        raise ConnectionError('SMTP недоступен')
+
+
+@pytest.mark.django_db(transaction=True)
+class Test26EmailQueue:
+
+    URL_SIGNUP = '/api/v1/auth/signup/'
+
+    def test_01_signup_records_delivery(self, client):
+        response = client.post(self.URL_SIGNUP, data={
+            'email': 'valid@yamdb.fake', 'username': 'valid_username'
+        })
+        assert response.status_code == 200
+        delivery = EmailDelivery.objects.get()
+        assert (delivery.email, delivery.status, delivery.attempts) == (
+            'valid@yamdb.fake', EmailDelivery.Status.SENT, 1
+        ), 'Проверьте, что статус отправки письма записывается в очередь.'
+        assert delivery.message == '', (
+            'Проверьте, что текст с кодом подтверждения не хранится после '
+            'отправки.'
+        )
+        assert len(mail.outbox) == 1
+
+    def test_02_batch_uses_one_connection(self, settings):
+        settings.EMAIL_BACKEND = 'tests.test_26_email_queue.CountingBackend'
+        CountingBackend.opened = 0
+        for i in range(3):
+            EmailDelivery.objects.create(
+                email=f'user{i}@yamdb.fake', subject='Тема', message='Код')
+        assert deliver_pending() == 3
+        assert CountingBackend.opened == 1, (
+            'Проверьте, что пачка писем отправляется через одно соединение.'
+        )
+        assert len(mail.outbox) == 3
+        assert deliver_pending() == 0
+
+    def test_03_retry_with_backoff(self, settings):
+        settings.EMAIL_BACKEND = 'tests.test_26_email_queue.FailingBackend'
+        settings.EMAIL_MAX_ATTEMPTS = 3
+        settings.EMAIL_RETRY_DELAY = 30
+        queue_email('user@yamdb.fake', 'Тема', 'Код')
+        delivery = EmailDelivery.objects.get()
+        assert delivery.status == EmailDelivery.Status.PENDING
+        assert delivery.attempts == 1
+        assert 'SMTP недоступен' in delivery.last_error
+        delays = []
+        while delivery.status == EmailDelivery.Status.PENDING:
+            delays.append(
+                (delivery.next_attempt_at - timezone.now()).total_seconds())
+            assert deliver_pending() == 0, (
+                'Проверьте, что письмо не отправляется до истечения '
+                'задержки.'
+            )
+            EmailDelivery.objects.update(
+                next_attempt_at=timezone.now() - timedelta(seconds=1))
+            deliver_pending()
+            delivery.refresh_from_db()
+        assert [round(delay, -1) for delay in delays] == [30, 60], (
+            'Проверьте, что задержка между попытками растёт экспоненциально.'
+        )
+        assert (delivery.status, delivery.attempts, delivery.message) == (
+            EmailDelivery.Status.FAILED, 3, ''
+        ), 'Проверьте, что после последней попытки письмо помечается failed.'
+
+    def test_04_worker_pool_sends_in_background(self, client, settings):
+        settings.EMAIL_QUEUE_WORKERS = 1
+        response = client.post(self.URL_SIGNUP, data={
+            'email': 'valid@yamdb.fake', 'username': 'valid_username'
+        })
+        assert response.status_code == 200
+        deadline = time.monotonic() + 5
+        while not mail.outbox and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert len(mail.outbox) == 1, (
+            'Проверьте, что воркеры отправляют письма из очереди.'
+        )
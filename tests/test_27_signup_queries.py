@@ -0,0 +1,50 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+@pytest.mark.django_db(transaction=True)
+class Test27SignupQueries:
+
+    URL_SIGNUP = '/api/v1/auth/signup/'
+
+    def signup(self, client, data):
+        with CaptureQueriesContext(connection) as context:
+            response = client.post(self.URL_SIGNUP, data=data)
+        user_queries = [
+            query['sql'] for query in context.captured_queries
+            if '"users_user"' in query['sql']
+        ]
+        return response, user_queries
+
+    def test_01_one_lookup_and_one_insert(self, client):
+        data = {'username': 'new_user', 'email': 'new_user@yamdb.fake'}
+        response, queries = self.signup(client, data)
+        assert response.status_code == HTTPStatus.OK
+        assert [query.split()[0] for query in queries] == [
+            'SELECT', 'INSERT'
+        ], (
+            'Проверьте, что регистрация нового пользователя выполняет один '
+            'поиск и одну вставку в таблицу пользователей.'
+        )
+        response, queries = self.signup(client, data)
+        assert response.status_code == HTTPStatus.OK
+        assert len(queries) == 1, (
+            'Проверьте, что повторная регистрация выполняет только один '
+            'запрос к таблице пользователей.'
+        )
+
+    def test_02_conflicts_found_by_one_query(self, client, user, admin):
+        response, queries = self.signup(client, {
+            'username': user.username, 'email': admin.email
+        })
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert response.json() == {
+            'username': ['Пользователь с таким username уже существует!'],
+            'email': ['Пользователь с таким email уже существует!'],
+        }
+        assert len(queries) == 1, (
+            'Проверьте, что занятые username и email ищутся одним запросом.'
+        )
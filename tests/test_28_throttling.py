@@ -0,0 +1,127 @@
+from http import HTTPStatus
+
+import pytest
+
+from api.v1.throttling import (
+    CacheBucketStore, LocalBucketStore, local_store, parse_rate, take_token
+)
+
+
+@pytest.fixture
+def throttle_rates(settings):
+    def set_rates(**rates):
+        settings.REST_FRAMEWORK = {
+            **settings.REST_FRAMEWORK,
+            'DEFAULT_THROTTLE_RATES': {
+                **settings.REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'], **rates
+            },
+        }
+    return set_rates
+
+
+@pytest.mark.django_db(transaction=True)
+class Test28Throttling:
+
+    URL_SIGNUP = '/api/v1/auth/signup/'
+    URL_TOKEN = '/api/v1/auth/token/'
+
+    def test_01_signup_identity_bucket(self, client, throttle_rates):
+        throttle_rates(signup_identity='2/min')
+        data = {'username': 'valid_username', 'email': 'valid@yamdb.fake'}
+        for _ in range(2):
+            assert client.post(self.URL_SIGNUP, data=data).status_code == (
+                HTTPStatus.OK)
+        response = client.post(self.URL_SIGNUP, data={
+            'username': 'other_username', 'email': 'VALID@yamdb.fake'
+        })
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            f'Проверьте, что `{self.URL_SIGNUP}` ограничивает частоту '
+            'запросов для одного email.'
+        )
+        assert int(response['Retry-After']) > 0
+        response = client.post(self.URL_SIGNUP, data={
+            'username': 'other_username', 'email': 'other@yamdb.fake'
+        })
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что корзины разных пользователей независимы.'
+        )
+
+    def test_02_signup_ip_bucket(self, client, throttle_rates):
+        throttle_rates(signup_ip='3/min')
+        statuses = [
+            client.post(self.URL_SIGNUP, data={
+                'username': f'user{i}', 'email': f'user{i}@yamdb.fake'
+            }).status_code
+            for i in range(4)
+        ]
+        assert statuses == [HTTPStatus.OK] * 3 + [
+            HTTPStatus.TOO_MANY_REQUESTS
+        ], (
+            f'Проверьте, что `{self.URL_SIGNUP}` ограничивает частоту '
+            'запросов с одного IP-адреса.'
+        )
+
+    def test_03_token_bucket(self, client, user, throttle_rates):
+        throttle_rates(token_identity='2/min')
+        data = {'username': user.username, 'confirmation_code': 'wrong'}
+        statuses = [
+            client.post(self.URL_TOKEN, data=data).status_code
+            for _ in range(3)
+        ]
+        assert statuses == [
+            HTTPStatus.BAD_REQUEST, HTTPStatus.BAD_REQUEST,
+            HTTPStatus.TOO_MANY_REQUESTS
+        ], (
+            f'Проверьте, что `{self.URL_TOKEN}` ограничивает подбор кода '
+            'подтверждения для одного username.'
+        )
+
+    def test_04_bucket_refill(self):
+        capacity, rate = parse_rate('2/min')
+        assert (capacity, rate) == (2, 2 / 60)
+        state, wait = take_token(None, capacity, rate, now=0)
+        state, wait = take_token(state, capacity, rate, now=0)
+        assert wait == 0
+        state, wait = take_token(state, capacity, rate, now=0)
+        assert wait == pytest.approx(30), (
+            'Проверьте, что время ожидания равно времени пополнения '
+            'одного токена.'
+        )
+        state, wait = take_token(state, capacity, rate, now=30)
+        assert wait == 0
+        state, wait = take_token(state, capacity, rate, now=1000)
+        assert state[0] == pytest.approx(capacity - 1), (
+            'Проверьте, что корзина не пополняется сверх ёмкости.'
+        )
+
+    def test_05_shared_store(self):
+        first, second = CacheBucketStore('default'), CacheBucketStore(
+            'default')
+        capacity, rate = parse_rate('1/min')
+        assert first.take('throttle:test:key', capacity, rate) == 0
+        assert second.take('throttle:test:key', capacity, rate) > 0, (
+            'Проверьте, что корзины в общем кеше видны всем воркерам.'
+        )
+
+    def test_06_local_store_evicts_oldest(self):
+        store = LocalBucketStore(max_keys=2)
+        capacity, rate = parse_rate('5/min')
+        for key in ('first', 'second', 'first', 'third'):
+            store.take(key, capacity, rate)
+        assert list(store.buckets) == ['first', 'third'], (
+            'Проверьте, что при переполнении из памяти удаляется давно не '
+            'обновлявшаяся корзина, а не все корзины.'
+        )
+
+    def test_07_rejected_request_skips_identity(self, client, throttle_rates):
+        throttle_rates(signup_ip='1/min')
+        for i in range(3):
+            client.post(self.URL_SIGNUP, data={
+                'username': f'user{i}', 'email': f'user{i}@yamdb.fake'
+            })
+        identity_keys = [
+            key for key in local_store.buckets if ':signup_identity:' in key]
+        assert len(identity_keys) == 2, (
+            'Проверьте, что запрос, отклонённый по IP-адресу, не заводит '
+            'корзин по username и email.'
+        )
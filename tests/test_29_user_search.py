@@ -0,0 +1,67 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+@pytest.fixture
+def users(django_user_model):
+    for username, email, role in (
+        ('anna', 'anna@yamdb.fake', 'user'),
+        ('annette', 'zz@yamdb.fake', 'moderator'),
+        ('boris', 'annabel@yamdb.fake', 'user'),
+        ('joanna', 'joanna@yamdb.fake', 'admin'),
+    ):
+        django_user_model.objects.create_user(
+            username=username, email=email, role=role)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test29UserSearch:
+
+    URL = '/api/v1/users/'
+
+    def get_usernames(self, admin_client, **params):
+        response = admin_client.get(self.URL, params)
+        assert response.status_code == HTTPStatus.OK
+        return [user['username'] for user in response.json()['results']]
+
+    def test_01_prefix_search(self, admin_client, users):
+        assert self.get_usernames(admin_client, search='ann') == [
+            'anna', 'annette', 'boris'
+        ], (
+            f'Проверьте, что `{self.URL}?search=` ищет пользователей по '
+            'началу username или email.'
+        )
+        assert self.get_usernames(admin_client, search='nna') == [], (
+            f'Проверьте, что `{self.URL}?search=` ищет по префиксу, а не по '
+            'подстроке.'
+        )
+
+    def test_02_role_filter(self, admin_client, users):
+        assert self.get_usernames(
+            admin_client, role='user', search='ann'
+        ) == ['anna', 'boris'], (
+            f'Проверьте, что `{self.URL}?role=` фильтрует пользователей по '
+            'роли.'
+        )
+        response = admin_client.get(self.URL, {'role': 'owner'})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_03_search_uses_indexes(self, admin_client, users):
+        with CaptureQueriesContext(connection) as context:
+            admin_client.get(self.URL, {'search': 'ann'})
+        for query in context.captured_queries:
+            if 'FROM "users_user"' not in query['sql']:
+                continue
+            with connection.cursor() as cursor:
+                cursor.execute(f'EXPLAIN QUERY PLAN {query["sql"]}')
+                plan = [row[-1] for row in cursor.fetchall()]
+            assert not any(
+                step.startswith('SCAN') and 'users_user' in step
+                for step in plan
+            ), (
+                'Проверьте, что поиск по префиксу читает индексы username и '
+                f'email, а не всю таблицу: {plan}.'
+            )
@@ -0,0 +1,152 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from api.v1.authentication import UserAccessToken
+from reviews.models import Comment, Review, Title, TitleScoreCount
+
+
+@pytest.fixture
+def spammers(django_user_model):
+    return [
+        django_user_model.objects.create_user(
+            username=f'spammer{i}', email=f'spammer{i}@yamdb.fake')
+        for i in range(6)
+    ]
+
+
+@pytest.fixture
+def titles():
+    return [
+        Title.objects.create(name=f'Произведение {i}', year=2000)
+        for i in range(3)
+    ]
+
+
+def add_spam(spammers, titles, review):
+    for spammer in spammers:
+        for title in titles:
+            spam = Review.objects.create(
+                author=spammer, title=title, text='Спам', score=1)
+            Comment.objects.create(author=spammer, review=spam, text='Спам')
+        Comment.objects.create(author=spammer, review=review, text='Спам')
+
+
+@pytest.mark.django_db(transaction=True)
+class Test30BulkUsers:
+
+    UPDATE_URL = '/api/v1/users/bulk-update/'
+    DELETE_URL = '/api/v1/users/bulk-delete/'
+
+    def test_01_bulk_update(self, admin_client, user, moderator):
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {UserAccessToken.for_user(user)}')
+        response = admin_client.post(self.UPDATE_URL, data={
+            'usernames': [user.username, moderator.username, 'ghost'],
+            'role': 'admin',
+        }, format='json')
+        assert response.status_code == HTTPStatus.OK
+        assert response.json() == {
+            'updated': [user.username, moderator.username],
+            'not_found': ['ghost'],
+        }, (
+            f'Проверьте, что `{self.UPDATE_URL}` возвращает изменённых и '
+            'ненайденных пользователей.'
+        )
+        user.refresh_from_db()
+        moderator.refresh_from_db()
+        assert (user.role, moderator.role) == ('admin', 'admin')
+        assert client.get('/api/v1/users/').status_code == HTTPStatus.OK, (
+            'Проверьте, что массовое изменение роли сразу действует на '
+            'выданные ранее токены.'
+        )
+
+        response = admin_client.post(self.UPDATE_URL, data={
+            'usernames': [user.username], 'is_active': False,
+        }, format='json')
+        assert response.status_code == HTTPStatus.OK
+        assert client.get('/api/v1/users/').status_code == (
+            HTTPStatus.UNAUTHORIZED
+        ), 'Проверьте, что деактивированный пользователь теряет доступ.'
+
+    def test_02_bulk_validation(self, admin_client, user_client, admin,
+                                user):
+        cases = (
+            {'usernames': [user.username]},
+            {'usernames': [], 'role': 'user'},
+            {'usernames': [admin.username], 'role': 'user'},
+            {'usernames': [user.username], 'role': 'owner'},
+        )
+        for data in cases:
+            response = admin_client.post(
+                self.UPDATE_URL, data=data, format='json')
+            assert response.status_code == HTTPStatus.BAD_REQUEST, (
+                f'Проверьте, что `{self.UPDATE_URL}` отклоняет {data}.'
+            )
+        response = admin_client.post(self.DELETE_URL, data={
+            'usernames': [admin.username]}, format='json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        response = user_client.post(self.DELETE_URL, data={
+            'usernames': [admin.username]}, format='json')
+        assert response.status_code == HTTPStatus.FORBIDDEN
+
+    def test_03_bulk_delete_rebuilds_aggregates(self, client, admin_client,
+                                                user, spammers, titles):
+        review = Review.objects.create(
+            author=user, title=titles[0], text='Текст', score=9)
+        Comment.objects.create(author=user, review=review, text='Текст')
+        add_spam(spammers, titles, review)
+        title_url = f'/api/v1/titles/{titles[0].id}/'
+        assert client.get(title_url).json()['rating'] == 2
+
+        response = admin_client.post(self.DELETE_URL, data={
+            'usernames': [spammer.username for spammer in spammers],
+        }, format='json')
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert (data['reviews_deleted'], data['comments_deleted']) == (
+            18, 24)
+        assert not Review.objects.filter(author__in=spammers).exists()
+        assert not Comment.objects.filter(author__in=spammers).exists()
+
+        ratings = {
+            title.id: (title.rating_sum, title.rating_count)
+            for title in Title.objects.all()
+        }
+        assert ratings == {
+            titles[0].id: (9, 1), titles[1].id: (0, 0), titles[2].id: (0, 0)
+        }, 'Проверьте, что рейтинги произведений пересчитываются.'
+        assert TitleScoreCount.objects.differences() == {}
+        review.refresh_from_db()
+        assert review.comment_count == 1, (
+            'Проверьте, что счётчик комментариев оставшихся отзывов '
+            'пересчитывается.'
+        )
+        assert client.get(title_url).json()['rating'] == 9, (
+            'Проверьте, что массовое удаление сбрасывает кеш ответов.'
+        )
+
+    def test_04_delete_query_count_is_constant(self, admin, user, spammers,
+                                               titles):
+        admin_client = APIClient()
+        admin_client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {UserAccessToken.for_user(admin)}')
+        review = Review.objects.create(
+            author=user, title=titles[0], text='Текст', score=9)
+        add_spam(spammers, titles, review)
+        counts = []
+        for batch in (spammers[:2], spammers[2:]):
+            with CaptureQueriesContext(connection) as context:
+                response = admin_client.post(self.DELETE_URL, data={
+                    'usernames': [spammer.username for spammer in batch],
+                }, format='json')
+            assert response.status_code == HTTPStatus.OK
+            counts.append(len(context.captured_queries))
+        assert counts[0] == counts[1], (
+            'Проверьте, что количество запросов массового удаления не '
+            f'зависит от числа пользователей и отзывов: {counts}.'
+        )
@@ -0,0 +1,186 @@
+from http import HTTPStatus
+
+import pytest
+from django.contrib.auth.tokens import default_token_generator
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from api.v1 import authentication
+from api.v1.authentication import USER_CHANGED_KEY, issue_token
+from api.v1.cache import state_cache
+from api.v1.revocation import BloomFilter, RevocationList, revocation_list
+from users.models import IssuedToken, RevokedToken
+
+
+def issued_client(user):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {issue_token(user)}')
+    return client
+
+
+@pytest.mark.django_db(transaction=True)
+class Test31TokenRevocation:
+
+    def test_01_bloom_filter(self):
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        for number in range(1000):
+            bloom.add(f'jti{number}')
+        assert all(f'jti{number}' in bloom for number in range(1000)), (
+            'Проверьте, что фильтр Блума находит все добавленные ключи.'
+        )
+        false_positives = sum(
+            f'other{number}' in bloom for number in range(10000))
+        assert false_positives < 300, (
+            'Проверьте, что доля ложных срабатываний фильтра Блума близка '
+            'к заданной.'
+        )
+
+    def test_02_token_view_records_token(self, client, user):
+        response = client.post('/api/v1/auth/token/', data={
+            'username': user.username,
+            'confirmation_code': default_token_generator.make_token(user),
+        })
+        assert response.status_code == HTTPStatus.OK
+        assert IssuedToken.objects.filter(user=user).count() == 1, (
+            'Проверьте, что выданный токен записывается в `IssuedToken`.'
+        )
+
+    def test_03_role_change_revokes_tokens(self, admin_client, user):
+        client = issued_client(user)
+        assert client.get('/api/v1/users/me/').status_code == HTTPStatus.OK
+        response = admin_client.patch(
+            f'/api/v1/users/{user.username}/', data={'bio': 'Новая'})
+        assert response.status_code == HTTPStatus.OK
+        assert client.get('/api/v1/users/me/').status_code == HTTPStatus.OK, (
+            'Проверьте, что изменение без смены роли не отзывает токены.'
+        )
+        admin_client.patch(
+            f'/api/v1/users/{user.username}/', data={'role': 'moderator'})
+        assert client.get('/api/v1/users/me/').status_code == (
+            HTTPStatus.UNAUTHORIZED
+        ), 'Проверьте, что смена роли отзывает выданные токены.'
+        assert issued_client(user).get(
+            '/api/v1/users/me/').status_code == HTTPStatus.OK, (
+            'Проверьте, что новый токен после смены роли действует.'
+        )
+
+    def test_04_delete_revokes_tokens(self, admin_client, user, moderator):
+        user_client = issued_client(user)
+        moderator_client = issued_client(moderator)
+        response = admin_client.delete(f'/api/v1/users/{user.username}/')
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        response = admin_client.post('/api/v1/users/bulk-delete/', data={
+            'usernames': [moderator.username]}, format='json')
+        assert response.status_code == HTTPStatus.OK
+        assert RevokedToken.objects.count() == 2, (
+            'Проверьте, что удаление пользователей отзывает их токены.'
+        )
+        for client in (user_client, moderator_client):
+            assert client.get('/api/v1/categories/').status_code == (
+                HTTPStatus.UNAUTHORIZED)
+
+    def test_05_bulk_update_revokes_changed_roles(self, admin_client, user,
+                                                  moderator):
+        user_client = issued_client(user)
+        moderator_client = issued_client(moderator)
+        response = admin_client.post('/api/v1/users/bulk-update/', data={
+            'usernames': [user.username, moderator.username],
+            'role': 'moderator',
+        }, format='json')
+        assert response.status_code == HTTPStatus.OK
+        assert user_client.get('/api/v1/categories/').status_code == (
+            HTTPStatus.UNAUTHORIZED)
+        assert moderator_client.get('/api/v1/categories/').status_code == (
+            HTTPStatus.OK
+        ), 'Проверьте, что токены пользователей с прежней ролью не отзываются.'
+
+    def test_06_false_positive_checks_table(self, user):
+        client = issued_client(user)
+        jti = IssuedToken.objects.get(user=user).jti
+        revocation_list.bloom.add(jti)
+        assert client.get('/api/v1/users/me/').status_code == HTTPStatus.OK, (
+            'Проверьте, что срабатывание фильтра Блума перепроверяется по '
+            'таблице отозванных токенов.'
+        )
+
+    def test_07_verified_token_is_cached(self, user, monkeypatch):
+        client = issued_client(user)
+        assert client.get('/api/v1/users/me/').status_code == HTTPStatus.OK
+
+        def verify(*args):
+            raise AssertionError('Подпись токена проверяется повторно.')
+
+        monkeypatch.setattr(JWTAuthentication, 'get_validated_token', verify)
+        assert client.get('/api/v1/users/me/').status_code == HTTPStatus.OK, (
+            'Проверьте, что проверенный токен берётся из кеша.'
+        )
+
+    @pytest.mark.parametrize('backend, shared', (
+        ('django.core.cache.backends.locmem.LocMemCache', False),
+        ('django.core.cache.backends.filebased.FileBasedCache', True),
+    ))
+    def test_08_revocation_reaches_other_workers(self, admin_client, user,
+                                                 settings, tmp_path,
+                                                 monkeypatch, backend,
+                                                 shared):
+        settings.REVOKED_TOKENS_CHECK_INTERVAL = 0
+        lists = {}
+
+        # Каждый воркер создаёт свой экземпляр кеша и свой фильтр.
+        def worker(name):
+            location = tmp_path if shared else f'{tmp_path}-{name}'
+            settings.CACHES = {
+                'default': {'BACKEND': backend, 'LOCATION': str(location)},
+                'state': {'BACKEND': backend, 'LOCATION': f'{location}-state'},
+            }
+            monkeypatch.setattr(
+                authentication, 'revocation_list',
+                lists.setdefault(name, RevocationList(1000, 0.01)))
+
+        client = issued_client(user)
+        worker('b')
+        assert client.get('/api/v1/users/me/').status_code == HTTPStatus.OK
+        worker('a')
+        admin_client.patch(
+            f'/api/v1/users/{user.username}/', data={'role': 'moderator'})
+        worker('b')
+        assert client.get('/api/v1/users/me/').status_code == (
+            HTTPStatus.UNAUTHORIZED
+        ), (
+            'Проверьте, что токен, отозванный в одном воркере, отклоняется '
+            'в других воркерах.'
+        )
+
+    def test_09_bulk_deactivation_revokes_tokens(self, admin_client, user,
+                                                 moderator):
+        user_client = issued_client(user)
+        moderator_client = issued_client(moderator)
+        response = admin_client.post('/api/v1/users/bulk-update/', data={
+            'usernames': [user.username], 'is_active': False,
+        }, format='json')
+        assert response.status_code == HTTPStatus.OK
+        # Без отметки об изменении токен отклоняется по списку отзыва.
+        state_cache.delete(USER_CHANGED_KEY.format(user.pk))
+        assert user_client.get('/api/v1/categories/').status_code == (
+            HTTPStatus.UNAUTHORIZED
+        ), 'Проверьте, что деактивация пользователей отзывает их токены.'
+        assert moderator_client.get('/api/v1/categories/').status_code == (
+            HTTPStatus.OK)
+
+    def test_10_username_change_revokes_tokens(self, admin_client, user,
+                                               moderator):
+        user_client = issued_client(user)
+        response = user_client.patch(
+            '/api/v1/users/me/', data={'username': 'renamed'})
+        assert response.status_code == HTTPStatus.OK
+        moderator_client = issued_client(moderator)
+        response = admin_client.patch(
+            f'/api/v1/users/{moderator.username}/',
+            data={'username': 'renamed_moderator'})
+        assert response.status_code == HTTPStatus.OK
+        state_cache.delete_many([
+            USER_CHANGED_KEY.format(pk) for pk in (user.pk, moderator.pk)])
+        for client in (user_client, moderator_client):
+            assert client.get('/api/v1/categories/').status_code == (
+                HTTPStatus.UNAUTHORIZED
+            ), 'Проверьте, что смена имени отзывает выданные токены.'